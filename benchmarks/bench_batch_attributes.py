@@ -0,0 +1,100 @@
+"""
+Benchmark: secundários de uma horda de monstros, entidade a entidade
+(calculate_all_secondaries) vs em colunas NumPy (calculate_secondaries_batch)
+
+Antes, confere casos de borda da avaliação em colunas contra a escalar.
+
+Uso:
+    python benchmarks/bench_batch_attributes.py [entidades]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.attributes import AttributeRule, AttributeSystem, SecondaryAttribute
+from src.models.formula import FormulaError, compile_formula
+
+PRIMARIES = ('strength', 'dexterity', 'constitution', 'intelligence', 'wisdom', 'charisma')
+SECONDARIES = (
+    ('str_mod', 'floor((strength - 10) / 2)', {}),
+    ('dex_mod', 'floor((dexterity - 10) / 2)', {}),
+    ('con_mod', 'floor((constitution - 10) / 2)', {}),
+    ('wis_mod', 'floor((wisdom - 10) / 2)', {}),
+    ('hp', 'max(1, (8 + con_mod) * level)', {'brute': 1.5, 'caster': 0.75}),
+    ('initiative', 'dex_mod + (2 if level >= 10 else 0)', {}),
+    ('attack', 'max(str_mod, dex_mod) + ceil(level / 4) + 1', {'brute': 1.2}),
+    ('carry', 'strength * 15', {'brute': 2.0}),
+    ('will', 'clamp(10 + wis_mod + level // 2, 0, 30)', {'caster': 1.25}),
+    ('toughness', 'hp / 10 + con_mod', {}),
+)
+CLASSES = ('brute', 'caster', 'skirmisher')
+# Casos em que NumPy e Python divergiam: clamp com mínimo > máximo, tipo do
+# resultado de floor/ceil/round, colunas int32 (como as de CharacterStore) e
+# comparações usadas em contas (bool no NumPy)
+EDGE_FORMULAS = (
+    'clamp(strength, 10, 5)', 'round(strength / 4)', 'round(strength / 3, 1)',
+    'floor(strength / 3) + ceil(level / 4)', 'strength * level * 100000',
+    '(strength > 10) + (level > 10)', '-(strength > 10)', '(strength > 0) * 3 - (level < 5)',
+)
+
+
+def build_system() -> AttributeSystem:
+    system = AttributeSystem()
+    for name in PRIMARIES:
+        system.add_primary_attribute(AttributeRule(name, is_primary=True, is_mandatory=True, base_value=10))
+    for name, formula, modifiers in SECONDARIES:
+        system.add_secondary_attribute(SecondaryAttribute(name, formula, class_modifiers=dict(modifiers)))
+    return system
+
+
+def check_edge_cases():
+    columns = {'strength': np.arange(-20, 20, dtype=np.int32), 'level': np.arange(40, dtype=np.int32)}
+    rows = [{name: int(column[i]) for name, column in columns.items()} for i in range(40)]
+    for text in EDGE_FORMULAS:
+        formula = compile_formula(text)
+        expected = [formula(row) for row in rows]
+        result = formula.evaluate_columns(columns, 40).tolist()
+        assert result == expected and list(map(type, result)) == list(map(type, expected)), text
+    huge = {'strength': np.full(3, 2 ** 31 - 1, dtype=np.int32)}
+    try:
+        compile_formula('strength * strength * strength').evaluate_columns(huge, 3)
+    except FormulaError:
+        pass
+    else:
+        raise AssertionError("estouro de inteiro não detectado")
+    print("Casos de borda: ok (clamp, floor/ceil/round, int32, estouro, comparações)")
+
+
+def main(entities: int):
+    check_edge_cases()
+    system = build_system()
+    rng = np.random.default_rng(42)
+    columns = {name: rng.integers(3, 19, entities) for name in PRIMARIES}
+    columns['level'] = rng.integers(1, 21, entities)
+    classes = rng.choice(CLASSES, entities)
+
+    rows = [{name: int(column[i]) for name, column in columns.items()} for i in range(entities)]
+    row_classes = classes.tolist()
+
+    print(f"{entities} entidades, {len(SECONDARIES)} secundários")
+    start = time.perf_counter()
+    looped = [system.calculate_all_secondaries(row, row_class) for row, row_class in zip(rows, row_classes)]
+    loop_time = time.perf_counter() - start
+    print(f"  {'laço por entidade':<22} {loop_time * 1000:8.1f} ms")
+
+    start = time.perf_counter()
+    batch = system.calculate_secondaries_batch(columns, classes)
+    batch_time = time.perf_counter() - start
+    print(f"  {'colunas NumPy':<22} {batch_time * 1000:8.1f} ms  ({loop_time / batch_time:.0f}x)")
+
+    for name in batch:
+        assert batch[name].tolist() == [values[name] for values in looped], name
+    print("  resultados idênticos")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,109 @@
+"""
+Benchmark: custo de fan-out do broadcast (serialização por mensagem vs. uma vez)
+
+Uso:
+    python benchmarks/bench_broadcast.py [num_clientes] [num_mensagens]
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.network.server import GameServer
+
+logging.disable(logging.INFO)
+
+
+class FakeSocket:
+    """Simula o custo de envio do websockets (str é codificado a cada envio)"""
+
+    def __init__(self):
+        self.bytes_sent = 0
+
+    async def send(self, data, text=None):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        self.bytes_sent += len(data)
+
+
+async def legacy_broadcast(clients, message: str, exclude=None):
+    """Broadcast original: recebe str e cada cliente codifica novamente"""
+    tasks = []
+    for client in clients:
+        if client != exclude:
+            tasks.append(client.send(message))
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def chat_payload(i: int) -> dict:
+    return {
+        'type': 'chat_message',
+        'sender': 'Aragorn',
+        'message': f'Ataco o orc número {i} com minha espada longa!',
+        'timestamp': time.time()
+    }
+
+
+async def drain(server: GameServer):
+    """Aguarda as filas de saída de todos os clientes esvaziarem"""
+    while any(conn.depth for conn in server.clients.values()):
+        await asyncio.sleep(0)
+
+
+async def run(num_clients: int, num_messages: int):
+    server = GameServer(max_queue=num_messages)
+    sockets = [FakeSocket() for _ in range(num_clients)]
+    for socket in sockets:
+        await server.register_client(socket)
+        server.join_room(socket, 'default')
+
+    start = time.perf_counter()
+    for i in range(num_messages):
+        await legacy_broadcast(sockets, json.dumps(chat_payload(i)))
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(num_messages):
+        await server.broadcast(chat_payload(i))
+    await drain(server)
+    current = time.perf_counter() - start
+
+    print(f"Clientes: {num_clients}, mensagens: {num_messages}")
+    print(f"  legado:          {legacy * 1e6 / num_messages:8.1f} µs/mensagem")
+    print(f"  serializa 1 vez: {current * 1e6 / num_messages:8.1f} µs/mensagem")
+
+    # Entrada de jogadores atrasados com mundo grande
+    room = server.get_room('default')
+    room.world_data = {'equipment': {f'Item {i}': {'value': i, 'tags': ['magical']} for i in range(5000)}}
+    room.world_revision = 1
+    joins = 50
+
+    start = time.perf_counter()
+    for _ in range(joins):
+        await FakeSocket().send(json.dumps({'type': 'world_data', 'data': room.world_data}))
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(joins):
+        socket = FakeSocket()
+        await server.register_client(socket)
+        server.join_room(socket, 'default')
+    await drain(server)
+    current = time.perf_counter() - start
+
+    print(f"Snapshot para {joins} novos clientes:")
+    print(f"  legado:          {legacy * 1e3 / joins:8.2f} ms/cliente")
+    print(f"  cache por revisão: {current * 1e3 / joins:6.2f} ms/cliente")
+
+    for socket in list(server.clients):
+        await server.unregister_client(socket)
+
+
+if __name__ == "__main__":
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    messages = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    asyncio.run(run(clients, messages))
@@ -0,0 +1,95 @@
+"""
+Benchmark: catálogo de equipamentos em JSON vs SQLite (catalog_store)
+
+Cada cenário roda em um processo novo, para que a memória residente (pico
+de RSS) reflita apenas aquele caminho:
+
+    json             carrega equipment.json e consulta itens raros
+    sqlite consulta  abre o banco e consulta itens raros (índice de raridade)
+    sqlite item      abre o banco e busca um único item pelo nome
+
+Uso:
+    python benchmarks/bench_catalog.py [itens]
+"""
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sample_world import build_world
+from src.models import CatalogStore, EquipmentSystem
+
+
+def peak_rss_kib() -> int:
+    """Pico de memória residente do processo atual"""
+    # VmHWM recomeça no exec; ru_maxrss (Linux) herda o valor do processo pai
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss: KiB no Linux, bytes no macOS
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+
+def run_scenario(scenario: str, directory: str):
+    """Executado no processo filho: imprime tempo (ms) e pico de RSS (KiB)"""
+    start = time.perf_counter()
+    if scenario == 'json':
+        system = EquipmentSystem.load_from_file(os.path.join(directory, 'equipment.json'))
+        found = len(system.get_items_by_rarity('rare'))
+    else:
+        system = EquipmentSystem()
+        system.use_store(CatalogStore.open(os.path.join(directory, 'catalog.sqlite')))
+        if scenario == 'sqlite-query':
+            found = len(system.get_items_by_rarity('rare'))
+        else:
+            found = int(system.get_equipment('Espada 3') is not None)
+    elapsed = time.perf_counter() - start
+    print(f"{elapsed * 1000:.1f} {peak_rss_kib()} {found}")
+
+
+def main(num_items: int):
+    directory = tempfile.mkdtemp(prefix='bardgame-catalog-')
+    try:
+        world = build_world(num_items=num_items, num_talents=0)
+        world.equipment.save_to_file(os.path.join(directory, 'equipment.json'))
+        start = time.perf_counter()
+        world.equipment.use_store(CatalogStore.open(os.path.join(directory, 'catalog.sqlite')))
+        world.equipment.store.commit()
+        import_time = time.perf_counter() - start
+        world.equipment.store.close()
+
+        json_size = os.path.getsize(os.path.join(directory, 'equipment.json'))
+        db_size = os.path.getsize(os.path.join(directory, 'catalog.sqlite'))
+        print(f"Catálogo com {num_items} itens")
+        print(f"  JSON: {json_size / 1024:.0f} KiB, SQLite: {db_size / 1024:.0f} KiB "
+              f"(importação {import_time * 1000:.0f} ms)")
+        for label, scenario in (
+            ('json, carregar + raros', 'json'),
+            ('sqlite, abrir + raros', 'sqlite-query'),
+            ('sqlite, abrir + 1 item', 'sqlite-item'),
+        ):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--scenario', scenario, directory],
+                capture_output=True, text=True, check=True
+            ).stdout.split()
+            elapsed, rss, found = float(output[0]), int(output[1]), int(output[2])
+            print(f"  {label:<24} {elapsed:8.1f} ms  RSS {rss / 1024:6.1f} MiB  ({found} itens)")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--scenario':
+        run_scenario(sys.argv[2], sys.argv[3])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
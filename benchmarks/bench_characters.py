@@ -0,0 +1,98 @@
+"""
+Benchmark: memória e operações em massa de NPCs como dicts `character_data`
+vs CharacterStore (colunas tipadas, src/models/characters.py)
+
+A memória é medida com tracemalloc durante a criação de cada representação.
+
+Uso:
+    python benchmarks/bench_characters.py [personagens]
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.attributes import AttributeSystem, SecondaryAttribute
+from src.models.characters import CharacterStore
+
+PRIMARIES = ('strength', 'dexterity', 'constitution', 'intelligence', 'wisdom', 'charisma')
+SECONDARIES = ('hp', 'mana', 'initiative', 'attack', 'defense', 'carry', 'will', 'fortitude')
+RACES = ('Goblin', 'Orc', 'Kobold', 'Humano')
+CLASSES = ('warrior', 'rogue', 'mage')
+
+
+def make_rows(count: int):
+    rng = random.Random(42)
+    for i in range(count):
+        attributes = {name: rng.randint(3, 18) for name in PRIMARIES}
+        attributes.update({name: rng.randint(0, 100) for name in SECONDARIES})
+        yield {
+            'name': f"NPC {i}",
+            'race': RACES[i % len(RACES)],
+            'class': CLASSES[i % len(CLASSES)],
+            'level': rng.randint(1, 20),
+            'attributes': attributes,
+            'proficiencies': ['armas simples', 'armaduras leves'],
+            'talents': [],
+        }
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size, elapsed
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main(count: int):
+    dicts, dict_size, dict_time = measure(lambda: list(make_rows(count)))
+
+    def build_store():
+        store = CharacterStore(PRIMARIES + SECONDARIES)
+        for row in make_rows(count):
+            store.add_from_dict(row)
+        return store
+
+    store, store_size, store_time = measure(build_store)
+
+    print(f"{count} personagens, {len(PRIMARIES) + len(SECONDARIES)} atributos cada")
+    print(f"  {'dicts':<16} {dict_size / 2 ** 20:7.1f} MiB  {dict_size / count:6.0f} B/personagem")
+    print(f"  {'CharacterStore':<16} {store_size / 2 ** 20:7.1f} MiB  {store_size / count:6.0f} B/personagem"
+          f"  ({dict_size / store_size:.1f}x menor)")
+
+    system = AttributeSystem()
+    system.add_secondary_attribute(SecondaryAttribute('hp', 'constitution * 5 + level * 3',
+                                                      class_modifiers={'warrior': 1.5}))
+    system.add_secondary_attribute(SecondaryAttribute('initiative', 'floor((dexterity - 10) / 2) + level // 4'))
+
+    def level_up_dicts():
+        for row in dicts:
+            row['level'] += 1
+
+    def secondaries_dicts():
+        for row in dicts:
+            row['attributes'].update(system.calculate_all_secondaries(
+                dict(row['attributes'], level=row['level']), row['class']))
+
+    print("Operações em massa:")
+    print(f"  {'subir de nível':<28} dicts {timed(level_up_dicts) * 1000:8.1f} ms"
+          f"  colunas {timed(lambda: store.add_to('level', 1)) * 1000:8.1f} ms")
+    print(f"  {'recalcular secundários':<28} dicts {timed(secondaries_dicts) * 1000:8.1f} ms"
+          f"  colunas {timed(lambda: store.update_secondaries(system)) * 1000:8.1f} ms")
+    assert [c.to_dict()['attributes']['hp'] for c in store] == [row['attributes']['hp'] for row in dicts]
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,137 @@
+"""
+Benchmark: tamanho e vazão dos codecs de rede sobre um mundo realista
+
+Antes das medições confere que cada tipo de mensagem (enviada e recebida
+pelo servidor) e os frames `batch` voltam iguais após encode/decode em
+cada codec disponível, e que frames binários com tipos sem equivalente em
+JSON (bytes) são recusados.
+
+Uso:
+    python benchmarks/bench_codec.py [num_equipamentos]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sample_world import build_world, world_payload
+
+from src.network.codec import CODECS, CodecError, JSON_CODEC, decode_frame
+
+CHARACTER = {'name': 'Aragorn', 'hp': 42, 'attributes': {'strength': 16, 'dexterity': 14},
+             'conditions': ['Poisoned'], 'position': [12, 7]}
+OPS = [
+    {'op': 'replace', 'path': '/rules/currency/base_currency', 'value': 'Ouro'},
+    {'op': 'add', 'path': '/rules/equipment/equipment/Espada~1Curta', 'value': {'name': 'Espada/Curta', 'value': 1.5}},
+    {'op': 'remove', 'path': '/metadata/description'},
+]
+
+
+def sample_messages(world: dict) -> dict:
+    """Um exemplo de cada tipo de mensagem do protocolo"""
+    cache = {'epoch': 'a1b2', 'revision': 3, 'hash': 'f' * 64}
+    return {
+        # Cliente -> servidor
+        'register_gm': {'type': 'register_gm', 'room': 'mesa', 'codecs': ['msgpack', 'json'],
+                        'batch': True, 'cache': cache},
+        'register_player': {'type': 'register_player', 'name': 'Légolas', 'room': 'mesa',
+                            'codecs': ['cbor'], 'batch': False, 'cache': cache},
+        'update_world': {'type': 'update_world', 'world_data': world},
+        'patch_world': {'type': 'patch_world', 'base_revision': 3, 'ops': OPS},
+        'request_snapshot': {'type': 'request_snapshot', 'revision': 3},
+        'chat_message': {'type': 'chat_message', 'sender': 'Gimli', 'message': 'Olá, mesa! ⚔',
+                         'timestamp': 1700000000.25},
+        'dice_roll': {'type': 'dice_roll', 'sender': 'Gimli', 'dice': '2d20kh1+5', 'times': 3},
+        'character_update': {'type': 'character_update', 'sender': 'Aragorn', 'character': CHARACTER},
+        'resume': {'type': 'resume', 'session': 'token', 'seq': 17, 'revision': 3, 'epoch': 'a1b2',
+                   'codecs': ['msgpack'], 'batch': True},
+        'stats': {'type': 'stats'},
+        'ping': {'type': 'ping'},
+        # Servidor -> cliente
+        'registration_success': {'type': 'registration_success', 'role': 'player', 'name': 'Légolas',
+                                 'room': 'mesa', 'codec': 'msgpack', 'session': 'token', 'seq': 0},
+        'resume_success': {'type': 'resume_success', 'role': 'gm', 'name': None, 'room': 'mesa',
+                           'codec': 'cbor', 'session': 'token'},
+        'resume_failed': {'type': 'resume_failed'},
+        'resync': {'type': 'resync', 'seq': 40},
+        'world_data': {'type': 'world_data', 'data': world, 'revision': 1, 'epoch': 'a1b2', 'room': 'mesa'},
+        'world_updated': {'type': 'world_updated', 'data': world, 'revision': 2, 'epoch': 'a1b2'},
+        'world_patch': {'type': 'world_patch', 'base_revision': 3, 'revision': 4, 'ops': OPS, 'epoch': 'a1b2'},
+        'world_not_modified': {'type': 'world_not_modified', 'revision': 3, 'epoch': 'a1b2', 'room': 'mesa'},
+        'patch_rejected': {'type': 'patch_rejected', 'reason': 'stale', 'revision': 4},
+        'dice_roll_result': {'type': 'dice_roll', 'sender': 'Gimli', 'dice': '2d20kh1+5',
+                             'result': 19, 'rolls': [[14, 3]]},
+        'stats_result': {'type': 'stats', 'rooms': {'mesa': {'clients': 3, 'revision': 4}},
+                         'uptime': 12.5, 'clients': [{'remote': '127.0.0.1', 'queue': 0}]},
+        'pong': {'type': 'pong'},
+        'error': {'type': 'error', 'message_type': 'dice_roll', 'error': 'Expressão inválida'},
+    }
+
+
+def check_round_trip(messages: dict):
+    """encode/decode de cada mensagem e de um batch com todas, em cada codec"""
+    for name, codec in CODECS.items():
+        frames = []
+        for msg_name, message in messages.items():
+            frame = codec.encode(message)
+            assert decode_frame(frame, codec) == message, f"{name}: {msg_name}"
+            frames.append(frame)
+        batch = decode_frame(codec.encode_batch(frames), codec)
+        assert batch == {'type': 'batch', 'messages': list(messages.values())}, f"{name}: batch"
+    print(f"Ida e volta: {len(messages)} tipos de mensagem + batch ok em {', '.join(CODECS)}")
+
+
+def check_binary_values_rejected():
+    """bytes aceitos de um cliente quebrariam o broadcast para clientes JSON"""
+    message = {'type': 'chat_message', 'sender': 'x', 'message': b'\x00\x01'}
+    for name, codec in CODECS.items():
+        if codec is JSON_CODEC:
+            continue
+        try:
+            decode_frame(codec.encode(message), codec)
+        except CodecError:
+            continue
+        raise AssertionError(f"{name}: bytes aceitos")
+    print("Valores binários recusados na entrada")
+
+
+def measure(codec, message: dict, repeat: int):
+    frame = codec.encode(message)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        codec.encode(message)
+    encode_time = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        codec.decode(frame)
+    decode_time = (time.perf_counter() - start) / repeat
+    return len(frame), encode_time, decode_time
+
+
+def main(num_items: int):
+    world = world_payload(build_world(num_items))
+    check_round_trip(sample_messages(world_payload(build_world(20, 5, 3))))
+    check_binary_values_rejected()
+
+    messages = {
+        'world_data': {'type': 'world_data', 'data': world, 'revision': 1},
+        'character_update': {
+            'type': 'character_update', 'sender': 'Aragorn',
+            'character': {'name': 'Aragorn', 'hp': 42, 'attributes': {'strength': 16, 'dexterity': 14},
+                          'conditions': ['Poisoned'], 'position': [12, 7]}
+        },
+    }
+
+    print(f"\nMundo com {num_items} equipamentos")
+    for msg_name, message in messages.items():
+        repeat = 20 if msg_name == 'world_data' else 20000
+        print(f"\n{msg_name}:")
+        for name, codec in CODECS.items():
+            size, enc, dec = measure(codec, message, repeat)
+            print(f"  {name:8s} {size:10d} bytes  encode {enc * 1e6:10.1f} µs  decode {dec * 1e6:10.1f} µs")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,140 @@
+"""
+Benchmark: condições ativas em lista vs ActiveConditions (src/models/conditions.py)
+
+Estresse: uma entidade com centenas de condições aplicadas, empilhadas,
+removidas e atualizadas por rodada, com lista comum e com ActiveConditions.
+Antes, confere a remoção de incompatíveis (condições incompatíveis
+adjacentes na lista eram puladas ao remover durante a iteração),
+empilhamento e expiração, e a interface de lista de ActiveConditions.
+
+Uso:
+    python benchmarks/bench_conditions.py [condições] [rodadas]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.conditions import (
+    ActiveConditions, Condition, ConditionSeverity, ConditionSystem, StatusCondition
+)
+
+
+def check_incompatibility_removal():
+    system = ConditionSystem()
+    system.add_condition(Condition(
+        "Cleansed", ConditionSeverity.MINOR, "Purificado",
+        incompatible_with=["Poisoned", "Bleeding", "Burning"]
+    ))
+    system.add_condition(Condition("Hasted", ConditionSeverity.MINOR, "Acelerado", incompatible_with=["Slowed"]))
+    system.add_condition(Condition("Slowed", ConditionSeverity.MINOR, "Lento"))
+
+    for container in (list, ActiveConditions):
+        active = container([
+            StatusCondition("Poisoned", 3), StatusCondition("Bleeding", 3),
+            StatusCondition("Burning", 3), StatusCondition("Blinded", 2),
+        ])
+        system.apply_condition(active, "Cleansed")
+        names = [status.condition_name for status in active]
+        assert names == ["Blinded", "Cleansed"], names
+
+        # Incompatibilidade nos dois sentidos
+        system.apply_condition(active, "Hasted")
+        system.apply_condition(active, "Slowed")
+        names = [status.condition_name for status in active]
+        assert names == ["Blinded", "Cleansed", "Slowed"], names
+    print("Remoção de incompatíveis: ok (lista e ActiveConditions)")
+
+
+def check_stacking_and_expiry():
+    system = ConditionSystem()
+    for container in (list, ActiveConditions):
+        active = container()
+        for _ in range(7):
+            system.apply_condition(active, "Poisoned", duration=1)
+        assert [(s.condition_name, s.stacks) for s in active] == [("Poisoned", 5)]
+        assert system.remove_condition(active, "Poisoned")
+        assert active[0].stacks == 4
+        effects = system.update_conditions(active)
+        assert effects == [{'type': 'damage', 'amount': 20, 'source': 'Poisoned'}], effects
+        assert len(active) == 0
+        assert not system.remove_condition(active, "Poisoned")
+    print("Empilhamento e expiração: ok (lista e ActiveConditions)")
+
+
+def check_list_interface():
+    def names(active):
+        return [status.condition_name for status in active]
+
+    active = ActiveConditions([StatusCondition(name, 1) for name in "ABC"])
+    active.reverse()
+    assert names(active) == ["C", "B", "A"] and names(reversed(active)) == ["A", "B", "C"]
+    active.sort()
+    assert names(active) == ["A", "B", "C"]
+    active.sort(key=lambda status: status.condition_name, reverse=True)
+    assert names(active) == ["C", "B", "A"]
+
+    # Nomes repetidos em outra posição: ValueError sem alterar o conteúdo
+    for operation in (lambda: active.__setitem__(0, StatusCondition("A", 2)),
+                      lambda: active.insert(1, StatusCondition("C", 2)),
+                      lambda: active.__setitem__(slice(0, 1), [StatusCondition("X", 1)] * 2)):
+        try:
+            operation()
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("nome repetido aceito")
+        assert names(active) == ["C", "B", "A"]
+
+    active[0] = StatusCondition("C", 9)  # mesma posição: substitui
+    active.append(StatusCondition("B", 7))  # já ativa: substitui no lugar
+    assert names(active) == ["C", "B", "A"] and active.get("B").remaining_duration == 7
+    del active[1]
+    active.insert(0, StatusCondition("D", 1))
+    assert names(active) == ["D", "C", "A"] and active.index(active.get("A")) == 2
+    assert active.pop().condition_name == "A" and active.pop(0).condition_name == "D"
+    assert active == [StatusCondition("C", 9)]
+    print("Interface de lista: ok")
+
+
+def stress(system: ConditionSystem, names, container, rounds: int, seed: int) -> float:
+    rng = random.Random(seed)
+    active = container()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for name in rng.sample(names, len(names) // 4):
+            system.apply_condition(active, name, duration=rng.randint(1, 4))
+        for name in rng.sample(names, len(names) // 10):
+            system.remove_condition(active, name)
+        system.update_conditions(active)
+    elapsed = time.perf_counter() - start
+    return elapsed, [(s.condition_name, s.stacks, s.remaining_duration) for s in active]
+
+
+def main(count: int, rounds: int):
+    check_incompatibility_removal()
+    check_stacking_and_expiry()
+    check_list_interface()
+
+    system = ConditionSystem()
+    names = [f"Condição {i}" for i in range(count)]
+    for i, name in enumerate(names):
+        system.add_condition(Condition(
+            name, ConditionSeverity.MINOR, "", can_stack=i % 2 == 0, max_stacks=5,
+            incompatible_with=[names[i - 1]] if i % 7 == 0 else []
+        ))
+
+    print(f"{count} condições, {rounds} rodadas")
+    results = {}
+    for label, container in (('lista', list), ('ActiveConditions', ActiveConditions)):
+        elapsed, results[label] = stress(system, names, container, rounds, seed=7)
+        print(f"  {label:<18} {elapsed * 1000:8.1f} ms")
+    assert results['lista'] == results['ActiveConditions']
+
+
+if __name__ == "__main__":
+    conditions = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    main(conditions, rounds)
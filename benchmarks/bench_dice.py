@@ -0,0 +1,69 @@
+"""
+Benchmark: rolagens por segundo do motor de dados
+
+Compara rolagens simples (expressão em cache vs. recompilada), rolagens em
+lote (NumPy vs. laço em Python) e confere a reprodutibilidade por semente.
+
+Uso:
+    python benchmarks/bench_dice.py [repeticoes]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import dice
+from src.models.dice import DiceRoller, parse_dice
+
+
+def rate(label: str, calls: int, rolls_per_call: int, fn):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<34} {calls * rolls_per_call / elapsed:12,.0f} rolagens/s")
+
+
+def check_reproducible():
+    """Mesma semente e mesma sequência de chamadas -> mesmos resultados"""
+    def sequence(seed):
+        roller = DiceRoller(seed)
+        return (
+            [roller.roll(expr).total for expr in ('1d20adv', '4d6kh3', '3d6!', '2d6+3', '1d%')]
+            + roller.roll_many('40d6', 12)
+            + roller.roll_many('1d20dis+5', 200)
+        )
+    first, second, other = sequence(2024), sequence(2024), sequence(2025)
+    assert first == second, "Rolagens com a mesma semente divergiram"
+    assert first != other, "Sementes diferentes produziram a mesma sequência"
+    print("  reprodutibilidade por semente:     ok")
+
+
+def main(repeat: int):
+    roller = DiceRoller(1)
+    expression = '2d20kh1+1d8!+5'
+
+    print("Rolagens simples:")
+    rate("expressão em cache", repeat, 1, lambda: roller.roll(expression))
+    rate("recompilando a cada rolagem", repeat, 1,
+         lambda: (dice._parse_dice.cache_clear(), roller.roll(expression)))
+
+    print("Bola de fogo (40d6 em 12 alvos):")
+    fireball = parse_dice('40d6')
+    calls = max(1, repeat // 20)
+    rate("lote (NumPy)" if dice.np is not None else "lote (NumPy indisponível)", calls, 12,
+         lambda: roller.roll_many(fireball, 12))
+    rate("laço em Python", calls, 12, lambda: [roller.roll(fireball).total for _ in range(12)])
+
+    print("Muitas rolagens de ataque (1d20adv x 1000):")
+    attack = parse_dice('1d20adv+7')
+    calls = max(1, repeat // 200)
+    rate("lote (NumPy)", calls, 1000, lambda: roller.roll_many(attack, 1000))
+    rate("laço em Python", calls, 1000, lambda: [roller.roll(attack).total for _ in range(1000)])
+
+    check_reproducible()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
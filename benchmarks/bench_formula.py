@@ -0,0 +1,70 @@
+"""
+Benchmark: avaliação de fórmulas de atributos secundários (src/models/formula.py)
+
+Compara a fórmula compilada com eval() do mesmo texto (pré-compilado) e
+mede AttributeSystem.calculate_secondary. Ao final confere que expressões
+inseguras são rejeitadas com FormulaError.
+
+Uso:
+    python benchmarks/bench_formula.py [avaliações]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models.attributes import AttributeSystem, SecondaryAttribute
+from src.models.formula import FormulaError, compile_formula
+
+FORMULA = "max(1, floor(constitution / 2) - 5) * level + strength * 2 + dexterity"
+VALUES = {'strength': 14, 'dexterity': 12, 'constitution': 16, 'level': 7}
+
+UNSAFE = (
+    "__import__('os').system('true')",
+    "().__class__.__bases__[0].__subclasses__()",
+    "open('/etc/passwd')",
+    "(lambda: 1)()",
+    "[x for x in range(10)]",
+    "strength.__class__",
+    "'a' * 1000000",
+    "_values",
+    "max(*strength)",
+    "round(strength, ndigits=2)",
+)
+
+
+def timed(label: str, fn, n: int):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<34} {elapsed:7.2f} s  {elapsed / n * 1e6:7.3f} µs/avaliação")
+
+
+def main(n: int):
+    print(f"{n} avaliações de {FORMULA!r}")
+    code = compile(FORMULA, '<eval>', 'eval')
+    namespace = {'max': max, 'floor': __import__('math').floor}
+    formula = compile_formula(FORMULA)
+
+    system = AttributeSystem()
+    system.add_secondary_attribute(SecondaryAttribute('hp', FORMULA, class_modifiers={'warrior': 1.5}))
+
+    assert formula(VALUES) == eval(code, namespace, dict(VALUES))
+    timed('eval (texto pré-compilado)', lambda: eval(code, namespace, dict(VALUES)), n)
+    timed('compile_formula (compilada)', lambda: formula(VALUES), n)
+    timed('calculate_secondary', lambda: system.calculate_secondary('hp', VALUES, 'warrior'), n)
+
+    print("Expressões inseguras:")
+    for text in UNSAFE:
+        try:
+            compile_formula(text)
+        except FormulaError as e:
+            print(f"  rejeitada  {text!r}: {e}")
+        else:
+            raise SystemExit(f"  ACEITA     {text!r}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
@@ -0,0 +1,90 @@
+"""
+Benchmark: bytes enviados na reconexão (novo registro vs. retomada de sessão)
+
+Um jogador cai (ex.: celular em repouso), perde algumas mensagens da sala
+e volta. Compara o tráfego de um novo registro (snapshot completo do mundo)
+com a retomada da sessão (apenas as mensagens perdidas).
+
+Uso:
+    python benchmarks/bench_resume.py [mensagens_perdidas] [itens_no_mundo]
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sample_world import build_world, world_payload
+from src.network.server import GameServer
+
+logging.disable(logging.INFO)
+
+
+class FakeSocket:
+    def __init__(self):
+        self.bytes_sent = 0
+        self.remote_address = ('fake', 0)
+
+    async def send(self, data, text=None):
+        self.bytes_sent += len(data)
+
+    async def close(self):
+        pass
+
+
+async def drain(server: GameServer):
+    while any(conn.depth for conn in server.clients.values()):
+        await asyncio.sleep(0)
+
+
+async def reconnect_bytes(server: GameServer, message: dict) -> int:
+    socket = FakeSocket()
+    await server.register_client(socket)
+    await server.handle_message(socket, json.dumps(message))
+    await drain(server)
+    return socket.bytes_sent
+
+
+async def main(missed: int, num_items: int):
+    server = GameServer(max_queue=max(256, missed * 2), history_size=max(512, missed))
+    gm = FakeSocket()
+    await server.register_client(gm)
+    await server.handle_message(gm, json.dumps({'type': 'register_gm', 'codecs': ['json']}))
+    await server.handle_message(gm, json.dumps({
+        'type': 'update_world', 'world_data': world_payload(build_world(num_items=num_items))
+    }))
+
+    player = FakeSocket()
+    await server.register_client(player)
+    await server.handle_message(player, json.dumps({'type': 'register_player', 'name': 'A', 'codecs': ['json']}))
+    await drain(server)
+    connection = server.clients[player]
+    session, last_seq = connection.session, connection.room.seq
+    revision = connection.room.world_revision
+    await server.unregister_client(player)
+
+    for i in range(missed):
+        await server.handle_message(gm, json.dumps({
+            'type': 'chat_message', 'sender': 'Mestre', 'message': f'O dragão ataca ({i})!'
+        }))
+        await server.handle_message(gm, json.dumps({
+            'type': 'patch_world', 'base_revision': revision,
+            'ops': [{'op': 'replace', 'path': '/metadata/name', 'value': f'Mundo {i}'}]
+        }))
+        revision += 1
+
+    full = await reconnect_bytes(server, {'type': 'register_player', 'name': 'A', 'codecs': ['json']})
+    resumed = await reconnect_bytes(server, {
+        'type': 'resume', 'session': session, 'seq': last_seq, 'revision': revision - missed, 'codecs': ['json']
+    })
+    print(f"{missed * 2} mensagens perdidas, mundo com {num_items} itens")
+    print(f"  novo registro (snapshot): {full / 1024:10.1f} KiB")
+    print(f"  retomada de sessão:       {resumed / 1024:10.1f} KiB")
+
+
+if __name__ == "__main__":
+    missed_messages = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    items = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    asyncio.run(main(missed_messages, items))
@@ -0,0 +1,135 @@
+"""
+Benchmark: vazão de mensagens com salas distribuídas entre N workers
+
+Cada sala tem um remetente e alguns ouvintes; os clientes se conectam ao
+roteador (que redireciona para o worker da sala) e a carga é gerada por
+vários processos para que o cliente não seja o gargalo. Mede mensagens
+entregues por segundo para cada quantidade de workers.
+
+Uso:
+    python benchmarks/bench_rooms.py [num_salas] [ouvintes_por_sala] [segundos] [workers...]
+"""
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import websockets
+
+from src.network.cluster import GameCluster, RoomRouter
+
+logging.disable(logging.INFO)
+
+BASE_PORT = 5700
+GENERATORS = 4  # Processos geradores de carga
+
+
+async def _register(uri: str, name: str):
+    websocket = await websockets.connect(uri)
+    await websocket.send(json.dumps({'type': 'register_player', 'name': name, 'codecs': ['json']}))
+    await websocket.recv()  # registration_success
+    return websocket
+
+
+async def _run_rooms(port: int, rooms, listeners: int, duration: float, start_at: float) -> int:
+    """Conecta as salas deste gerador e conta mensagens entregues aos ouvintes"""
+    received = 0
+
+    async def listen(websocket):
+        nonlocal received
+        try:
+            async for _ in websocket:
+                received += 1
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    async def send(websocket, room_id):
+        message = json.dumps({'type': 'chat_message', 'sender': room_id, 'message': 'x' * 64})
+        deadline = start_at + duration
+        while time.time() < deadline:
+            await websocket.send(message)
+            await asyncio.sleep(0)
+
+    senders, listen_tasks = [], []
+    for room_id in rooms:
+        uri = f"ws://localhost:{port}/{room_id}"
+        senders.append((await _register(uri, f"{room_id}-gm"), room_id))
+        for i in range(listeners):
+            listen_tasks.append(asyncio.ensure_future(listen(await _register(uri, f"{room_id}-{i}"))))
+
+    await asyncio.sleep(max(0.0, start_at - time.time()))
+    # Só conta o que chegar durante a janela de medição
+    received = 0
+    await asyncio.gather(*(send(websocket, room_id) for websocket, room_id in senders))
+    total = received
+    for task in listen_tasks:
+        task.cancel()
+    for websocket, _ in senders:
+        await websocket.close()
+    return total
+
+
+def _generator(port, rooms, listeners, duration, start_at, results):
+    logging.disable(logging.INFO)
+    results.put(asyncio.run(_run_rooms(port, rooms, listeners, duration, start_at)))
+
+
+def _router(port, worker_ports):
+    logging.disable(logging.INFO)
+    asyncio.run(RoomRouter('localhost', port, worker_ports).start())
+
+
+def run_case(num_workers: int, num_rooms: int, listeners: int, duration: float) -> float:
+    port = BASE_PORT + num_workers * 10
+    cluster = GameCluster(port=port, num_workers=num_workers)
+    cluster.start_workers()
+    router = multiprocessing.Process(
+        target=_router, args=(port, cluster.worker_ports), daemon=True
+    )
+    router.start()
+    time.sleep(1.0)
+
+    rooms = [f"mesa{i}" for i in range(num_rooms)]
+    start_at = time.time() + 2.0 + num_rooms * listeners * 0.005
+    results = multiprocessing.Queue()
+    generators = [
+        multiprocessing.Process(
+            target=_generator,
+            args=(port, rooms[i::GENERATORS], listeners, duration, start_at, results)
+        )
+        for i in range(GENERATORS)
+    ]
+    for process in generators:
+        process.start()
+    total = sum(results.get() for _ in generators)
+    for process in generators:
+        process.join()
+
+    router.terminate()
+    router.join()
+    cluster.stop_workers()
+    return total / duration
+
+
+def main():
+    num_rooms = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    listeners = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    duration = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+    worker_counts = [int(n) for n in sys.argv[4:]] or [1, 2, 4]
+
+    print(f"{num_rooms} salas x {listeners} ouvintes, {duration:.0f}s por caso "
+          f"({multiprocessing.cpu_count()} CPUs)")
+    baseline = None
+    for num_workers in worker_counts:
+        throughput = run_case(num_workers, num_rooms, listeners, duration)
+        baseline = baseline or throughput
+        print(f"  {num_workers} worker(s): {throughput:10.0f} msg/s  ({throughput / baseline:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: serialização dos sistemas de regras (src/models/serialization.py)
+
+Mede to_json/from_json do catálogo de equipamentos e talentos de um mundo
+sintético, indentado e compacto, com o json da biblioteca padrão e com
+orjson (se instalado). A linha "asdict" mostra a conversão por reflexão
+(dataclasses.asdict) para comparar com os codificadores gerados.
+
+Uso:
+    python benchmarks/bench_serialization.py [itens] [talentos]
+"""
+import dataclasses
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sample_world import build_world
+
+from src.models import serialization
+from src.models.equipment import EquipmentSystem
+from src.models.talents import TalentSystem
+
+
+def best_of(fn, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(num_items: int, num_talents: int):
+    world = build_world(num_items=num_items, num_talents=num_talents)
+    systems = (('equipment', world.equipment, EquipmentSystem), ('talents', world.talents, TalentSystem))
+    backends = [('json', None)]
+    if serialization.orjson is not None:
+        backends.append(('orjson', serialization.orjson))
+    else:
+        print("orjson não instalado: apenas json da biblioteca padrão")
+
+    print(f"Mundo com {num_items} itens e {num_talents} talentos")
+    items = list(world.equipment.equipment_database.values())
+    print(f"  {'encode gerado':<28} {best_of(lambda: [serialization.encode(i) for i in items]) * 1000:8.1f} ms")
+    print(f"  {'dataclasses.asdict':<28} {best_of(lambda: [dataclasses.asdict(i) for i in items]) * 1000:8.1f} ms")
+
+    original = serialization.orjson
+    try:
+        for backend, module in backends:
+            serialization.orjson = module
+            for compact in (False, True):
+                mode = 'compacto' if compact else 'indentado'
+                for name, system, cls in systems:
+                    text = system.to_json(compact=compact)
+                    dump = best_of(lambda: system.to_json(compact=compact))
+                    load = best_of(lambda: cls.from_json(text))
+                    label = f"{backend}, {mode}, {name}"
+                    print(f"  {label:<28} to_json {dump * 1000:8.1f} ms  from_json {load * 1000:8.1f} ms"
+                          f"  {len(text.encode('utf-8')) / 2 ** 20:6.1f} MiB")
+    finally:
+        serialization.orjson = original
+
+
+if __name__ == "__main__":
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    talents = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    main(items, talents)
@@ -0,0 +1,60 @@
+"""
+Benchmark: carregar equipment.json inteiro (from_json) vs item a item
+(load_from_file, src/models/streaming.py)
+
+Mostra tempo e pico de memória alocada (tracemalloc) de cada caminho.
+
+Uso:
+    python benchmarks/bench_streaming_load.py [itens]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sample_world import build_world
+
+from src.models.equipment import EquipmentSystem
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main(num_items: int):
+    directory = tempfile.mkdtemp(prefix='bardgame-stream-')
+    try:
+        path = os.path.join(directory, 'equipment.json')
+        build_world(num_items=num_items, num_talents=0).equipment.save_to_file(path)
+        print(f"equipment.json com {num_items} itens: {os.path.getsize(path) / 2 ** 20:.1f} MiB")
+
+        def whole():
+            with open(path, 'r', encoding='utf-8') as f:
+                return EquipmentSystem.from_json(f.read())
+
+        updates = []
+        for label, fn in (
+            ('from_json (arquivo inteiro)', whole),
+            ('load_from_file (item a item)', lambda: EquipmentSystem.load_from_file(
+                path, lambda read, total: updates.append(read))),
+        ):
+            system, elapsed, peak = measure(fn)
+            print(f"  {label:<30} {elapsed * 1000:8.1f} ms  pico {peak / 2 ** 20:7.1f} MiB"
+                  f"  ({len(system.equipment_database)} itens)")
+        print(f"  chamadas de progresso: {len(updates)}")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
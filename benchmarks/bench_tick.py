@@ -0,0 +1,94 @@
+"""
+Benchmark: rajada de character_update com envio imediato vs. modo tick
+
+Simula um combate: cada jogador envia várias atualizações de HP/posição
+dos seus personagens em sequência. Compara frames escritos, bytes e tempo
+de CPU do servidor entre o envio imediato e o modo tick (com batch).
+
+Uso:
+    python benchmarks/bench_tick.py [num_clientes] [atualizacoes_por_cliente] [tick_ms]
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.network.server import GameServer
+
+logging.disable(logging.INFO)
+
+CHARACTERS_PER_CLIENT = 3
+
+
+class FakeSocket:
+    """Conta frames e bytes enviados; cada envio custa uma chamada de escrita"""
+
+    def __init__(self):
+        self.frames = 0
+        self.bytes_sent = 0
+        self.remote_address = ('fake', 0)
+
+    async def send(self, data, text=None):
+        self.frames += 1
+        self.bytes_sent += len(data)
+        await asyncio.sleep(0)  # Cede o loop como uma escrita real
+
+
+async def run_case(num_clients: int, updates: int, tick_interval):
+    server = GameServer(max_queue=updates * num_clients, tick_interval=tick_interval)
+    sockets = [FakeSocket() for _ in range(num_clients)]
+    for i, socket in enumerate(sockets):
+        await server.register_client(socket)
+        await server.handle_message(socket, json.dumps({
+            'type': 'register_player', 'name': f'Jogador {i}', 'codecs': ['json'], 'batch': True
+        }))
+    await asyncio.sleep(0.1)
+    for socket in sockets:
+        socket.frames = socket.bytes_sent = 0
+
+    frames_in = [
+        (socket, json.dumps({
+            'type': 'character_update',
+            'sender': f'Jogador {i}',
+            'character': {'name': f'Personagem {i}-{n % CHARACTERS_PER_CLIENT}', 'hp': n, 'x': n, 'y': -n}
+        }))
+        for n in range(updates)
+        for i, socket in enumerate(sockets)
+    ]
+
+    cpu = time.process_time()
+    start = time.perf_counter()
+    for k, (socket, frame) in enumerate(frames_in):
+        await server.handle_message(socket, frame)
+        if k % 20 == 19:
+            await asyncio.sleep(0.001)  # Rajada: ~20 mensagens por milissegundo
+    while any(conn.depth for conn in server.clients.values()):
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu
+
+    frames = sum(socket.frames for socket in sockets)
+    sent_bytes = sum(socket.bytes_sent for socket in sockets)
+    coalesced = sum(conn.coalesced for conn in server.clients.values())
+    for socket in sockets:
+        await server.unregister_client(socket)
+    return frames, sent_bytes, coalesced, cpu, elapsed
+
+
+async def main(num_clients: int, updates: int, tick_ms: float):
+    print(f"{num_clients} clientes x {updates} atualizações ({updates * num_clients} recebidas)")
+    for label, tick in (('imediato', None), (f'tick {tick_ms:.0f} ms', tick_ms / 1000)):
+        frames, sent_bytes, coalesced, cpu, elapsed = await run_case(num_clients, updates, tick)
+        print(f"  {label:>10}: {frames:7d} frames, {sent_bytes / 1024:8.1f} KiB, "
+              f"{coalesced:6d} agrupadas, CPU {cpu * 1000:7.1f} ms, {elapsed:5.2f} s")
+
+
+if __name__ == "__main__":
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    per_client = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    tick = float(sys.argv[3]) if len(sys.argv) > 3 else 30
+    asyncio.run(main(clients, per_client, tick))
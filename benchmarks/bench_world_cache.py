@@ -0,0 +1,93 @@
+"""
+Benchmark: bytes enviados na entrada de um jogador com e sem cache do mundo
+
+Compara a entrada sem cache (snapshot completo), com o mundo em cache ainda
+atual (`world_not_modified`) e com o cache algumas revisões atrás (apenas
+os patches desde então).
+
+Uso:
+    python benchmarks/bench_world_cache.py [itens_no_mundo] [patches]
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sample_world import build_world, world_payload
+from src.network.server import GameServer
+from src.network.world_sync import world_hash
+
+logging.disable(logging.INFO)
+
+
+class FakeSocket:
+    def __init__(self):
+        self.bytes_sent = 0
+        self.remote_address = ('fake', 0)
+
+    async def send(self, data, text=None):
+        self.bytes_sent += len(data)
+
+    async def close(self):
+        pass
+
+
+async def drain(server: GameServer):
+    while any(conn.depth for conn in server.clients.values()):
+        await asyncio.sleep(0)
+
+
+async def join(server: GameServer, cache=None):
+    socket = FakeSocket()
+    await server.register_client(socket)
+    message = {'type': 'register_player', 'name': 'A', 'codecs': ['json']}
+    if cache is not None:
+        message['cache'] = cache
+    start = time.perf_counter()
+    await server.handle_message(socket, json.dumps(message))
+    await drain(server)
+    elapsed = time.perf_counter() - start
+    await server.unregister_client(socket)
+    return socket.bytes_sent, elapsed
+
+
+async def main(num_items: int, patches: int):
+    server = GameServer(max_queue=1024)
+    gm = FakeSocket()
+    await server.register_client(gm)
+    await server.handle_message(gm, json.dumps({'type': 'register_gm', 'codecs': ['json']}))
+    world = world_payload(build_world(num_items=num_items))
+    await server.handle_message(gm, json.dumps({'type': 'update_world', 'world_data': world}))
+    room = server.rooms['default']
+
+    cached = {'epoch': room.world_epoch, 'revision': room.world_revision, 'hash': world_hash(world)}
+    # Outro dia, outro processo: época diferente, mas o conteúdo é o mesmo
+    by_hash = dict(cached, epoch='outra-sessao', revision=1)
+    for i in range(patches):
+        await server.handle_message(gm, json.dumps({
+            'type': 'patch_world', 'base_revision': room.world_revision,
+            'ops': [{'op': 'replace', 'path': '/metadata/name', 'value': f'Mundo {i}'}]
+        }))
+    current = {'epoch': room.world_epoch, 'revision': room.world_revision, 'hash': room.world_hash()}
+    same_content = dict(current, epoch='outra-sessao', revision=1)
+
+    print(f"Mundo com {num_items} itens, cache {patches} revisões atrás")
+    for label, cache in (
+        ('sem cache (snapshot)', None),
+        ('cache atual (mesma época)', current),
+        ('cache atual (outro processo)', same_content),
+        (f'cache {patches} revisões atrás', cached),
+        ('cache antigo de outro processo', by_hash),
+    ):
+        sent, elapsed = await join(server, cache)
+        print(f"  {label:<32} {sent / 1024:10.1f} KiB  {elapsed * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    patch_count = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    asyncio.run(main(items, patch_count))
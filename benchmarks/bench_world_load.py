@@ -0,0 +1,70 @@
+"""
+Benchmark: "Carregar Mundo" com carregamento preguiçoso dos sistemas
+
+Compara abrir o mundo e montar o resumo (lido do manifest.json) com
+materializar todos os sistemas de regras, como o carregamento fazia antes,
+na pasta do mundo e no pacote de arquivo único (.bardworld).
+
+Uso:
+    python benchmarks/bench_world_load.py [itens] [talentos]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sample_world import build_world
+from src.core.world_manager import SYSTEMS, WorldManager
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(num_items: int, num_talents: int):
+    directory = tempfile.mkdtemp(prefix='bardgame-load-')
+    try:
+        world = build_world(num_items=num_items, num_talents=num_talents)
+        world_path = world.save_world(directory)
+        pack_path = world.save_packed(os.path.join(directory, 'mundo.bardworld'))
+
+        def lazy(path):
+            WorldManager.load_world(path).export_world_summary()
+
+        def eager(path):
+            loaded = WorldManager.load_world(path)
+            for name, _, _ in SYSTEMS:
+                getattr(loaded, name)
+            loaded.export_world_summary()
+
+        folder_size = sum(
+            os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(world_path) for f in files
+        )
+        print(f"Mundo com {num_items} itens e {num_talents} talentos")
+        print(f"  pasta: {folder_size / 1024:.0f} KiB, pacote: {os.path.getsize(pack_path) / 1024:.0f} KiB")
+        for label, fn, path in (
+            ('pasta, preguiçoso + manifest', lazy, world_path),
+            ('pasta, todos os sistemas', eager, world_path),
+            ('pacote, preguiçoso + manifest', lazy, pack_path),
+            ('pacote, todos os sistemas', eager, pack_path),
+        ):
+            elapsed, peak = measure(lambda: fn(path))
+            print(f"  {label:<32} {elapsed * 1000:8.1f} ms  pico {peak / 2 ** 20:6.1f} MiB")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    talents = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    main(items, talents)
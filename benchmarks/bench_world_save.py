@@ -0,0 +1,67 @@
+"""
+Benchmark: salvamento do mundo (sequencial vs. paralelo e atômico)
+
+Compara o salvamento sistema a sistema (`save_to_file` de cada um, como era
+feito antes) com o `WorldManager.save_world` paralelo, mostra o tempo de
+cada sistema e o salvamento incremental depois de alterar uma única moeda.
+
+Uso:
+    python benchmarks/bench_world_save.py [itens] [talentos] [repeticoes]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sample_world import build_world
+from src.core.world_manager import SYSTEMS
+from src.models import Currency
+
+
+def save_sequential(world, directory: str):
+    rules_dir = os.path.join(directory, 'sequencial', 'rules')
+    os.makedirs(rules_dir, exist_ok=True)
+    for name, _, filename in SYSTEMS:
+        getattr(world, name).save_to_file(os.path.join(rules_dir, filename))
+
+
+def best_of(repeat: int, fn) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(num_items: int, num_talents: int, repeat: int):
+    world = build_world(num_items=num_items, num_talents=num_talents)
+    directory = tempfile.mkdtemp(prefix='bardgame-save-')
+    try:
+        sequential = best_of(repeat, lambda: save_sequential(world, directory))
+        parallel = best_of(repeat, lambda: world.save_world(directory, full=True))
+        timings = dict(world.last_save_timings)
+        counter = iter(range(10 ** 9))
+        incremental = best_of(repeat, lambda: (
+            world.currency.add_currency(Currency(f"Gema {next(counter)}", "gm", 5000, 0.01, "")),
+            world.save_world(directory)
+        ))
+        print(f"Mundo com {num_items} itens e {num_talents} talentos (melhor de {repeat})")
+        print(f"  sequencial, direto nos arquivos: {sequential * 1000:8.1f} ms")
+        print(f"  paralelo + renomeação atômica:   {parallel * 1000:8.1f} ms")
+        print(f"  incremental (uma moeda nova):    {incremental * 1000:8.1f} ms")
+        print("  por sistema (salvamento completo):")
+        for name, seconds in sorted(timings.items(), key=lambda item: -item[1]):
+            print(f"    {name:<16} {seconds * 1000:8.1f} ms")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    items = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    talents = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    repetitions = int(sys.argv[3]) if len(sys.argv) > 3 else 3
+    main(items, talents, repetitions)
@@ -0,0 +1,478 @@
+"""
+Teste de carga do GameServer com jogadores e GMs simulados
+
+Sobe um servidor local em um processo separado (para medir CPU e memória
+dele), conecta N clientes GameClient por sala e gera uma mistura
+configurável de chat, dados, character_update e update_world. Ao final
+imprime (ou grava) um relatório JSON com vazão, latência ponta a ponta
+(p50/p95/p99) e uso de recursos do servidor, para comparar versões.
+
+Uso:
+    python benchmarks/loadtest.py --rooms 4 --players 10 --duration 20 --output relatorio.json
+    python benchmarks/loadtest.py --compare base.json --output novo.json
+    python benchmarks/loadtest.py --url ws://192.168.0.10:5000   # servidor externo (sem métricas)
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.network.client import GameClient
+from src.network.server import GameServer
+
+try:
+    import psutil
+except ImportError:  # pragma: no cover - dependência opcional
+    psutil = None
+
+DEFAULT_MIX = 'chat=4,dice=2,character_update=10,update_world=1'
+MESSAGE_KINDS = ('chat', 'dice', 'character_update', 'update_world')
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """'chat=4,dice=2' -> {'chat': 4.0, 'dice': 2.0}"""
+    mix = {}
+    for part in filter(None, (p.strip() for p in text.split(','))):
+        kind, _, weight = part.partition('=')
+        if kind not in MESSAGE_KINDS:
+            raise ValueError(f"Tipo desconhecido na mistura: {kind}")
+        mix[kind] = float(weight or 1)
+    return mix
+
+
+def percentiles(samples: List[float]) -> Dict:
+    """Percentis exatos (em ms) de uma lista de latências em segundos"""
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+
+    def at(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+    return {
+        'count': len(ordered),
+        'mean_ms': sum(ordered) / len(ordered) * 1000,
+        'p50_ms': at(0.50),
+        'p95_ms': at(0.95),
+        'p99_ms': at(0.99),
+        'max_ms': ordered[-1] * 1000,
+    }
+
+
+# --- Servidor ---------------------------------------------------------------
+
+def _serve(host: str, port: int, options: Dict):
+    logging.disable(logging.INFO)
+    GameServer(host, port, **options).run()
+
+
+def process_usage(pid: int) -> Tuple[Optional[float], Optional[int]]:
+    """(segundos de CPU, RSS em bytes) de um processo; psutil ou /proc"""
+    if psutil is not None:
+        try:
+            process = psutil.Process(pid)
+            times = process.cpu_times()
+            return times.user + times.system, process.memory_info().rss
+        except psutil.Error:
+            return None, None
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        ticks = os.sysconf('SC_CLK_TCK')
+        cpu = (int(fields[11]) + int(fields[12])) / ticks
+        with open(f'/proc/{pid}/statm') as f:
+            rss = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        return cpu, rss
+    except (OSError, ValueError, IndexError):
+        return None, None
+
+
+class ResourceSampler:
+    """Amostra CPU e RSS do servidor durante o teste"""
+
+    def __init__(self, pid: Optional[int], interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.cpu_start: Optional[float] = None
+        self.cpu_end: Optional[float] = None
+        self.rss_peak = 0
+        self.rss_end: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self.pid is None:
+            return
+        self.cpu_start, _ = process_usage(self.pid)
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while True:
+            self._sample()
+            await asyncio.sleep(self.interval)
+
+    def _sample(self):
+        cpu, rss = process_usage(self.pid)
+        if rss is not None:
+            self.rss_peak = max(self.rss_peak, rss)
+            self.rss_end = rss
+        self.cpu_end = cpu
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._sample()
+
+    def report(self, elapsed: float) -> Optional[Dict]:
+        if self.pid is None or self.cpu_start is None or self.cpu_end is None:
+            return None
+        cpu_seconds = self.cpu_end - self.cpu_start
+        return {
+            'cpu_seconds': cpu_seconds,
+            'cpu_percent': cpu_seconds / elapsed * 100 if elapsed else 0.0,
+            'rss_peak_mb': self.rss_peak / 2 ** 20,
+            'rss_end_mb': (self.rss_end or 0) / 2 ** 20,
+        }
+
+
+# --- Clientes simulados -----------------------------------------------------
+
+class SimulatedClient:
+    """GameClient que envia uma mistura de mensagens e mede a latência do que recebe"""
+
+    def __init__(self, host: str, port: int, room: str, name: str, role: str,
+                 mix: Dict[str, float], rate: float, world_items: int, codecs: Optional[List[str]]):
+        self.client = GameClient(host, port, codecs=codecs, room=room)
+        self.name = name
+        self.role = role
+        kinds = [k for k in mix if role == 'gm' or k != 'update_world']
+        self.kinds = kinds
+        self.weights = [mix[k] for k in kinds]
+        self.rate = rate
+        self.world_items = world_items
+        self.latencies: Dict[str, List[float]] = {}
+        self.sent: Dict[str, int] = {}
+        self.received = 0
+        self.measuring = False
+
+        self.client.register_handler('chat_message', self._on_chat)
+        self.client.register_handler('dice_roll', self._on_other)
+        self.client.register_handler('character_update', self._on_character)
+        self.client.register_handler('world_updated', self._on_world)
+        self.client.register_handler('world_patch', self._on_world)
+        for msg_type in ('registration_success', 'world_data', 'pong', 'error', 'patch_rejected'):
+            self.client.register_handler(msg_type, lambda data: None)
+
+    def _observe(self, kind: str, sent_at: Optional[float]):
+        if not self.measuring:
+            return
+        self.received += 1
+        if sent_at is not None:
+            self.latencies.setdefault(kind, []).append(time.time() - sent_at)
+
+    def _on_chat(self, data: Dict):
+        self._observe('chat', data.get('timestamp'))
+
+    def _on_character(self, data: Dict):
+        self._observe('character_update', (data.get('character') or {}).get('sent_at'))
+
+    def _on_world(self, data: Dict):
+        self._observe('update_world', self.client.world_data.get('sent_at'))
+
+    def _on_other(self, data: Dict):
+        self._observe('dice', None)
+
+    async def start(self) -> bool:
+        if not await self.client.connect():
+            return False
+        if self.role == 'gm':
+            self.client.name = self.name
+            await self.client.register_as_gm()
+            await self.client.update_world(self._world(0))
+        else:
+            await self.client.register_as_player(self.name)
+        return True
+
+    def _world(self, tick: int) -> Dict:
+        world = {
+            'metadata': {'name': 'Mundo de Carga', 'tick': tick},
+            'sent_at': time.time(),
+            'items': {f'Item {i}': {'value': i, 'weight': 1.0} for i in range(self.world_items)},
+        }
+        world['items'][f'Item {tick % max(1, self.world_items)}'] = {'value': tick, 'weight': 2.0}
+        return world
+
+    async def send_loop(self, until: float):
+        interval = 1.0 / self.rate
+        tick = 0
+        # Desfasagem inicial para não sincronizar todos os clientes
+        await asyncio.sleep(random.random() * interval)
+        while time.time() < until and self.client.connected:
+            kind = random.choices(self.kinds, self.weights)[0]
+            tick += 1
+            if kind == 'chat':
+                await self.client.send_chat_message(f'Mensagem {tick} de {self.name}')
+            elif kind == 'dice':
+                await self.client.roll_dice('1d20', random.randint(1, 20))
+            elif kind == 'character_update':
+                await self.client.update_character({
+                    'name': f'{self.name} #{tick % 3}', 'hp': random.randint(0, 50), 'sent_at': time.time()
+                })
+            else:
+                await self.client.update_world(self._world(tick))
+            if self.measuring:
+                self.sent[kind] = self.sent.get(kind, 0) + 1
+            await asyncio.sleep(random.expovariate(1.0 / interval))
+
+
+async def run_clients(config: Dict, room_ids: List[str]) -> Dict:
+    """Roda os clientes das salas indicadas e devolve as amostras brutas"""
+    logging.disable(logging.INFO)
+    url = urlparse(config['url'])
+    mix = parse_mix(config['mix'])
+    clients: List[SimulatedClient] = []
+    for room in room_ids:
+        clients.append(SimulatedClient(
+            url.hostname, url.port, room, f'GM {room}', 'gm', mix,
+            config['gm_rate'], config['world_items'], config['codecs']
+        ))
+        clients.extend(
+            SimulatedClient(
+                url.hostname, url.port, room, f'{room}-P{i}', 'player', mix,
+                config['rate'], config['world_items'], config['codecs']
+            )
+            for i in range(config['players'])
+        )
+
+    connected = 0
+    for client in clients:
+        if await client.start():
+            connected += 1
+    receivers = [asyncio.ensure_future(c.client.receive_messages()) for c in clients if c.client.connected]
+
+    start_at = config['start_at']
+    await asyncio.sleep(max(0.0, start_at - time.time() - config['warmup']))
+    end_at = start_at + config['duration']
+    senders = [asyncio.ensure_future(c.send_loop(end_at)) for c in clients if c.client.connected]
+    await asyncio.sleep(max(0.0, start_at - time.time()))
+    for client in clients:
+        client.measuring = True
+    await asyncio.gather(*senders)
+    await asyncio.sleep(config['drain'])  # Entrega do que ainda está em trânsito
+    for client in clients:
+        client.measuring = False
+
+    for client in clients:
+        await client.client.disconnect()
+    for task in receivers:
+        task.cancel()
+
+    latencies: Dict[str, List[float]] = {}
+    sent: Dict[str, int] = {}
+    for client in clients:
+        for kind, samples in client.latencies.items():
+            latencies.setdefault(kind, []).extend(samples)
+        for kind, count in client.sent.items():
+            sent[kind] = sent.get(kind, 0) + count
+    return {
+        'clients': len(clients),
+        'connected': connected,
+        'sent': sent,
+        'received': sum(c.received for c in clients),
+        'latencies': latencies,
+    }
+
+
+def _client_process(config: Dict, room_ids: List[str], results):
+    results.put(asyncio.run(run_clients(config, room_ids)))
+
+
+# --- Orquestração -----------------------------------------------------------
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), check=True
+        ).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_loadtest(config: Dict, server_pid: Optional[int]) -> Dict:
+    rooms = [f'sala{i}' for i in range(config['rooms'])]
+    setup_time = 1.0 + 0.01 * config['rooms'] * (config['players'] + 1)
+    config['start_at'] = time.time() + config['warmup'] + setup_time
+
+    processes = max(1, min(config['client_processes'], len(rooms)))
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=_client_process, args=(config, rooms[i::processes], results))
+        for i in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+
+    sampler = ResourceSampler(server_pid)
+    await asyncio.sleep(max(0.0, config['start_at'] - time.time()))
+    sampler.start()
+    started = time.time()
+    await asyncio.sleep(config['duration'] + config['drain'])
+    elapsed = time.time() - started
+    sampler.stop()
+
+    loop = asyncio.get_running_loop()
+    parts = [await loop.run_in_executor(None, results.get) for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    latencies: Dict[str, List[float]] = {}
+    sent: Dict[str, int] = {}
+    for part in parts:
+        for kind, samples in part['latencies'].items():
+            latencies.setdefault(kind, []).extend(samples)
+        for kind, count in part['sent'].items():
+            sent[kind] = sent.get(kind, 0) + count
+    total_sent = sum(sent.values())
+    received = sum(part['received'] for part in parts)
+    everything = [sample for samples in latencies.values() for sample in samples]
+
+    return {
+        'version': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'config': {k: v for k, v in config.items() if k != 'start_at'},
+        'clients': {
+            'total': sum(part['clients'] for part in parts),
+            'connected': sum(part['connected'] for part in parts),
+        },
+        'throughput': {
+            'sent': total_sent,
+            'received': received,
+            'sent_per_s': total_sent / config['duration'],
+            'delivered_per_s': received / config['duration'],
+            'sent_by_type': sent,
+        },
+        'latency': {
+            'overall': percentiles(everything),
+            **{kind: percentiles(samples) for kind, samples in sorted(latencies.items())},
+        },
+        'server': sampler.report(elapsed),
+    }
+
+
+COMPARED = (
+    ('throughput', 'delivered_per_s', True),
+    ('latency.overall', 'p50_ms', False),
+    ('latency.overall', 'p95_ms', False),
+    ('latency.overall', 'p99_ms', False),
+    ('server', 'cpu_percent', False),
+    ('server', 'rss_peak_mb', False),
+)
+
+
+def _lookup(report: Dict, section: str, key: str) -> Optional[float]:
+    node = report
+    for part in section.split('.'):
+        node = (node or {}).get(part)
+    return (node or {}).get(key)
+
+
+def compare(baseline: Dict, report: Dict) -> List[str]:
+    """Linhas comparando as métricas principais com um relatório anterior"""
+    lines = [f"Comparação com {baseline.get('version') or 'base'}:"]
+    if baseline.get('config') != report.get('config'):
+        lines.append("  (aviso: configurações diferentes entre os relatórios)")
+    for section, key, higher_is_better in COMPARED:
+        old, new = _lookup(baseline, section, key), _lookup(report, section, key)
+        if old is None or new is None:
+            continue
+        change = (new - old) / old * 100 if old else 0.0
+        worse = change < 0 if higher_is_better else change > 0
+        flag = ' (pior)' if worse and abs(change) > 5 else ''
+        lines.append(f"  {key:>16}: {old:10.2f} -> {new:10.2f} ({change:+.1f}%){flag}")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Teste de carga do servidor de jogo')
+    parser.add_argument('--url', help='Servidor externo (ws://host:porta); padrão: sobe um local')
+    parser.add_argument('--port', type=int, default=5800)
+    parser.add_argument('--rooms', type=int, default=2)
+    parser.add_argument('--players', type=int, default=10, help='Jogadores por sala (mais 1 GM)')
+    parser.add_argument('--rate', type=float, default=5.0, help='Mensagens/s por jogador')
+    parser.add_argument('--gm-rate', type=float, default=2.0, help='Mensagens/s por GM')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Pesos por tipo (padrão: {DEFAULT_MIX})')
+    parser.add_argument('--world-items', type=int, default=200)
+    parser.add_argument('--codecs', default=None, help='Codecs oferecidos, ex.: msgpack,json')
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--warmup', type=float, default=1.0)
+    parser.add_argument('--drain', type=float, default=1.0)
+    parser.add_argument('--client-processes', type=int, default=2)
+    parser.add_argument('--tick', type=float, default=None, help='Tick do servidor em ms (modo tick)')
+    parser.add_argument('--output', help='Grava o relatório JSON neste arquivo')
+    parser.add_argument('--compare', help='Relatório JSON anterior para comparação')
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.INFO)
+    config = {
+        'url': args.url or f'ws://localhost:{args.port}',
+        'rooms': args.rooms,
+        'players': args.players,
+        'rate': args.rate,
+        'gm_rate': args.gm_rate,
+        'mix': args.mix,
+        'world_items': args.world_items,
+        'codecs': args.codecs.split(',') if args.codecs else None,
+        'duration': args.duration,
+        'warmup': args.warmup,
+        'drain': args.drain,
+        'client_processes': args.client_processes,
+        'tick_ms': args.tick,
+    }
+    parse_mix(args.mix)  # Valida antes de subir qualquer processo
+
+    server = None
+    if args.url is None:
+        options = {'tick_interval': args.tick / 1000} if args.tick else {}
+        server = multiprocessing.Process(target=_serve, args=('localhost', args.port, options), daemon=True)
+        server.start()
+        time.sleep(1.0)
+    try:
+        report = asyncio.run(run_loadtest(config, server.pid if server else None))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.join()
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    overall = report['latency']['overall']
+    summary = (f"{report['throughput']['sent_per_s']:.0f} msg/s enviadas, "
+               f"{report['throughput']['delivered_per_s']:.0f} msg/s entregues, "
+               f"p50 {overall.get('p50_ms', 0):.1f} ms, p99 {overall.get('p99_ms', 0):.1f} ms")
+    if report['server']:
+        summary += f", servidor {report['server']['cpu_percent']:.0f}% CPU, {report['server']['rss_peak_mb']:.0f} MB"
+    print(summary, file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            for line in compare(json.load(f), report):
+                print(line, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
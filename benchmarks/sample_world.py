@@ -0,0 +1,84 @@
+"""
+Mundo sintético para benchmarks (equipamentos, talentos e raças em volume)
+"""
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.world_manager import WorldManager
+from src.models import (
+    AttributeRule, SecondaryAttribute, Race, SizeCategory, MovementRules,
+    Talent, TalentType, TalentWeight
+)
+from src.models.equipment import DamageType
+
+RARITIES = ["common", "uncommon", "rare", "epic", "legendary"]
+
+
+def build_world(num_items: int = 500, num_talents: int = 100, num_races: int = 20) -> WorldManager:
+    """Cria um mundo com catálogos de tamanho configurável"""
+    world = WorldManager("Mundo de Benchmark", "Mestre")
+
+    for name in ("strength", "dexterity", "constitution", "intelligence", "wisdom", "charisma"):
+        world.attributes.add_primary_attribute(
+            AttributeRule(name=name, is_primary=True, is_mandatory=True, base_value=10, max_value=20)
+        )
+    world.attributes.add_secondary_attribute(
+        SecondaryAttribute(name="hp", formula="constitution * 5 + 50", parent_attributes=["constitution"])
+    )
+
+    damage_types = list(DamageType)
+    for i in range(num_items):
+        rarity = RARITIES[i % len(RARITIES)]
+        if i % 3 == 0:
+            world.equipment.create_weapon(
+                f"Espada {i}", f"{1 + i % 3}d{6 + 2 * (i % 3)}", damage_types[i % len(damage_types)],
+                description=f"Uma lâmina forjada na era {i}", rarity=rarity, value=10 + i
+            )
+        elif i % 3 == 1:
+            world.equipment.create_armor(
+                f"Armadura {i}", 11 + i % 6, "medium",
+                description="Placas de metal rebitadas", rarity=rarity, max_dex_bonus=2
+            )
+        else:
+            world.equipment.create_consumable(
+                f"Poção {i}", [f"heal:{2 + i % 8}d4"], description="Líquido vermelho", rarity=rarity
+            )
+
+    talent_types = list(TalentType)
+    weights = list(TalentWeight)
+    for i in range(num_talents):
+        world.talents.add_talent(Talent(
+            name=f"Talento {i}",
+            talent_type=talent_types[i % len(talent_types)],
+            weight=weights[i % len(weights)],
+            description=f"Concede vantagens especiais de número {i}"
+        ))
+
+    sizes = list(SizeCategory)
+    for i in range(num_races):
+        world.races.add_race(Race(
+            name=f"Raça {i}",
+            size=sizes[i % len(sizes)],
+            movement=MovementRules(base_speed=25 + i % 3 * 5),
+            attribute_modifiers={"strength": i % 3, "dexterity": 1},
+            languages=["Common"]
+        ))
+
+    return world
+
+
+def world_payload(world: WorldManager) -> dict:
+    """Representação do mundo enviada pelo GM em update_world"""
+    systems = {
+        'attributes': world.attributes, 'levels': world.levels, 'races': world.races,
+        'proficiencies': world.proficiencies, 'magic': world.magic, 'talents': world.talents,
+        'currency': world.currency, 'conditions': world.conditions, 'elements': world.elements,
+        'armor_class': world.armor_class, 'equipment': world.equipment, 'languages': world.languages
+    }
+    return {
+        'metadata': {'name': world.metadata.name, 'creator': world.metadata.creator},
+        'rules': {name: json.loads(system.to_json()) for name, system in systems.items()}
+    }
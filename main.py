@@ -10,6 +10,7 @@ from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
 from kivy.uix.popup import Popup
 from kivy.core.window import Window
+from kivy.clock import Clock
 import json
 import os
 
@@ -175,14 +176,21 @@ class WorldEditorScreen(Screen):
     def save_world(self, instance):
         app = App.get_running_app()
         if hasattr(app, 'current_world'):
-            app.current_world.save_world(PATHS['world_data'])
-            
-            popup = Popup(
-                title='Sucesso',
-                content=Label(text='Mundo salvo com sucesso!'),
-                size_hint=(0.6, 0.3)
+            # Salva em segundo plano; o resultado volta para a thread da interface
+            instance.disabled = True
+            app.current_world.save_world_async(
+                PATHS['world_data'],
+                lambda path, error: Clock.schedule_once(lambda dt: self.on_world_saved(instance, error))
             )
-            popup.open()
+    
+    def on_world_saved(self, button, error):
+        button.disabled = False
+        popup = Popup(
+            title='Erro' if error else 'Sucesso',
+            content=Label(text=f'Erro ao salvar o mundo: {error}' if error else 'Mundo salvo com sucesso!'),
+            size_hint=(0.6, 0.3)
+        )
+        popup.open()
     
     def back_to_menu(self, instance):
         self.manager.current = 'main_menu'
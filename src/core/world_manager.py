@@ -1,17 +1,136 @@
 """
 Gerenciador de Mundo - Integra todos os sistemas de regras
 """
+import functools
 import json
+import logging
 import os
-from typing import Dict, Optional
-from dataclasses import dataclass, field
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
 
 from ..models import (
     AttributeSystem, LevelSystem, RaceSystem, ProficiencySystem,
     MagicSystem, TalentSystem, CurrencySystem, ConditionSystem,
-    ElementSystem, ACSystem, EquipmentSystem, LanguageSystem
+    ElementSystem, ACSystem, EquipmentSystem, LanguageSystem, CatalogStore
 )
+from .world_pack import WorldPack, write_pack
+
+logger = logging.getLogger(__name__)
+
+# Sistemas de regras do mundo: (atributo do WorldManager, classe, arquivo em rules/)
+SYSTEMS = (
+    ('attributes', AttributeSystem, 'attributes.json'),
+    ('levels', LevelSystem, 'levels.json'),
+    ('races', RaceSystem, 'races.json'),
+    ('proficiencies', ProficiencySystem, 'proficiencies.json'),
+    ('magic', MagicSystem, 'magic.json'),
+    ('talents', TalentSystem, 'talents.json'),
+    ('currency', CurrencySystem, 'currency.json'),
+    ('conditions', ConditionSystem, 'conditions.json'),
+    ('elements', ElementSystem, 'elements.json'),
+    ('armor_class', ACSystem, 'armor_class.json'),
+    ('equipment', EquipmentSystem, 'equipment.json'),
+    ('languages', LanguageSystem, 'languages.json'),
+)
+
+# Sistemas com catálogos grandes: lidos item a item, sem montar o dict do
+# arquivo inteiro (models/streaming.py)
+STREAMED_SYSTEMS = frozenset({'races', 'proficiencies', 'talents', 'conditions', 'equipment', 'languages'})
+
+# Sistemas que podem guardar o catálogo em SQLite (use_catalog_store): o
+# caminho do banco é gravado relativo à pasta do mundo e resolvido a partir dela
+STORE_SYSTEMS = frozenset({'talents', 'equipment'})
+
+
+def _write_temp(path: str, serialize: Callable[[], str]) -> float:
+    """Serializa e grava em `path`.tmp (com fsync); retorna o tempo gasto"""
+    start = time.perf_counter()
+    content = serialize()
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(content)
+        f.flush()
+        os.fsync(f.fileno())
+    return time.perf_counter() - start
+
+
+def _store_summary(system) -> Dict:
+    """Banco SQLite do catálogo, se houver (ver use_catalog_store)"""
+    return {'store': system.store.path} if system.store is not None else {}
+
+
+# Resumo de cada sistema (export_world_summary); também gravado em
+# manifest.json para ser lido sem carregar os arquivos de regras
+SUMMARIES: Dict[str, Callable[[object], Dict]] = {
+    'attributes': lambda s: {
+        'primary_count': len(s.primary_attributes),
+        'secondary_count': len(s.secondary_attributes)
+    },
+    'levels': lambda s: {
+        'enabled': s.enabled,
+        'entity_types': len(s.level_configs),
+        'reborn_enabled': s.reborn_config.enabled
+    },
+    'races': lambda s: {'count': len(s.races)},
+    'proficiencies': lambda s: {'count': len(s.proficiencies)},
+    'magic': lambda s: {
+        'spell_tables': len(s.spell_slot_tables),
+        'mana_enabled': s.mana_system.enabled,
+        'stamina_enabled': s.stamina_system.enabled
+    },
+    'talents': lambda s: {
+        'count': len(s.talents),
+        'max_per_character': s.build_rules.max_talents,
+        **_store_summary(s)
+    },
+    'currency': lambda s: {
+        'currencies': len(s.currencies),
+        'base_currency': s.base_currency
+    },
+    'conditions': lambda s: {'count': len(s.conditions)},
+    'elements': lambda s: {
+        'count': len(s.elements),
+        'interactions': len(s.interactions)
+    },
+    'equipment': lambda s: {'count': len(s.equipment_database), **_store_summary(s)},
+    'languages': lambda s: {'count': len(s.languages)},
+}
+
+
+class _LazySystem:
+    """Sistema de regras criado no primeiro acesso
+    
+    Em um mundo carregado, vem do arquivo em rules/; em um mundo novo (ou
+    sem o arquivo), é o sistema com os valores padrão.
+    """
+    
+    def __init__(self, name: str, system_cls: type, filename: str):
+        self.name = name
+        self.system_cls = system_cls
+        self.filename = filename
+    
+    def __get__(self, world, owner=None):
+        if world is None:
+            return self
+        system = world._systems.get(self.name)
+        if system is None:
+            system = world._materialize(self)
+        return system
+    
+    def __set__(self, world, system):
+        world._systems[self.name] = system
+
+
+def _file_signature(path: str) -> Optional[List[int]]:
+    """Tamanho e mtime do arquivo, para validar o manifest"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
 
 
 @dataclass
@@ -33,73 +152,400 @@ class WorldManager:
     def __init__(self, world_name: str = "New World", gm_name: str = "Game Master"):
         self.metadata = WorldMetadata(name=world_name, creator=gm_name)
         
-        # Inicializar todos os sistemas
-        self.attributes = AttributeSystem()
-        self.levels = LevelSystem()
-        self.races = RaceSystem()
-        self.proficiencies = ProficiencySystem()
-        self.magic = MagicSystem()
-        self.talents = TalentSystem()
-        self.currency = CurrencySystem()
-        self.conditions = ConditionSystem()
-        self.elements = ElementSystem()
-        self.armor_class = ACSystem()
-        self.equipment = EquipmentSystem()
-        self.languages = LanguageSystem()
+        # Sistemas de regras (attributes, levels, ...) são criados no primeiro
+        # acesso; em um mundo carregado, lidos de `_world_path` (pasta) ou
+        # de `_pack` (arquivo único)
+        self._systems: Dict[str, object] = {}
+        self._world_path: Optional[str] = None
+        self._pack: Optional[WorldPack] = None
+        self._load_lock = threading.RLock()
+        # Resumos por sistema do manifest.json: {sistema: {'summary', 'file'}}
+        self._manifest: Dict[str, Dict] = {}
         
         # Configurações de layout do GM
         self.gm_layout: Dict = {}
+        
+        # Avanço da leitura de um sistema grande: load_progress(sistema, lidos, total)
+        self.load_progress: Optional[Callable[[str, int, int], None]] = None
+        
+        # Tempo gasto por sistema no último salvamento (segundos)
+        self.last_save_timings: Dict[str, float] = {}
+        self._save_executor: Optional[ThreadPoolExecutor] = None
+        
+        # Estado do último salvamento: {sistema: (objeto, revisão)}, para
+        # gravar de novo apenas o que mudou desde então (objeto None: está
+        # no disco e ainda não foi carregado)
+        self._saved_dir: Optional[str] = None
+        self._saved_systems: Dict[str, Tuple[object, int]] = {}
+        self._saved_layout: Optional[str] = None
+        self._saved_metadata: Optional[Dict] = None
+        self._autosave_stop: Optional[threading.Event] = None
+    
+    def world_dir(self, directory: str) -> str:
+        """Pasta do mundo dentro de `directory`"""
+        return os.path.join(directory, self.metadata.name.replace(' ', '_'))
+    
+    @property
+    def loaded_systems(self) -> List[str]:
+        """Sistemas já materializados em memória"""
+        return [name for name, _, _ in SYSTEMS if name in self._systems]
+    
+    def _materialize(self, lazy: _LazySystem):
+        """Cria o sistema: do arquivo do mundo carregado, ou com os padrões"""
+        with self._load_lock:
+            system = self._systems.get(lazy.name)
+            if system is not None:
+                return system
+            start = time.perf_counter()
+            options = {'base_dir': self._world_path} if lazy.name in STORE_SYSTEMS else {}
+            if lazy.name in STREAMED_SYSTEMS:
+                source = self._rules_source(lazy.filename)
+                if source is not None:
+                    progress = None
+                    if self.load_progress is not None:
+                        progress = functools.partial(self.load_progress, lazy.name)
+                    system = lazy.system_cls.load_from_file(source, progress, **options)
+            else:
+                text = self._read_rules(lazy.filename)
+                if text is not None:
+                    system = lazy.system_cls.from_json(text, **options)
+            if system is not None:
+                logger.debug(f"Sistema {lazy.name} carregado em {(time.perf_counter() - start) * 1000:.1f}ms")
+                if self._pack is None and self._saved_dir == os.path.abspath(self._world_path):
+                    # Igual ao arquivo: continua limpo
+                    self._saved_systems[lazy.name] = (system, system.revision)
+            else:
+                system = lazy.system_cls()
+            self._systems[lazy.name] = system
+            return system
+    
+    def _rules_source(self, filename: str) -> Union[str, bytes, None]:
+        """rules/<filename> na origem do mundo: caminho (pasta) ou bytes (pacote)"""
+        if self._pack is not None:
+            section = f'rules/{filename}'
+            return self._pack.read(section) if section in self._pack else None
+        if self._world_path:
+            path = os.path.join(self._world_path, 'rules', filename)
+            if os.path.exists(path):
+                return path
+        return None
     
-    def save_world(self, directory: str):
-        """Salva todo o mundo em arquivos JSON separados"""
-        world_dir = os.path.join(directory, self.metadata.name.replace(' ', '_'))
-        os.makedirs(world_dir, exist_ok=True)
+    def _read_rules(self, filename: str) -> Optional[str]:
+        """Conteúdo de rules/<filename> na origem do mundo, se existir"""
+        source = self._rules_source(filename)
+        if isinstance(source, bytes):
+            return source.decode('utf-8')
+        if source is not None:
+            with open(source, 'r', encoding='utf-8') as f:
+                return f.read()
+        return None
+    
+    def system_summary(self, name: str) -> Dict:
+        """Resumo de um sistema, do manifest se ele ainda não foi carregado"""
+        if name not in self._systems and self._pack is not None and name in self._manifest:
+            # O manifest é gravado no mesmo arquivo das regras: sempre atual
+            return self._manifest[name]['summary']
+        if name not in self._systems and self._world_path:
+            entry = self._manifest.get(name)
+            if entry and entry.get('file') == _file_signature(
+                    os.path.join(self._world_path, 'rules', entry.get('filename', ''))):
+                return entry['summary']
+        return SUMMARIES[name](getattr(self, name))
+    
+    def dirty_systems(self, directory: Optional[str] = None) -> List[str]:
+        """Sistemas alterados desde o último salvamento (ou carregamento)
+        
+        Em outra pasta que não a do último salvamento, todos contam como
+        alterados. Inclui 'gm_layout' e 'metadata' se o layout ou os
+        metadados (descrição, sessões, ...) mudaram.
+        """
+        if directory is not None and os.path.abspath(self.world_dir(directory)) != self._saved_dir:
+            return [name for name, _, _ in SYSTEMS] + ['gm_layout', 'metadata']
+        dirty = []
+        for name, _, _ in SYSTEMS:
+            system = self._systems.get(name)
+            if system is None:
+                # Não carregado: só está pendente se nunca foi salvo aqui
+                if name not in self._saved_systems:
+                    dirty.append(name)
+            elif self._saved_systems.get(name) != (system, system.revision):
+                dirty.append(name)
+        if json.dumps(self.gm_layout, sort_keys=True, default=str) != self._saved_layout:
+            dirty.append('gm_layout')
+        if asdict(self.metadata) != self._saved_metadata:
+            dirty.append('metadata')
+        return dirty
+    
+    def _mark_saved(self, world_dir: str, revisions: Dict[str, Tuple[object, int]], layout: str,
+                    metadata: Dict):
+        if os.path.abspath(world_dir) != self._saved_dir:
+            self._saved_systems = {}
+        self._saved_dir = os.path.abspath(world_dir)
+        self._saved_systems.update(revisions)
+        self._saved_layout = layout
+        self._saved_metadata = metadata
+    
+    def save_world(self, directory: str, max_workers: Optional[int] = None, full: bool = False) -> str:
+        """Salva o mundo em arquivos JSON separados
+        
+        Apenas os sistemas alterados desde o último salvamento são gravados
+        (todos com `full=True` ou em outra pasta); sem alterações, nada é
+        escrito. Os sistemas são serializados em paralelo e gravados em
+        arquivos temporários; só quando todos foram gravados os arquivos
+        finais são substituídos (os.replace), com os metadados por último.
+        Se algo falhar no meio, o mundo salvo anteriormente continua intacto.
+        O tempo de cada sistema fica em `last_save_timings`.
+        """
+        start = time.perf_counter()
+        world_dir = self.world_dir(directory)
+        rules_dir = os.path.join(world_dir, 'rules')
+        dirty = set(self.dirty_systems(directory))
+        if full:
+            dirty.update(name for name, _, _ in SYSTEMS)
+            dirty.add('gm_layout')
+        if not dirty:
+            self.last_save_timings = {'total': time.perf_counter() - start}
+            logger.debug(f"Mundo '{self.metadata.name}' sem alterações, nada a salvar")
+            return world_dir
+        os.makedirs(rules_dir, exist_ok=True)
         
         # Atualizar timestamp
         self.metadata.last_modified = datetime.now().isoformat()
         
-        # Salvar metadados
-        metadata_path = os.path.join(world_dir, 'metadata.json')
-        with open(metadata_path, 'w', encoding='utf-8') as f:
-            json.dump({
-                'name': self.metadata.name,
-                'creator': self.metadata.creator,
-                'created_at': self.metadata.created_at,
-                'last_modified': self.metadata.last_modified,
-                'description': self.metadata.description,
-                'version': self.metadata.version,
-                'player_count': self.metadata.player_count,
-                'session_count': self.metadata.session_count
-            }, f, indent=2, ensure_ascii=False)
+        # Revisões lidas antes de serializar: o que mudar durante o
+        # salvamento continua pendente para o próximo
+        revisions = {
+            name: (getattr(self, name), getattr(self, name).revision)
+            for name, _, _ in SYSTEMS if name in dirty
+        }
+        summaries = {name: SUMMARIES[name](system) for name, (system, _) in revisions.items() if name in SUMMARIES}
+        layout = json.dumps(self.gm_layout, sort_keys=True, default=str)
+        metadata = asdict(self.metadata)
+        jobs: List[Tuple[str, str, Callable[[], str]]] = [
+            (name, os.path.join(rules_dir, filename),
+             functools.partial(revisions[name][0].to_json, base_dir=world_dir)
+             if name in STORE_SYSTEMS else revisions[name][0].to_json)
+            for name, _, filename in SYSTEMS if name in dirty
+        ]
+        if 'gm_layout' in dirty:
+            jobs.append(('gm_layout', os.path.join(world_dir, 'gm_layout.json'),
+                         lambda: json.dumps(self.gm_layout, indent=2, ensure_ascii=False)))
+        # Metadados por último: marcam o salvamento como concluído
+        jobs.append(('metadata', os.path.join(world_dir, 'metadata.json'),
+                     lambda: json.dumps(metadata, indent=2, ensure_ascii=False)))
         
-        # Salvar cada sistema em arquivo separado
-        rules_dir = os.path.join(world_dir, 'rules')
-        os.makedirs(rules_dir, exist_ok=True)
+        with ThreadPoolExecutor(max_workers or min(len(jobs), (os.cpu_count() or 1) + 4)) as pool:
+            futures = [(name, pool.submit(_write_temp, path, serialize)) for name, path, serialize in jobs]
+        errors = [future.exception() for _, future in futures if future.exception() is not None]
+        if errors:
+            for _, path, _ in jobs:
+                if os.path.exists(path + '.tmp'):
+                    os.remove(path + '.tmp')
+            raise errors[0]
         
-        self.attributes.save_to_file(os.path.join(rules_dir, 'attributes.json'))
-        self.levels.save_to_file(os.path.join(rules_dir, 'levels.json'))
-        self.races.save_to_file(os.path.join(rules_dir, 'races.json'))
-        self.proficiencies.save_to_file(os.path.join(rules_dir, 'proficiencies.json'))
-        self.magic.save_to_file(os.path.join(rules_dir, 'magic.json'))
-        self.talents.save_to_file(os.path.join(rules_dir, 'talents.json'))
-        self.currency.save_to_file(os.path.join(rules_dir, 'currency.json'))
-        self.conditions.save_to_file(os.path.join(rules_dir, 'conditions.json'))
-        self.elements.save_to_file(os.path.join(rules_dir, 'elements.json'))
-        self.armor_class.save_to_file(os.path.join(rules_dir, 'armor_class.json'))
-        self.equipment.save_to_file(os.path.join(rules_dir, 'equipment.json'))
-        self.languages.save_to_file(os.path.join(rules_dir, 'languages.json'))
-        
-        # Salvar layout do GM
-        layout_path = os.path.join(world_dir, 'gm_layout.json')
-        with open(layout_path, 'w', encoding='utf-8') as f:
-            json.dump(self.gm_layout, f, indent=2, ensure_ascii=False)
+        timings = {name: future.result() for name, future in futures}
+        for _, path, _ in jobs[:-1]:
+            os.replace(path + '.tmp', path)
+        # Bancos SQLite só depois dos arquivos: se algo falhou antes, nem um
+        # nem outro foi gravado
+        stores = {id(system.store): system.store for name, (system, _) in revisions.items()
+                  if name in STORE_SYSTEMS and system.store is not None}
+        for store in stores.values():
+            store.commit()
+        self._write_manifest(world_dir, summaries)
+        os.replace(jobs[-1][1] + '.tmp', jobs[-1][1])
+        self._mark_saved(world_dir, revisions, layout, metadata)
+        self._world_path = world_dir
+        # Em outra pasta todos os sistemas foram carregados e gravados: a
+        # origem passa a ser a pasta, e o pacote pode ser fechado
+        self._use_pack(None)
         
+        timings['total'] = time.perf_counter() - start
+        self.last_save_timings = timings
+        logger.debug("Tempos de salvamento: " + ", ".join(f"{name}={seconds * 1000:.1f}ms"
+                                                          for name, seconds in timings.items()))
         print(f"Mundo '{self.metadata.name}' salvo em: {world_dir}")
         return world_dir
     
+    def _write_manifest(self, world_dir: str, summaries: Dict[str, Dict]):
+        """Grava manifest.json: resumo e assinatura do arquivo de cada sistema"""
+        manifest = {}
+        for name, _, filename in SYSTEMS:
+            if name not in SUMMARIES:
+                continue
+            if name in summaries:
+                summary = summaries[name]
+            elif name in self._systems:
+                summary = SUMMARIES[name](self._systems[name])
+            elif name in self._manifest:
+                summary = self._manifest[name]['summary']
+            else:
+                continue
+            manifest[name] = {
+                'filename': filename,
+                'file': _file_signature(os.path.join(world_dir, 'rules', filename)),
+                'summary': summary
+            }
+        path = os.path.join(world_dir, 'manifest.json')
+        _write_temp(path, lambda: json.dumps({'format': 1, 'systems': manifest}, indent=2, ensure_ascii=False))
+        os.replace(path + '.tmp', path)
+        self._manifest = manifest
+    
+    def save_packed(self, path: str, level: int = 6) -> str:
+        """Salva o mundo inteiro em um único arquivo (.bardworld)
+        
+        Sistemas ainda não carregados são copiados da origem sem serem
+        interpretados; os carregados são gravados em JSON compacto. Útil
+        para exportar/importar mundos.
+        """
+        start = time.perf_counter()
+        self.metadata.last_modified = datetime.now().isoformat()
+        sections = []
+        manifest = {}
+        for name, _, filename in SYSTEMS:
+            system = self._systems.get(name)
+            text = self._read_rules(filename) if system is None else None
+            if text is not None and name in SUMMARIES and 'store' in self.system_summary(name):
+                # Catálogo em SQLite: o pacote leva os itens, não a referência
+                text = None
+            if text is None:
+                system = getattr(self, name)
+                if getattr(system, 'store', None) is not None:
+                    text = system.to_json(inline=True, compact=True)
+                else:
+                    text = system.to_json(compact=True)
+            sections.append((f'rules/{filename}', text.encode('utf-8')))
+            if name in SUMMARIES:
+                summary = SUMMARIES[name](system) if system is not None else self.system_summary(name)
+                manifest[name] = {'filename': filename, 'summary': summary}
+        sections.append(('gm_layout.json', json.dumps(self.gm_layout, indent=2, ensure_ascii=False).encode('utf-8')))
+        sections.append(('manifest.json', json.dumps({'format': 1, 'systems': manifest}, ensure_ascii=False).encode('utf-8')))
+        sections.append(('metadata.json', json.dumps(asdict(self.metadata), indent=2, ensure_ascii=False).encode('utf-8')))
+        
+        # Sobrescrevendo o próprio pacote de origem: fecha o mmap antes
+        same_pack = self._pack is not None and os.path.abspath(self._pack.path) == os.path.abspath(path)
+        if same_pack:
+            self._pack.close()
+        write_pack(path, sections, level)
+        if same_pack:
+            self._use_pack(WorldPack(path))
+            self._manifest = manifest
+        
+        self.last_save_timings = {'total': time.perf_counter() - start}
+        print(f"Mundo '{self.metadata.name}' salvo em: {path}")
+        return path
+    
+    def _use_pack(self, pack: Optional[WorldPack]):
+        """Troca o pacote de origem, fechando o mmap do anterior"""
+        if self._pack is not None and self._pack is not pack:
+            self._pack.close()
+        self._pack = pack
+    
+    def close(self):
+        """Libera os recursos do mundo: salvamento automático, thread de
+        salvamento (aguarda o que estiver em andamento) e o mmap do pacote
+        
+        Sistemas ainda não lidos do pacote passam a ser criados com os padrões.
+        """
+        self.disable_autosave()
+        if self._save_executor is not None:
+            self._save_executor.shutdown(wait=True)
+            self._save_executor = None
+        self._use_pack(None)
+    
+    def __enter__(self) -> 'WorldManager':
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def use_catalog_store(self, path: str) -> CatalogStore:
+        """Guarda os catálogos de equipamentos e talentos em um banco SQLite
+        
+        Os arquivos de regras passam a referenciar o banco; cada salvamento
+        do mundo grava (commit) a transação pendente.
+        """
+        store = CatalogStore.open(path)
+        self.equipment.use_store(store)
+        self.talents.use_store(store)
+        return store
+    
+    def save_world_async(self, directory: str,
+                         callback: Optional[Callable[[Optional[str], Optional[BaseException]], None]] = None,
+                         max_workers: Optional[int] = None) -> Future:
+        """Salva o mundo em segundo plano (sem travar a interface)
+        
+        `callback(world_dir, erro)` é chamado na thread do salvamento; na
+        interface Kivy, repasse para a thread principal com `Clock.schedule_once`.
+        Salvamentos consecutivos são executados em ordem, um por vez.
+        """
+        if self._save_executor is None:
+            self._save_executor = ThreadPoolExecutor(1, thread_name_prefix='world-save')
+        future = self._save_executor.submit(self.save_world, directory, max_workers)
+        if callback is not None:
+            future.add_done_callback(
+                lambda f: callback(None, f.exception()) if f.exception() else callback(f.result(), None)
+            )
+        return future
+    
+    def enable_autosave(self, directory: str, delay: float = 2.0, max_delay: float = 30.0,
+                        callback: Optional[Callable[[Optional[str], Optional[BaseException]], None]] = None):
+        """Salva automaticamente (só o que mudou) depois que as alterações param
+        
+        O mundo é salvo quando fica cerca de `delay` segundos sem novas
+        alterações, ou `max_delay` segundos após a primeira alteração
+        pendente se a edição não parar. `callback` como em `save_world_async`.
+        """
+        self.disable_autosave()
+        stop = self._autosave_stop = threading.Event()
+        threading.Thread(
+            target=self._autosave_loop, args=(directory, delay, max_delay, callback, stop),
+            name='world-autosave', daemon=True
+        ).start()
+    
+    def disable_autosave(self):
+        """Interrompe o salvamento automático"""
+        if self._autosave_stop is not None:
+            self._autosave_stop.set()
+            self._autosave_stop = None
+    
+    def _autosave_loop(self, directory: str, delay: float, max_delay: float, callback, stop: threading.Event):
+        last_state = None
+        dirty_since = None
+        while not stop.wait(delay):
+            # Qualquer erro (inclusive ao montar o estado) é registrado e o
+            # laço continua: a thread não pode morrer em silêncio
+            try:
+                dirty = self.dirty_systems(directory)
+                if not dirty:
+                    last_state = dirty_since = None
+                    continue
+                # Cópia sob o lock: outra thread pode estar materializando um sistema
+                with self._load_lock:
+                    systems = list(self._systems.values())
+                state = (
+                    [(system, system.revision) for system in systems],
+                    json.dumps(self.gm_layout, sort_keys=True, default=str),
+                    asdict(self.metadata)
+                )
+                changed = state != last_state
+                last_state = state
+                now = time.monotonic()
+                if dirty_since is None:
+                    dirty_since = now
+                # Ainda sendo editado: espera mais um intervalo (até `max_delay`)
+                if changed and now - dirty_since < max_delay:
+                    continue
+                self.save_world_async(directory, callback).result()
+            except Exception:
+                logger.exception("Erro no salvamento automático")
+            last_state = dirty_since = None
+    
     @classmethod
     def load_world(cls, world_path: str) -> 'WorldManager':
-        """Carrega um mundo de arquivos JSON"""
+        """Carrega um mundo de arquivos JSON (pasta) ou de um pacote .bardworld"""
+        if os.path.isfile(world_path):
+            return cls.load_packed(world_path)
         # Carregar metadados
         metadata_path = os.path.join(world_path, 'metadata.json')
         with open(metadata_path, 'r', encoding='utf-8') as f:
@@ -108,33 +554,14 @@ class WorldManager:
         world = cls(metadata_data['name'], metadata_data['creator'])
         world.metadata = WorldMetadata(**metadata_data)
         
-        # Carregar sistemas
-        rules_dir = os.path.join(world_path, 'rules')
-        
-        world.attributes = AttributeSystem.load_from_file(
-            os.path.join(rules_dir, 'attributes.json'))
-        world.levels = LevelSystem.load_from_file(
-            os.path.join(rules_dir, 'levels.json'))
-        world.races = RaceSystem.load_from_file(
-            os.path.join(rules_dir, 'races.json'))
-        world.proficiencies = ProficiencySystem.load_from_file(
-            os.path.join(rules_dir, 'proficiencies.json'))
-        world.magic = MagicSystem.load_from_file(
-            os.path.join(rules_dir, 'magic.json'))
-        world.talents = TalentSystem.load_from_file(
-            os.path.join(rules_dir, 'talents.json'))
-        world.currency = CurrencySystem.load_from_file(
-            os.path.join(rules_dir, 'currency.json'))
-        world.conditions = ConditionSystem.load_from_file(
-            os.path.join(rules_dir, 'conditions.json'))
-        world.elements = ElementSystem.load_from_file(
-            os.path.join(rules_dir, 'elements.json'))
-        world.armor_class = ACSystem.load_from_file(
-            os.path.join(rules_dir, 'armor_class.json'))
-        world.equipment = EquipmentSystem.load_from_file(
-            os.path.join(rules_dir, 'equipment.json'))
-        world.languages = LanguageSystem.load_from_file(
-            os.path.join(rules_dir, 'languages.json'))
+        # Sistemas são lidos de rules/ no primeiro acesso
+        if not os.path.isdir(os.path.join(world_path, 'rules')):
+            raise FileNotFoundError(f"Pasta de regras não encontrada em {world_path}")
+        world._world_path = world_path
+        manifest_path = os.path.join(world_path, 'manifest.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                world._manifest = json.load(f).get('systems', {})
         
         # Carregar layout do GM
         layout_path = os.path.join(world_path, 'gm_layout.json')
@@ -142,9 +569,33 @@ class WorldManager:
             with open(layout_path, 'r', encoding='utf-8') as f:
                 world.gm_layout = json.load(f)
         
+        # Recém-carregado: nada a salvar até a próxima alteração
+        world._mark_saved(world_path, {
+            name: (None, 0) for name, _, filename in SYSTEMS
+            if os.path.exists(os.path.join(world_path, 'rules', filename))
+        }, json.dumps(world.gm_layout, sort_keys=True, default=str), asdict(world.metadata))
         print(f"Mundo '{world.metadata.name}' carregado de: {world_path}")
         return world
     
+    @classmethod
+    def load_packed(cls, pack_path: str) -> 'WorldManager':
+        """Abre um mundo empacotado; os sistemas são lidos do pacote no primeiro acesso"""
+        pack = WorldPack(pack_path)
+        try:
+            metadata_data = pack.read_json('metadata.json')
+            if metadata_data is None:
+                raise FileNotFoundError(f"metadata.json não encontrado em {pack_path}")
+            world = cls(metadata_data['name'], metadata_data['creator'])
+            world.metadata = WorldMetadata(**metadata_data)
+            world.gm_layout = pack.read_json('gm_layout.json', {})
+            world._manifest = pack.read_json('manifest.json', {}).get('systems', {})
+        except Exception:
+            pack.close()
+            raise
+        world._use_pack(pack)
+        print(f"Mundo '{world.metadata.name}' carregado de: {pack_path}")
+        return world
+    
     def export_world_summary(self) -> Dict:
         """Exporta um resumo do mundo"""
         return {
@@ -155,49 +606,7 @@ class WorldManager:
                 'last_modified': self.metadata.last_modified,
                 'description': self.metadata.description
             },
-            'systems': {
-                'attributes': {
-                    'primary_count': len(self.attributes.primary_attributes),
-                    'secondary_count': len(self.attributes.secondary_attributes)
-                },
-                'levels': {
-                    'enabled': self.levels.enabled,
-                    'entity_types': len(self.levels.level_configs),
-                    'reborn_enabled': self.levels.reborn_config.enabled
-                },
-                'races': {
-                    'count': len(self.races.races)
-                },
-                'proficiencies': {
-                    'count': len(self.proficiencies.proficiencies)
-                },
-                'magic': {
-                    'spell_tables': len(self.magic.spell_slot_tables),
-                    'mana_enabled': self.magic.mana_system.enabled,
-                    'stamina_enabled': self.magic.stamina_system.enabled
-                },
-                'talents': {
-                    'count': len(self.talents.talents),
-                    'max_per_character': self.talents.build_rules.max_talents
-                },
-                'currency': {
-                    'currencies': len(self.currency.currencies),
-                    'base_currency': self.currency.base_currency
-                },
-                'conditions': {
-                    'count': len(self.conditions.conditions)
-                },
-                'elements': {
-                    'count': len(self.elements.elements),
-                    'interactions': len(self.elements.interactions)
-                },
-                'equipment': {
-                    'count': len(self.equipment.equipment_database)
-                },
-                'languages': {
-                    'count': len(self.languages.languages)
-                }
-            }
+            'systems': {name: self.system_summary(name) for name in SUMMARIES}
         }
     
     def validate_world(self) -> Dict:
@@ -218,8 +627,16 @@ class WorldManager:
         if self.currency.base_currency not in self.currency.currencies:
             errors.append(f"Moeda base '{self.currency.base_currency}' não existe")
         
+        # Verificar se as fórmulas dos atributos secundários compilam
+        errors.extend(self.attributes.validate_formulas())
+        
         return {
             'valid': len(errors) == 0,
             'warnings': warnings,
             'errors': errors
         }
+
+
+# Sistemas de regras como atributos preguiçosos (world.attributes, world.levels, ...)
+for _name, _system_cls, _filename in SYSTEMS:
+    setattr(WorldManager, _name, _LazySystem(_name, _system_cls, _filename))
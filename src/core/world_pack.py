@@ -0,0 +1,180 @@
+"""
+Mundo empacotado em um único arquivo (.bardworld)
+
+Layout:
+    b'BARDWLD1'                 assinatura (8 bytes)
+    tamanho do índice           uint32 little-endian
+    índice (JSON, UTF-8)        {'format': 1, 'sections': {nome: {...}}}
+    dados das seções            concatenados, na ordem do índice
+
+Cada seção do índice traz `offset` (relativo ao início dos dados),
+`length`, `raw_length`, `compression` ('zlib' ou 'none') e o `sha256` do
+conteúdo descomprimido. As seções usam os mesmos nomes dos arquivos da
+pasta do mundo ('metadata.json', 'gm_layout.json', 'manifest.json',
+'rules/attributes.json', ...), o que torna a conversão direta.
+
+A leitura usa mmap: abrir o pacote lê apenas o índice, e cada seção só é
+descomprimida quando pedida.
+"""
+import hashlib
+import json
+import mmap
+import os
+import struct
+import zlib
+from typing import Dict, Iterable, Optional, Tuple
+
+MAGIC = b'BARDWLD1'
+PACK_EXTENSION = '.bardworld'
+_HEADER = struct.Struct('<8sI')
+# Seções menores que isso não compensam a compressão
+MIN_COMPRESS_SIZE = 256
+
+
+class WorldPackError(Exception):
+    """Pacote de mundo inválido ou corrompido"""
+
+
+def write_pack(path: str, sections: Iterable[Tuple[str, bytes]], level: int = 6) -> Dict[str, Dict]:
+    """Grava um pacote de forma atômica (arquivo temporário + os.replace)
+
+    Retorna o índice gravado.
+    """
+    index: Dict[str, Dict] = {}
+    blobs = []
+    offset = 0
+    for name, content in sections:
+        if len(content) >= MIN_COMPRESS_SIZE:
+            stored, compression = zlib.compress(content, level), 'zlib'
+        else:
+            stored, compression = content, 'none'
+        index[name] = {
+            'offset': offset,
+            'length': len(stored),
+            'raw_length': len(content),
+            'compression': compression,
+            'sha256': hashlib.sha256(content).hexdigest()
+        }
+        blobs.append(stored)
+        offset += len(stored)
+
+    header = json.dumps({'format': 1, 'sections': index}, separators=(',', ':')).encode('utf-8')
+    temp = path + '.tmp'
+    with open(temp, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, path)
+    return index
+
+
+class WorldPack:
+    """Leitura de um pacote de mundo via mmap"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            if size < _HEADER.size:
+                raise WorldPackError(f"Arquivo muito pequeno para um pacote de mundo: {path}")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, header_length = _HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise WorldPackError(f"Assinatura inválida em {path}")
+            header_end = _HEADER.size + header_length
+            try:
+                header = json.loads(self._map[_HEADER.size:header_end].decode('utf-8'))
+            except ValueError as e:
+                raise WorldPackError(f"Índice inválido em {path}: {e}")
+            self.sections: Dict[str, Dict] = header.get('sections', {})
+            self._data_start = header_end
+            for name, entry in self.sections.items():
+                if self._data_start + entry['offset'] + entry['length'] > size:
+                    raise WorldPackError(f"Seção {name} além do fim do arquivo")
+        except Exception:
+            self.close()
+            raise
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.sections
+
+    def __enter__(self) -> 'WorldPack':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def names(self):
+        return list(self.sections)
+
+    def read(self, name: str, verify: bool = True) -> bytes:
+        """Conteúdo descomprimido de uma seção"""
+        entry = self.sections.get(name)
+        if entry is None:
+            raise KeyError(name)
+        if self._map is None:
+            raise WorldPackError(f"Pacote já fechado: {self.path}")
+        start = self._data_start + entry['offset']
+        with memoryview(self._map)[start:start + entry['length']] as view:
+            if entry['compression'] == 'zlib':
+                content = zlib.decompress(view)
+            elif entry['compression'] == 'none':
+                content = bytes(view)
+            else:
+                raise WorldPackError(f"Compressão desconhecida na seção {name}: {entry['compression']}")
+        if verify and hashlib.sha256(content).hexdigest() != entry['sha256']:
+            raise WorldPackError(f"Seção {name} corrompida (hash diferente)")
+        return content
+
+    def read_text(self, name: str, verify: bool = True) -> str:
+        return self.read(name, verify).decode('utf-8')
+
+    def read_json(self, name: str, default=None, verify: bool = True):
+        if name not in self.sections:
+            return default
+        return json.loads(self.read(name, verify))
+
+
+def pack_directory(world_dir: str, pack_path: Optional[str] = None) -> str:
+    """Converte a pasta de um mundo em pacote (sem interpretar os JSON)"""
+    if pack_path is None:
+        pack_path = world_dir.rstrip('/\\') + PACK_EXTENSION
+    sections = []
+    for root, _, files in os.walk(world_dir):
+        for filename in sorted(files):
+            if not filename.endswith('.json'):
+                continue
+            full = os.path.join(root, filename)
+            name = os.path.relpath(full, world_dir).replace(os.sep, '/')
+            with open(full, 'rb') as f:
+                sections.append((name, f.read()))
+    if not any(name == 'metadata.json' for name, _ in sections):
+        raise WorldPackError(f"metadata.json não encontrado em {world_dir}")
+    write_pack(pack_path, sections)
+    return pack_path
+
+
+def unpack_to_directory(pack_path: str, world_dir: str) -> str:
+    """Extrai um pacote para o layout de pasta (metadata.json, rules/...)"""
+    with WorldPack(pack_path) as pack:
+        for name in pack.names():
+            target = os.path.normpath(os.path.join(world_dir, name))
+            if not target.startswith(os.path.normpath(world_dir) + os.sep):
+                raise WorldPackError(f"Nome de seção inválido: {name}")
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(target + '.tmp', 'wb') as f:
+                f.write(pack.read(name))
+            os.replace(target + '.tmp', target)
+    return world_dir
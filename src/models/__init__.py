@@ -2,22 +2,26 @@
 __init__.py do pacote models
 """
 
-from .attributes import AttributeSystem, AttributeRule, SecondaryAttribute
+from .attributes import AttributeSystem, AttributeRule, SecondaryAttribute, AttributeEvaluator, AttributeCycleError
 from .level_system import LevelSystem, LevelConfig, EntityType, XPScalingType
 from .races import RaceSystem, Race, SizeCategory, MovementRules
 from .proficiency import ProficiencySystem, Proficiency, ProficiencyType
 from .magic_system import MagicSystem, CasterType, ManaSystem, StaminaSystem
 from .talents import TalentSystem, Talent, TalentType, TalentWeight
 from .currency import CurrencySystem, Currency, ExchangeRate
-from .conditions import ConditionSystem, Condition, StatusCondition, ConditionSeverity
+from .conditions import ConditionSystem, Condition, StatusCondition, ConditionSeverity, ActiveConditions
 from .elements import ElementSystem, ElementType, ResistanceLevel, ElementalResistance
 from .armor_class import ACSystem, ArmorClass, MagicalAC
 from .equipment import EquipmentSystem, Equipment, EquipmentTag, EquipmentSlot
 from .languages import LanguageSystem, Language, LanguageProficiency
+from .dice import DiceRoller, DiceExpression, DiceError, RollResult, parse_dice
+from .catalog_store import CatalogStore, SQLiteCatalog
+from .formula import Formula, FormulaError, compile_formula
+from .characters import CharacterStore, Character, CharacterAttributes
 
 __all__ = [
     # Attributes
-    'AttributeSystem', 'AttributeRule', 'SecondaryAttribute',
+    'AttributeSystem', 'AttributeRule', 'SecondaryAttribute', 'AttributeEvaluator', 'AttributeCycleError',
     # Levels
     'LevelSystem', 'LevelConfig', 'EntityType', 'XPScalingType',
     # Races
@@ -31,7 +35,7 @@ __all__ = [
     # Currency
     'CurrencySystem', 'Currency', 'ExchangeRate',
     # Conditions
-    'ConditionSystem', 'Condition', 'StatusCondition', 'ConditionSeverity',
+    'ConditionSystem', 'Condition', 'StatusCondition', 'ConditionSeverity', 'ActiveConditions',
     # Elements
     'ElementSystem', 'ElementType', 'ResistanceLevel', 'ElementalResistance',
     # Armor Class
@@ -39,5 +43,13 @@ __all__ = [
     # Equipment
     'EquipmentSystem', 'Equipment', 'EquipmentTag', 'EquipmentSlot',
     # Languages
-    'LanguageSystem', 'Language', 'LanguageProficiency'
+    'LanguageSystem', 'Language', 'LanguageProficiency',
+    # Dice
+    'DiceRoller', 'DiceExpression', 'DiceError', 'RollResult', 'parse_dice',
+    # Catálogos em SQLite
+    'CatalogStore', 'SQLiteCatalog',
+    # Fórmulas
+    'Formula', 'FormulaError', 'compile_formula',
+    # Personagens
+    'CharacterStore', 'Character', 'CharacterAttributes'
 ]
@@ -1,10 +1,11 @@
 """
 Sistema de Classe de Armadura (AC)
 """
-import json
 from typing import Dict, List, Optional
 from dataclasses import dataclass, field
 from enum import Enum
+from .serialization import decode, dumps, encode, loads
+from .tracking import Revisioned
 
 
 class ArmorType(Enum):
@@ -45,7 +46,7 @@ class MagicalAC:
     additional_bonuses: int = 0
 
 
-class ACSystem:
+class ACSystem(Revisioned):
     """Gerenciador do sistema de Classe de Armadura"""
     
     def __init__(self):
@@ -167,47 +168,38 @@ class ACSystem:
         
         return config
     
-    def to_json(self) -> str:
+    def to_json(self, compact: bool = False) -> str:
         """Exporta sistema para JSON"""
         data = {
             'physical_ac_enabled': self.physical_ac_enabled,
             'magical_ac_enabled': self.magical_ac_enabled,
-            'magical_ac': {
-                'enabled': self.magical_ac.enabled,
-                'base_mac': self.magical_ac.base_mac,
-                'primary_attribute': self.magical_ac.primary_attribute,
-                'attribute_multiplier': self.magical_ac.attribute_multiplier,
-                'additional_bonuses': self.magical_ac.additional_bonuses
-            },
+            'magical_ac': encode(self.magical_ac),
             'armor_types': self.armor_types
         }
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return dumps(data, compact)
     
     def save_to_file(self, filepath: str):
         """Salva sistema em arquivo JSON"""
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(self.to_json())
     
+    @classmethod
+    def from_json(cls, json_str: str):
+        """Importa sistema de JSON"""
+        data = loads(json_str)
+        system = cls()
+        
+        system.physical_ac_enabled = data.get('physical_ac_enabled', True)
+        system.magical_ac_enabled = data.get('magical_ac_enabled', False)
+        system.magical_ac = decode(MagicalAC, data.get('magical_ac', {}))
+        
+        if 'armor_types' in data:
+            system.armor_types = data['armor_types']
+        
+        return system
+    
     @classmethod
     def load_from_file(cls, filepath: str):
         """Carrega sistema de arquivo JSON"""
         with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            system = cls()
-            
-            system.physical_ac_enabled = data.get('physical_ac_enabled', True)
-            system.magical_ac_enabled = data.get('magical_ac_enabled', False)
-            
-            mac_data = data.get('magical_ac', {})
-            system.magical_ac = MagicalAC(
-                enabled=mac_data.get('enabled', False),
-                base_mac=mac_data.get('base_mac', 10),
-                primary_attribute=mac_data.get('primary_attribute', 'intelligence'),
-                attribute_multiplier=mac_data.get('attribute_multiplier', 1.0),
-                additional_bonuses=mac_data.get('additional_bonuses', 0)
-            )
-            
-            if 'armor_types' in data:
-                system.armor_types = data['armor_types']
-            
-            return system
+            return cls.from_json(f.read())
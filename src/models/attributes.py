@@ -1,10 +1,30 @@
 """
 Sistema de Atributos - Primários e Secundários
+
+Os secundários formam um grafo de dependências: cada um depende das
+variáveis da sua fórmula, de `parent_attributes` e dos primários que o
+listam em `linked_secondaries` (um secundário pode depender de outro).
+Ciclos são rejeitados em `add_secondary_attribute`; a ordem topológica
+permite recalcular só o que foi afetado por uma mudança:
+
+    evaluator = system.evaluator({'strength': 14, 'level': 3}, 'warrior')
+    evaluator.set('level', 4)  # -> {'hp': 38, ...} (apenas os que mudaram)
+
+Fórmulas alteradas diretamente no objeto exigem `system.mark_dirty()`.
 """
-import json
-from typing import Dict, List, Optional
+import math
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
 from dataclasses import dataclass, field
 
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dependência opcional
+    np = None
+
+from .formula import Formula, FormulaError, compile_formula
+from .serialization import decode, dumps, encode, loads
+from .tracking import Revisioned, mutates
+
 
 @dataclass
 class AttributeRule:
@@ -26,32 +46,263 @@ class SecondaryAttribute:
     formula: str  # Ex: "strength * 2 + dexterity"
     parent_attributes: List[str] = field(default_factory=list)
     class_modifiers: Dict[str, float] = field(default_factory=dict)
+    _compiled: Optional[Formula] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def compiled(self) -> Formula:
+        """Fórmula compilada (recompila se `formula` foi alterada)"""
+        if self._compiled is None or self._compiled.text != self.formula.strip():
+            self._compiled = compile_formula(self.formula)
+        return self._compiled
+
+
+class AttributeCycleError(ValueError):
+    """Atributos secundários com dependência circular"""
+
+
+def _formula_variables(secondary: SecondaryAttribute) -> Tuple[str, ...]:
+    """Variáveis da fórmula (fórmula inválida: nenhuma; ver validate_formulas)"""
+    try:
+        return secondary.compiled.variables
+    except FormulaError:
+        return ()
 
 
-class AttributeSystem:
+class AttributeSystem(Revisioned):
     """Gerenciador do sistema de atributos"""
     
     def __init__(self):
         self.primary_attributes: Dict[str, AttributeRule] = {}
         self.secondary_attributes: Dict[str, SecondaryAttribute] = {}
+        # Grafo de dependências, refeito quando `revision` muda
+        self._graph_revision = -1
+        self._dependencies: Dict[str, Tuple[str, ...]] = {}
+        self._dependents: Dict[str, List[str]] = {}
+        self._order: List[str] = []
+        self._rank: Dict[str, int] = {}
     
+    @mutates
     def add_primary_attribute(self, attr: AttributeRule):
         """Adiciona um atributo primário"""
         self.primary_attributes[attr.name] = attr
     
+    @mutates
     def add_secondary_attribute(self, attr: SecondaryAttribute):
-        """Adiciona um atributo secundário"""
+        """Adiciona um atributo secundário
+        
+        Raises:
+            AttributeCycleError: se o atributo fecha um ciclo de dependências
+        """
+        cycle = self._find_cycle(attr)
+        if cycle:
+            raise AttributeCycleError(f"Dependência circular: {' -> '.join(cycle)}")
         self.secondary_attributes[attr.name] = attr
     
-    def calculate_secondary(self, secondary_name: str, primary_values: Dict[str, int]) -> int:
-        """Calcula o valor de um atributo secundário baseado nos primários"""
+    def dependencies_of(self, secondary: SecondaryAttribute) -> Tuple[str, ...]:
+        """Atributos (primários ou secundários) dos quais o secundário depende"""
+        names = dict.fromkeys(secondary.parent_attributes)
+        names.update(dict.fromkeys(_formula_variables(secondary)))
+        for rule in self.primary_attributes.values():
+            if secondary.name in rule.linked_secondaries:
+                names.setdefault(rule.name)
+        names.pop(secondary.name, None)
+        return tuple(names)
+    
+    def _find_cycle(self, attr: SecondaryAttribute) -> Optional[List[str]]:
+        """Caminho attr -> ... -> attr pelas dependências, se existir"""
+        if attr.name in attr.parent_attributes or attr.name in _formula_variables(attr):
+            return [attr.name, attr.name]
+        path = [attr.name]
+        visited = set()
+        
+        def visit(secondary: SecondaryAttribute) -> bool:
+            for name in self.dependencies_of(secondary):
+                if name == attr.name:
+                    path.append(name)
+                    return True
+                dependency = self.secondary_attributes.get(name)
+                if dependency is None or name in visited:
+                    continue
+                visited.add(name)
+                path.append(name)
+                if visit(dependency):
+                    return True
+                path.pop()
+            return False
+        
+        return path if visit(attr) else None
+    
+    def _graph(self):
+        """Refaz o grafo e a ordem topológica se o sistema mudou"""
+        if self._graph_revision == self.revision:
+            return
+        dependencies = {name: self.dependencies_of(secondary)
+                        for name, secondary in self.secondary_attributes.items()}
+        dependents: Dict[str, List[str]] = {}
+        pending = {}
+        for name, names in dependencies.items():
+            pending[name] = sum(1 for dependency in names if dependency in dependencies)
+            for dependency in names:
+                dependents.setdefault(dependency, []).append(name)
+        
+        # Kahn: secundários sem dependências secundárias pendentes primeiro
+        order = [name for name, count in pending.items() if count == 0]
+        for name in order:
+            for dependent in dependents.get(name, ()):
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    order.append(dependent)
+        if len(order) < len(dependencies):
+            cyclic = sorted(name for name, count in pending.items() if count > 0)
+            raise AttributeCycleError(f"Dependência circular entre: {', '.join(cyclic)}")
+        
+        self._dependencies = dependencies
+        self._dependents = dependents
+        self._order = order
+        self._rank = {name: index for index, name in enumerate(order)}
+        self._graph_revision = self.revision
+    
+    @property
+    def evaluation_order(self) -> List[str]:
+        """Secundários em ordem topológica (dependências antes dos dependentes)"""
+        self._graph()
+        return list(self._order)
+    
+    def affected_secondaries(self, changed: Iterable[str]) -> List[str]:
+        """Secundários afetados (direta ou indiretamente) pelos atributos alterados"""
+        self._graph()
+        affected = set()
+        stack = list(changed)
+        while stack:
+            for dependent in self._dependents.get(stack.pop(), ()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    stack.append(dependent)
+        return sorted(affected, key=self._rank.__getitem__)
+    
+    def _evaluate(self, name: str, values: Mapping[str, int], character_class: Optional[str]) -> int:
+        secondary = self.secondary_attributes[name]
+        value = secondary.compiled.evaluate(values)
+        try:
+            if character_class is not None:
+                value *= secondary.class_modifiers.get(character_class, 1.0)
+            return math.floor(value)
+        except (OverflowError, ValueError) as e:
+            # inf/nan não viram int: mesmo erro da avaliação em lote
+            raise FormulaError(f"Erro ao avaliar {secondary.formula!r}: {e}")
+    
+    def calculate_all_secondaries(self, primary_values: Dict[str, int],
+                                  character_class: Optional[str] = None) -> Dict[str, int]:
+        """Calcula todos os secundários, em ordem topológica"""
+        self._graph()
+        values = dict(primary_values)
+        result = {}
+        for name in self._order:
+            values[name] = result[name] = self._evaluate(name, values, character_class)
+        return result
+    
+    def calculate_secondaries_batch(self, columns: Mapping[str, Any],
+                                    character_class: Union[None, str, Sequence[str]] = None) -> Dict[str, Any]:
+        """Calcula todos os secundários para várias entidades de uma vez
+        
+        `columns` = {atributo: array NumPy}, uma linha por entidade (ex.: os
+        monstros de um encontro). `character_class` é uma classe para todas
+        as linhas ou uma sequência com a classe de cada linha. Retorna
+        {secundário: array int64}, na mesma ordem das linhas.
+        
+        Sem NumPy, avalia linha a linha e retorna listas.
+        """
+        self._graph()
+        rows = len(next(iter(columns.values()))) if columns else 0
+        per_row = character_class is not None and not isinstance(character_class, str)
+        if np is None:
+            classes = character_class if per_row else [character_class] * rows
+            names = list(columns)
+            result = {name: [] for name in self._order}
+            for index, row_class in enumerate(classes):
+                row = {name: columns[name][index] for name in names}
+                for name, value in self.calculate_all_secondaries(row, row_class).items():
+                    result[name].append(value)
+            return result
+        
+        values = {name: np.asarray(column) for name, column in columns.items()}
+        if per_row:
+            classes = np.asarray(character_class, dtype=object)
+        result = {}
+        for name in self._order:
+            secondary = self.secondary_attributes[name]
+            column = secondary.compiled.evaluate_columns(values, rows)
+            if per_row:
+                modifiers = np.ones(rows)
+                for class_name, modifier in secondary.class_modifiers.items():
+                    modifiers[classes == class_name] = modifier
+                column = column * modifiers
+            elif character_class is not None:
+                column = column * secondary.class_modifiers.get(character_class, 1.0)
+            if column.dtype.kind in 'biu':
+                column = column.astype(np.int64)
+            else:
+                try:
+                    with np.errstate(invalid='raise'):
+                        column = np.floor(column).astype(np.int64)
+                except FloatingPointError as e:
+                    raise FormulaError(f"Erro ao avaliar {secondary.formula!r}: {e}")
+            values[name] = result[name] = column
+        return result
+    
+    def evaluator(self, primary_values: Dict[str, int],
+                  character_class: Optional[str] = None) -> 'AttributeEvaluator':
+        """Avaliador incremental para os atributos de um personagem"""
+        return AttributeEvaluator(self, primary_values, character_class)
+    
+    def calculate_secondary(self, secondary_name: str, primary_values: Dict[str, int],
+                            character_class: Optional[str] = None) -> int:
+        """Calcula o valor de um atributo secundário baseado nos primários
+        
+        A fórmula é compilada no primeiro uso (src/models/formula.py);
+        atributos ausentes valem 0. O modificador da classe, se houver,
+        multiplica o resultado, arredondado para baixo. Secundários dos
+        quais este depende são calculados antes, se não vierem em
+        `primary_values`.
+        """
         if secondary_name not in self.secondary_attributes:
             return 0
         
-        secondary = self.secondary_attributes[secondary_name]
-        # Implementar parser de fórmula
-        # TODO: Usar eval com segurança ou criar parser próprio
-        return 0
+        self._graph()
+        upstream = self._upstream(secondary_name, primary_values)
+        if upstream:
+            values = dict(primary_values)
+            for name in upstream:
+                values[name] = self._evaluate(name, values, character_class)
+            primary_values = values
+        return self._evaluate(secondary_name, primary_values, character_class)
+    
+    def _upstream(self, secondary_name: str, known: Mapping[str, int]) -> List[str]:
+        """Secundários ainda não calculados dos quais `secondary_name` depende, em ordem"""
+        needed = set()
+        stack = [secondary_name]
+        while stack:
+            for name in self._dependencies[stack.pop()]:
+                if name in self._rank and name not in known and name not in needed:
+                    needed.add(name)
+                    stack.append(name)
+        return sorted(needed, key=self._rank.__getitem__)
+    
+    def validate_formulas(self) -> List[str]:
+        """Compila todas as fórmulas e confere dependências circulares;
+        retorna as mensagens de erro
+        """
+        errors = []
+        for name, secondary in self.secondary_attributes.items():
+            try:
+                secondary.compiled
+            except FormulaError as e:
+                errors.append(f"Atributo secundário '{name}': {e}")
+        try:
+            self._graph()
+        except AttributeCycleError as e:
+            errors.append(f"Atributos secundários: {e}")
+        return errors
     
     def validate_mandatory_attributes(self, attributes: Dict[str, int]) -> bool:
         """Valida se todos atributos obrigatórios estão presentes"""
@@ -60,25 +311,27 @@ class AttributeSystem:
                 return False
         return True
     
-    def to_json(self) -> str:
+    def to_json(self, compact: bool = False) -> str:
         """Exporta sistema de atributos para JSON"""
         data = {
-            'primary': {name: attr.__dict__ for name, attr in self.primary_attributes.items()},
-            'secondary': {name: attr.__dict__ for name, attr in self.secondary_attributes.items()}
+            'primary': {name: encode(attr) for name, attr in self.primary_attributes.items()},
+            'secondary': {name: encode(attr) for name, attr in self.secondary_attributes.items()}
         }
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return dumps(data, compact)
     
     @classmethod
     def from_json(cls, json_str: str):
         """Importa sistema de atributos de JSON"""
-        data = json.loads(json_str)
+        data = loads(json_str)
         system = cls()
         
         for name, attr_data in data.get('primary', {}).items():
-            system.add_primary_attribute(AttributeRule(**attr_data))
+            system.add_primary_attribute(decode(AttributeRule, attr_data))
         
+        # Sem a checagem de ciclos de add_secondary_attribute: um mundo salvo
+        # com ciclos ainda abre, e validate_formulas os aponta
         for name, attr_data in data.get('secondary', {}).items():
-            system.add_secondary_attribute(SecondaryAttribute(**attr_data))
+            system.secondary_attributes[name] = decode(SecondaryAttribute, attr_data)
         
         return system
     
@@ -92,3 +345,58 @@ class AttributeSystem:
         """Carrega sistema de arquivo JSON"""
         with open(filepath, 'r', encoding='utf-8') as f:
             return cls.from_json(f.read())
+
+
+class AttributeEvaluator:
+    """Atributos de um personagem com recálculo incremental dos secundários
+    
+    `set`/`update` recalculam apenas os secundários alcançáveis a partir
+    dos atributos alterados, em ordem topológica, e param a propagação
+    onde o valor recalculado não mudou. Se o sistema de atributos mudar
+    (nova `revision`), tudo é recalculado na próxima atualização.
+    """
+    
+    def __init__(self, system: AttributeSystem, primary_values: Dict[str, int],
+                 character_class: Optional[str] = None):
+        self.system = system
+        self.character_class = character_class
+        self.values: Dict[str, int] = dict(primary_values)
+        self.revision = -1
+        self.recalculate()
+    
+    def __getitem__(self, name: str) -> int:
+        return self.values[name]
+    
+    def get(self, name: str, default: int = 0) -> int:
+        return self.values.get(name, default)
+    
+    def recalculate(self) -> Dict[str, int]:
+        """Recalcula todos os secundários"""
+        secondaries = self.system.calculate_all_secondaries(self.values, self.character_class)
+        self.values.update(secondaries)
+        self.revision = self.system.revision
+        return secondaries
+    
+    def set(self, name: str, value: int) -> Dict[str, int]:
+        """Altera um atributo primário; retorna os secundários que mudaram"""
+        return self.update({name: value})
+    
+    def update(self, changes: Mapping[str, int]) -> Dict[str, int]:
+        """Altera atributos primários; retorna os secundários que mudaram"""
+        system = self.system
+        if self.revision != system.revision:
+            before = {name: self.values.get(name) for name in system.secondary_attributes}
+            self.values.update(changes)
+            return {name: value for name, value in self.recalculate().items() if before[name] != value}
+        
+        dirty = {name for name, value in changes.items() if self.values.get(name) != value}
+        self.values.update(changes)
+        changed = {}
+        for name in system.affected_secondaries(dirty):
+            if not dirty.intersection(system._dependencies[name]):
+                continue
+            value = system._evaluate(name, self.values, self.character_class)
+            if self.values.get(name) != value:
+                self.values[name] = changed[name] = value
+                dirty.add(name)
+        return changed
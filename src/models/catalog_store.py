@@ -0,0 +1,326 @@
+"""
+Catálogos de regras em SQLite (equipamentos, talentos)
+
+Para mundos com dezenas de milhares de itens (compêndios importados), o
+catálogo pode ficar em um banco SQLite em vez de um dict carregado do JSON.
+`SQLiteCatalog` tem a interface de um dict {nome: objeto}, mas cada linha
+só vira dataclass quando é pedida, e as consultas usam colunas indexadas:
+
+    store = CatalogStore.open('compendio.sqlite')
+    world.equipment.use_store(store)
+    world.equipment.get_items_by_rarity('rare')   # SELECT ... WHERE rarity = ?
+
+As alterações ficam em uma transação aberta até `commit()`, chamado ao
+salvar o mundo (WorldManager.save_world, só depois que os arquivos JSON
+foram substituídos) ou o sistema (`save_to_file`); fechar o banco sem
+salvar as descarta.
+Objetos já materializados não são observados: depois de alterar um deles,
+adicione-o de novo (`add_equipment`, `add_talent`) para gravar a mudança.
+
+No JSON do sistema, o caminho do banco é gravado relativo à pasta do
+mundo (`base_dir`) e resolvido a partir dela ao carregar, para que o
+mundo continue válido se a pasta for movida ou copiada.
+"""
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .serialization import dumps, loads
+
+STORE_EXTENSION = '.sqlite'
+# Objetos materializados mantidos em memória por catálogo
+DEFAULT_CACHE_SIZE = 1024
+
+
+class CatalogStore:
+    """Banco SQLite compartilhado pelos catálogos de um mundo"""
+
+    _open_stores: Dict[str, 'CatalogStore'] = {}
+    _open_lock = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = path
+        # Usado também pela thread de salvamento do WorldManager
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.RLock()
+        if path != ':memory:':
+            self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.catalogs: Dict[str, 'SQLiteCatalog'] = {}
+
+    @classmethod
+    def open(cls, path: str, base_dir: Optional[str] = None) -> 'CatalogStore':
+        """Abre o banco, reutilizando a conexão se já estiver aberto
+
+        Um caminho relativo (como gravado por `reference`) é resolvido a
+        partir de `base_dir`, se informado.
+        """
+        if base_dir is not None and path != ':memory:' and not os.path.isabs(path):
+            path = os.path.join(base_dir, path)
+        key = os.path.abspath(path)
+        with cls._open_lock:
+            store = cls._open_stores.get(key)
+            if store is None or store.connection is None:
+                store = cls(path)
+                cls._open_stores[key] = store
+            return store
+
+    def reference(self, base_dir: Optional[str] = None) -> str:
+        """Caminho do banco para gravar no JSON: relativo a `base_dir`, se informado"""
+        if base_dir is None or self.path == ':memory:':
+            return self.path
+        try:
+            return os.path.relpath(os.path.abspath(self.path), os.path.abspath(base_dir))
+        except ValueError:
+            # Outra unidade (Windows): não há caminho relativo
+            return os.path.abspath(self.path)
+
+    def catalog(self, table: str, encode: Callable[[Any], Dict], decode: Callable[[Dict], Any],
+                columns: Optional[Dict[str, Callable[[Any], Any]]] = None,
+                tags: Optional[Callable[[Any], Iterable[str]]] = None,
+                requirements: Optional[Callable[[Any], Dict[str, int]]] = None,
+                cache_size: int = DEFAULT_CACHE_SIZE) -> 'SQLiteCatalog':
+        """Retorna (criando as tabelas se preciso) o catálogo `table`"""
+        with self.lock:
+            catalog = self.catalogs.get(table)
+            if catalog is None:
+                catalog = SQLiteCatalog(self, table, encode, decode, columns or {},
+                                        tags, requirements, cache_size)
+                self.catalogs[table] = catalog
+            return catalog
+
+    def commit(self):
+        with self.lock:
+            self.connection.commit()
+
+    def rollback(self):
+        """Descarta as alterações não salvas (e os objetos em cache)"""
+        with self.lock:
+            self.connection.rollback()
+            for catalog in self.catalogs.values():
+                catalog.clear_cache()
+
+    @contextmanager
+    def transaction(self):
+        """Grava tudo ou nada: commit ao sair, rollback se houver exceção"""
+        with self.lock:
+            try:
+                yield self
+            except BaseException:
+                self.rollback()
+                raise
+            self.commit()
+
+    def close(self):
+        """Fecha o banco sem salvar as alterações pendentes"""
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+        with CatalogStore._open_lock:
+            key = os.path.abspath(self.path)
+            if CatalogStore._open_stores.get(key) is self:
+                del CatalogStore._open_stores[key]
+
+
+class SQLiteCatalog(MutableMapping):
+    """Catálogo {nome: objeto} guardado em uma tabela SQLite
+
+    Tabelas criadas para o catálogo `t`:
+        t               name, colunas indexadas, data (JSON de `encode`)
+        t_tags          (tag, name), se `tags` for informado
+        t_requirements  (name, attribute, min_value), se `requirements` for informado
+    """
+
+    def __init__(self, store: CatalogStore, table: str,
+                 encode: Callable[[Any], Dict], decode: Callable[[Dict], Any],
+                 columns: Dict[str, Callable[[Any], Any]],
+                 tags: Optional[Callable[[Any], Iterable[str]]] = None,
+                 requirements: Optional[Callable[[Any], Dict[str, int]]] = None,
+                 cache_size: int = DEFAULT_CACHE_SIZE):
+        self.store = store
+        self.table = table
+        self.encode = encode
+        self.decode = decode
+        self.columns = columns
+        self.tags = tags
+        self.requirements = requirements
+        self.cache_size = cache_size
+        self._cache: 'OrderedDict[str, Any]' = OrderedDict()
+        self._create_tables()
+
+    def _create_tables(self):
+        t = self.table
+        names = list(self.columns)
+        statements = [
+            f"CREATE TABLE IF NOT EXISTS {t} (name TEXT PRIMARY KEY, "
+            + ''.join(f"{column}, " for column in names) + "data TEXT NOT NULL)"
+        ]
+        statements += [f"CREATE INDEX IF NOT EXISTS {t}_{column} ON {t}({column})" for column in names]
+        if self.tags is not None:
+            statements += [
+                f"CREATE TABLE IF NOT EXISTS {t}_tags (tag TEXT, name TEXT, PRIMARY KEY (tag, name)) WITHOUT ROWID",
+                f"CREATE INDEX IF NOT EXISTS {t}_tags_name ON {t}_tags(name)"
+            ]
+        if self.requirements is not None:
+            statements += [
+                f"CREATE TABLE IF NOT EXISTS {t}_requirements "
+                f"(name TEXT, attribute TEXT, min_value INTEGER, PRIMARY KEY (name, attribute)) WITHOUT ROWID",
+                f"CREATE INDEX IF NOT EXISTS {t}_requirements_attribute ON {t}_requirements(attribute, min_value)"
+            ]
+        with self.store.lock:
+            for statement in statements:
+                self.store.connection.execute(statement)
+            self.store.connection.commit()
+
+    # Cache de objetos materializados (LRU)
+
+    # O cache é compartilhado com a thread de salvamento: sempre sob store.lock
+
+    def _cached(self, name: str, data: str) -> Any:
+        with self.store.lock:
+            item = self._cache.get(name)
+            if item is None:
+                item = self.decode(loads(data))
+                self._remember(name, item)
+            else:
+                self._cache.move_to_end(name)
+            return item
+
+    def _remember(self, name: str, item: Any):
+        with self.store.lock:
+            self._cache[name] = item
+            self._cache.move_to_end(name)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self):
+        with self.store.lock:
+            self._cache.clear()
+
+    # Interface de dict
+
+    def __getitem__(self, name: str) -> Any:
+        with self.store.lock:
+            item = self._cache.get(name)
+            if item is not None:
+                self._cache.move_to_end(name)
+                return item
+            row = self.store.connection.execute(
+                f"SELECT data FROM {self.table} WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                raise KeyError(name)
+            return self._cached(name, row[0])
+
+    def __setitem__(self, name: str, item: Any):
+        t = self.table
+        data = dumps(self.encode(item), compact=True)
+        values = [column(item) for column in self.columns.values()]
+        names = list(self.columns) + ['data']
+        # UPSERT mantém o rowid e, com ele, a ordem de inserção
+        sql = (f"INSERT INTO {t} (name, {', '.join(names)}) VALUES (?{', ?' * len(names)}) "
+               f"ON CONFLICT(name) DO UPDATE SET " + ', '.join(f"{n} = excluded.{n}" for n in names))
+        with self.store.lock:
+            connection = self.store.connection
+            connection.execute(sql, [name] + values + [data])
+            if self.tags is not None:
+                connection.execute(f"DELETE FROM {t}_tags WHERE name = ?", (name,))
+                connection.executemany(f"INSERT OR IGNORE INTO {t}_tags (tag, name) VALUES (?, ?)",
+                                       [(tag, name) for tag in self.tags(item)])
+            if self.requirements is not None:
+                connection.execute(f"DELETE FROM {t}_requirements WHERE name = ?", (name,))
+                connection.executemany(
+                    f"INSERT INTO {t}_requirements (name, attribute, min_value) VALUES (?, ?, ?)",
+                    [(name, attribute, value) for attribute, value in self.requirements(item).items()])
+            self._remember(name, item)
+
+    def __delitem__(self, name: str):
+        t = self.table
+        with self.store.lock:
+            connection = self.store.connection
+            if connection.execute(f"DELETE FROM {t} WHERE name = ?", (name,)).rowcount == 0:
+                raise KeyError(name)
+            if self.tags is not None:
+                connection.execute(f"DELETE FROM {t}_tags WHERE name = ?", (name,))
+            if self.requirements is not None:
+                connection.execute(f"DELETE FROM {t}_requirements WHERE name = ?", (name,))
+            self._cache.pop(name, None)
+
+    def __contains__(self, name: object) -> bool:
+        with self.store.lock:
+            if name in self._cache:
+                return True
+            return self.store.connection.execute(
+                f"SELECT 1 FROM {self.table} WHERE name = ?", (name,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        with self.store.lock:
+            names = [row[0] for row in self.store.connection.execute(
+                f"SELECT name FROM {self.table} ORDER BY rowid")]
+        return iter(names)
+
+    def __len__(self) -> int:
+        with self.store.lock:
+            return self.store.connection.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def values(self) -> List[Any]:
+        """Todos os objetos, em uma única consulta"""
+        return [item for _, item in self.items()]
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return self._select('', ())
+
+    def update_many(self, items: Iterable[Tuple[str, Any]]):
+        """Insere vários objetos na transação atual"""
+        with self.store.lock:
+            for name, item in items:
+                self[name] = item
+
+    # Consultas indexadas
+
+    def _select(self, where: str, params: Iterable, join: str = '') -> List[Tuple[str, Any]]:
+        t = self.table
+        sql = f"SELECT {t}.name, {t}.data FROM {t} {join} {where} ORDER BY {t}.rowid"
+        with self.store.lock:
+            rows = self.store.connection.execute(sql, tuple(params)).fetchall()
+            return [(name, self._cached(name, data)) for name, data in rows]
+
+    def where(self, **filters) -> List[Any]:
+        """Objetos cujas colunas indexadas são iguais aos valores dados"""
+        unknown = set(filters) - set(self.columns)
+        if unknown:
+            raise ValueError(f"Colunas não indexadas em {self.table}: {', '.join(sorted(unknown))}")
+        if not filters:
+            return self.values()
+        where = 'WHERE ' + ' AND '.join(f"{self.table}.{column} = ?" for column in filters)
+        return [item for _, item in self._select(where, filters.values())]
+
+    def with_tag(self, tag: str) -> List[Any]:
+        """Objetos com a tag (exige `tags`)"""
+        if self.tags is None:
+            raise ValueError(f"O catálogo {self.table} não indexa tags")
+        t = self.table
+        return [item for _, item in self._select(
+            f"JOIN {t}_tags ON {t}_tags.name = {t}.name WHERE {t}_tags.tag = ?", (tag,))]
+
+    def meeting_requirements(self, attributes: Dict[str, int], level: Optional[int] = None,
+                             level_column: str = 'min_level') -> List[Any]:
+        """Objetos cujos requisitos de atributo (e nível, se houver a coluna)
+        são atendidos por `attributes`; atributos ausentes contam como 0
+        """
+        if self.requirements is None:
+            raise ValueError(f"O catálogo {self.table} não indexa requisitos")
+        t = self.table
+        clauses = [
+            f"NOT EXISTS (SELECT 1 FROM {t}_requirements r LEFT JOIN json_each(?) a ON a.key = r.attribute "
+            f"WHERE r.name = {t}.name AND r.min_value > COALESCE(a.value, 0))"
+        ]
+        params: List[Any] = [dumps(dict(attributes), compact=True)]
+        if level is not None and level_column in self.columns:
+            clauses.append(f"{t}.{level_column} <= ?")
+            params.append(level)
+        return [item for _, item in self._select('WHERE ' + ' AND '.join(clauses), params)]
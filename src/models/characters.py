@@ -0,0 +1,384 @@
+"""
+Personagens em colunas (struct-of-arrays)
+
+Os valores numéricos de todos os personagens (nível e atributos) ficam em
+arrays tipados, uma coluna por atributo; o nome de cada atributo é
+internado e mapeado para o índice da sua coluna. Cada personagem é só um
+id de linha, e `Character` é uma vista leve (com __slots__) sobre ela:
+
+    store = CharacterStore(['strength', 'dexterity', 'constitution'])
+    goblin = store.add('Goblin', race='Goblin', level=2, attributes={'strength': 8})
+    goblin.attributes['strength'] += 1
+    store.add_to('level', 1)                        # todos sobem de nível
+    store.update_secondaries(world.attributes)      # hp, ... em lote
+
+Um GM com milhares de NPCs gasta alguns bytes por atributo em vez de um
+dict por personagem, e operações em massa usam NumPy se instalado.
+`Character.get` aceita as mesmas chaves do `character_data` dos sistemas
+(level, attributes, proficiencies, talents, race, class), então um
+personagem pode ser passado direto a `check_requirements`.
+"""
+import sys
+from array import array
+from collections.abc import MutableMapping
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dependência opcional
+    np = None
+
+TYPECODE = 'i'  # int32 por valor
+INT32_MIN, INT32_MAX = -2 ** 31, 2 ** 31 - 1
+LEVEL = 'level'
+
+
+def _check_range(attr: str, low: int, high: int):
+    if low < INT32_MIN or high > INT32_MAX:
+        raise ValueError(f"Valores de {attr!r} fora do intervalo int32 ({low}..{high})")
+
+
+class CharacterStore:
+    """Colunas de atributos de um conjunto de personagens"""
+
+    def __init__(self, attributes: Iterable[str] = ()):
+        self._index: Dict[str, int] = {}
+        self._columns: List[array] = []
+        self._names: List[Optional[str]] = []
+        self._races: List[Optional[str]] = []
+        self._classes: List[Optional[str]] = []
+        self._proficiencies: List[FrozenSet[str]] = []
+        self._talents: List[FrozenSet[str]] = []
+        self._alive = bytearray()
+        self._free: List[int] = []
+        # Conjuntos iguais (NPCs do mesmo modelo) compartilham o mesmo objeto
+        self._sets: Dict[FrozenSet[str], FrozenSet[str]] = {}
+        self.count = 0
+        self.column_index(LEVEL)
+        for name in attributes:
+            self.column_index(name)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, character_id: int) -> bool:
+        return 0 <= character_id < len(self._alive) and self._alive[character_id] == 1
+
+    def __getitem__(self, character_id: int) -> 'Character':
+        if character_id not in self:
+            raise KeyError(character_id)
+        return Character(self, character_id)
+
+    def __iter__(self) -> Iterator['Character']:
+        for character_id in self.ids():
+            yield Character(self, character_id)
+
+    @property
+    def attribute_names(self) -> List[str]:
+        """Atributos com coluna (sem o nível)"""
+        return [name for name in self._index if name != LEVEL]
+
+    def column_index(self, name: str) -> int:
+        """Índice da coluna do atributo, criando-a (zerada) se não existir"""
+        index = self._index.get(name)
+        if index is None:
+            index = len(self._columns)
+            self._index[sys.intern(name)] = index
+            self._columns.append(array(TYPECODE, bytes(len(self._alive) * array(TYPECODE).itemsize)))
+        return index
+
+    def ids(self) -> List[int]:
+        """Ids dos personagens existentes, em ordem de linha"""
+        return [character_id for character_id, alive in enumerate(self._alive) if alive]
+
+    def _intern_set(self, values: Iterable[str]) -> FrozenSet[str]:
+        values = frozenset(values)
+        return self._sets.setdefault(values, values)
+
+    def add(self, name: str, race: Optional[str] = None, character_class: Optional[str] = None,
+            level: int = 1, attributes: Optional[Dict[str, int]] = None,
+            proficiencies: Iterable[str] = (), talents: Iterable[str] = ()) -> 'Character':
+        """Adiciona um personagem (reutiliza linhas de removidos)"""
+        if self._free:
+            row = self._free.pop()
+            for column in self._columns:
+                column[row] = 0
+            self._alive[row] = 1
+            self._names[row] = name
+            self._races[row] = race
+            self._classes[row] = character_class
+            self._proficiencies[row] = self._intern_set(proficiencies)
+            self._talents[row] = self._intern_set(talents)
+        else:
+            row = len(self._alive)
+            for column in self._columns:
+                column.append(0)
+            self._alive.append(1)
+            self._names.append(name)
+            self._races.append(race)
+            self._classes.append(character_class)
+            self._proficiencies.append(self._intern_set(proficiencies))
+            self._talents.append(self._intern_set(talents))
+        self.count += 1
+
+        self._columns[self._index[LEVEL]][row] = level
+        for attr, value in (attributes or {}).items():
+            self._columns[self.column_index(attr)][row] = value
+        return Character(self, row)
+
+    def add_from_dict(self, character_data: Dict) -> 'Character':
+        """Adiciona a partir do dict `character_data` usado pelos sistemas"""
+        return self.add(
+            character_data.get('name', ''), race=character_data.get('race'),
+            character_class=character_data.get('class'), level=character_data.get('level', 1),
+            attributes=character_data.get('attributes'),
+            proficiencies=character_data.get('proficiencies', ()),
+            talents=character_data.get('talents', ())
+        )
+
+    def remove(self, character_id: int):
+        """Remove um personagem; a linha fica livre para o próximo `add`"""
+        if character_id not in self:
+            raise KeyError(character_id)
+        self._alive[character_id] = 0
+        self._names[character_id] = self._races[character_id] = self._classes[character_id] = None
+        self._proficiencies[character_id] = self._talents[character_id] = frozenset()
+        self._free.append(character_id)
+        self.count -= 1
+
+    def get_value(self, character_id: int, attr: str, default: int = 0) -> int:
+        index = self._index.get(attr)
+        return default if index is None else self._columns[index][character_id]
+
+    def set_value(self, character_id: int, attr: str, value: int):
+        self._columns[self.column_index(attr)][character_id] = value
+
+    def column(self, attr: str) -> array:
+        """Coluna tipada do atributo (todas as linhas, inclusive livres)"""
+        return self._columns[self.column_index(attr)]
+
+    def to_numpy(self, attributes: Optional[Iterable[str]] = None,
+                 ids: Optional[Sequence[int]] = None) -> Dict[str, Any]:
+        """{atributo: array NumPy} dos personagens `ids` (padrão: todos, como `ids()`)
+
+        Os arrays são cópias; use `set_column`/`add_to` para gravar.
+        """
+        rows = self._rows(ids)
+        names = list(self._index) if attributes is None else list(attributes)
+        result = {}
+        for name in names:
+            index = self._index.get(name)
+            if index is None:
+                result[name] = np.zeros(len(rows), dtype=np.int32)
+            else:
+                result[name] = np.frombuffer(self._columns[index], dtype=np.int32)[rows]
+        return result
+
+    def _rows(self, ids: Optional[Sequence[int]]) -> Any:
+        if np is None:
+            raise RuntimeError("Operações em colunas requerem NumPy")
+        if ids is None:
+            return np.flatnonzero(np.frombuffer(self._alive, dtype=np.uint8))
+        return np.asarray(ids, dtype=np.intp)
+
+    def set_column(self, attr: str, values: Sequence[int], ids: Optional[Sequence[int]] = None):
+        """Grava `values` no atributo dos personagens `ids` (padrão: todos)
+
+        Valores não inteiros ou fora do intervalo int32 levantam ValueError
+        sem gravar nada (o NumPy os truncaria em silêncio).
+        """
+        column = self.column(attr)
+        if np is None:
+            values = list(values)
+            if values:
+                _check_range(attr, min(values), max(values))
+            for character_id, value in zip(self.ids() if ids is None else ids, values):
+                column[character_id] = value
+            return
+        values = np.asarray(values)
+        if values.dtype.kind not in 'biu':
+            raise ValueError(f"Valores de {attr!r} devem ser inteiros, não {values.dtype}")
+        if values.size:
+            _check_range(attr, int(values.min()), int(values.max()))
+        view = np.frombuffer(column, dtype=np.int32)
+        view[self._rows(ids)] = values
+        del view  # libera o buffer: a coluna volta a poder crescer
+
+    def add_to(self, attr: str, delta: int, ids: Optional[Sequence[int]] = None):
+        """Soma `delta` ao atributo dos personagens `ids` (padrão: todos)
+
+        Se algum resultado sair do intervalo int32, levanta ValueError sem
+        alterar nenhum personagem.
+        """
+        column = self.column(attr)
+        if np is None:
+            rows = self.ids() if ids is None else list(ids)
+            totals = [column[character_id] + delta for character_id in rows]
+            if totals:
+                _check_range(attr, min(totals), max(totals))
+            for character_id, total in zip(rows, totals):
+                column[character_id] = total
+            return
+        view = np.frombuffer(column, dtype=np.int32)
+        rows = self._rows(ids)
+        totals = view[rows].astype(np.int64) + delta
+        if totals.size:
+            _check_range(attr, int(totals.min()), int(totals.max()))
+        view[rows] = totals
+        del view
+
+    def update_secondaries(self, attribute_system, ids: Optional[Sequence[int]] = None) -> Dict[str, Any]:
+        """Recalcula e grava os secundários de `attribute_system` em lote
+
+        Usa a classe de cada personagem para os `class_modifiers`.
+        """
+        ids = self.ids() if ids is None else list(ids)
+        classes = [self._classes[character_id] or '' for character_id in ids]
+        if np is None:
+            columns = {name: [column[character_id] for character_id in ids]
+                       for name, column in zip(self._index, self._columns)}
+        else:
+            columns = self.to_numpy(ids=ids)
+        secondaries = attribute_system.calculate_secondaries_batch(columns, classes)
+        for name, values in secondaries.items():
+            self.set_column(name, values, ids)
+        return secondaries
+
+    def memory_usage(self) -> int:
+        """Bytes aproximados das colunas e listas do armazenamento"""
+        total = sum(sys.getsizeof(column) for column in self._columns)
+        total += sys.getsizeof(self._alive) + sys.getsizeof(self._free)
+        for values in (self._names, self._races, self._classes, self._proficiencies, self._talents):
+            total += sys.getsizeof(values)
+        total += sum(sys.getsizeof(name) for name in self._names if name is not None)
+        total += sum(sys.getsizeof(values) for values in self._sets)
+        return total
+
+
+class CharacterAttributes(MutableMapping):
+    """Vista dos atributos (sem o nível) de um personagem"""
+
+    __slots__ = ('store', 'id')
+
+    def __init__(self, store: CharacterStore, character_id: int):
+        self.store = store
+        self.id = character_id
+
+    def __getitem__(self, attr: str) -> int:
+        index = self.store._index.get(attr)
+        if index is None or attr == LEVEL:
+            raise KeyError(attr)
+        return self.store._columns[index][self.id]
+
+    def __setitem__(self, attr: str, value: int):
+        if attr == LEVEL:
+            raise KeyError(attr)
+        self.store.set_value(self.id, attr, value)
+
+    def __delitem__(self, attr: str):
+        raise TypeError("Atributos não podem ser removidos de um personagem")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.store.attribute_names)
+
+    def __len__(self) -> int:
+        return len(self.store._index) - 1
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+class Character:
+    """Vista de um personagem de um CharacterStore (não guarda valores)"""
+
+    __slots__ = ('store', 'id')
+
+    def __init__(self, store: CharacterStore, character_id: int):
+        self.store = store
+        self.id = character_id
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Character) and other.store is self.store and other.id == self.id
+
+    def __hash__(self) -> int:
+        return hash((id(self.store), self.id))
+
+    def __repr__(self) -> str:
+        return f"Character({self.id}, {self.name!r}, level={self.level})"
+
+    @property
+    def name(self) -> Optional[str]:
+        return self.store._names[self.id]
+
+    @name.setter
+    def name(self, value: str):
+        self.store._names[self.id] = value
+
+    @property
+    def race(self) -> Optional[str]:
+        return self.store._races[self.id]
+
+    @race.setter
+    def race(self, value: Optional[str]):
+        self.store._races[self.id] = value
+
+    @property
+    def character_class(self) -> Optional[str]:
+        return self.store._classes[self.id]
+
+    @character_class.setter
+    def character_class(self, value: Optional[str]):
+        self.store._classes[self.id] = value
+
+    @property
+    def level(self) -> int:
+        return self.store._columns[0][self.id]
+
+    @level.setter
+    def level(self, value: int):
+        self.store._columns[0][self.id] = value
+
+    @property
+    def attributes(self) -> CharacterAttributes:
+        return CharacterAttributes(self.store, self.id)
+
+    @property
+    def proficiencies(self) -> FrozenSet[str]:
+        return self.store._proficiencies[self.id]
+
+    @proficiencies.setter
+    def proficiencies(self, values: Iterable[str]):
+        self.store._proficiencies[self.id] = self.store._intern_set(values)
+
+    @property
+    def talents(self) -> FrozenSet[str]:
+        return self.store._talents[self.id]
+
+    @talents.setter
+    def talents(self, values: Iterable[str]):
+        self.store._talents[self.id] = self.store._intern_set(values)
+
+    _KEYS = {
+        'name': 'name', 'race': 'race', 'class': 'character_class', 'level': 'level',
+        'attributes': 'attributes', 'proficiencies': 'proficiencies', 'talents': 'talents',
+    }
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Acesso no formato do `character_data` dos sistemas de regras"""
+        attribute = self._KEYS.get(key)
+        if attribute is None:
+            return default
+        value = getattr(self, attribute)
+        return default if value is None else value
+
+    def to_dict(self) -> Dict:
+        """Dict `character_data` equivalente"""
+        return {
+            'name': self.name,
+            'race': self.race,
+            'class': self.character_class,
+            'level': self.level,
+            'attributes': dict(self.attributes),
+            'proficiencies': sorted(self.proficiencies),
+            'talents': sorted(self.talents),
+        }
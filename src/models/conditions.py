@@ -1,10 +1,18 @@
 """
 Sistema de Status e Condições
+
+As condições ativas de uma entidade ficam em `ActiveConditions`, uma
+sequência indexada pelo nome da condição (aplicar, remover e empilhar em
+O(1)). Listas comuns de StatusCondition continuam aceitas pelos métodos
+do sistema.
 """
-import json
-from typing import Dict, List, Optional, Set
+from collections.abc import MutableSequence
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Union
 from dataclasses import dataclass, field
 from enum import Enum
+from .serialization import decode, dumps, encode, loads
+from .streaming import ProgressCallback, Source, load_system
+from .tracking import Revisioned, mutates
 
 
 class ConditionSeverity(Enum):
@@ -55,12 +63,138 @@ class StatusCondition:
     source: str = ""  # Quem/o que aplicou a condição
 
 
-class ConditionSystem:
+class ActiveConditions(MutableSequence):
+    """Condições ativas de uma entidade, indexadas pelo nome
+    
+    Interface de lista (iteração, len, índices, append, remove, pop,
+    reverse, sort, ...) sobre um dict nome -> StatusCondition em ordem de
+    aplicação. Há no máximo uma instância por condição:
+    
+    - `append`/`extend` de uma condição já ativa substituem a instância,
+      mantendo a posição (como reaplicar a condição);
+    - `insert` ou atribuição por índice que repetiria um nome ativo em
+      outra posição levantam ValueError, sem alterar o conteúdo.
+    
+    A iteração percorre uma cópia, então remover durante a iteração é seguro.
+    """
+    
+    __slots__ = ('_items',)
+    
+    def __init__(self, conditions: Iterable[StatusCondition] = ()):
+        self._items: Dict[str, StatusCondition] = {}
+        for active in conditions:
+            self._items[active.condition_name] = active
+    
+    def _replace_all(self, items: List[StatusCondition]):
+        """Troca o conteúdo pela lista `items` (sem nomes repetidos)"""
+        indexed = {active.condition_name: active for active in items}
+        if len(indexed) != len(items):
+            names = [active.condition_name for active in items]
+            repeated = sorted({name for name in names if names.count(name) > 1})
+            raise ValueError(f"Condições repetidas: {', '.join(repeated)}")
+        self._items = indexed
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def __iter__(self) -> Iterator[StatusCondition]:
+        return iter(tuple(self._items.values()))
+    
+    def __reversed__(self) -> Iterator[StatusCondition]:
+        return iter(tuple(reversed(self._items.values())))
+    
+    def __contains__(self, item: Union[str, StatusCondition]) -> bool:
+        if isinstance(item, str):
+            return item in self._items
+        return isinstance(item, StatusCondition) and self._items.get(item.condition_name) == item
+    
+    def __getitem__(self, index):
+        items = list(self._items.values())
+        if isinstance(index, slice):
+            return ActiveConditions(items[index])
+        return items[index]
+    
+    def __setitem__(self, index, value):
+        items = list(self._items.values())
+        items[index] = value
+        self._replace_all(items)
+    
+    def __delitem__(self, index):
+        items = list(self._items.values())
+        del items[index]
+        self._replace_all(items)
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ActiveConditions, list)):
+            return list(self._items.values()) == list(other)
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"ActiveConditions({list(self._items.values())!r})"
+    
+    def insert(self, index: int, value: StatusCondition):
+        items = list(self._items.values())
+        items.insert(index, value)
+        self._replace_all(items)
+    
+    def append(self, value: StatusCondition):
+        self._items[value.condition_name] = value
+    
+    def remove(self, value: StatusCondition):
+        if value not in self:
+            raise ValueError(f"{value!r} não está ativa")
+        del self._items[value.condition_name]
+    
+    def pop(self, index: int = -1) -> StatusCondition:
+        if index == -1 and self._items:
+            return self._items.popitem()[1]
+        value = self[index]
+        del self._items[value.condition_name]
+        return value
+    
+    def index(self, value: StatusCondition, start: int = 0, stop: Optional[int] = None) -> int:
+        if value in self:
+            position = list(self._items).index(value.condition_name)
+            if start <= position and (stop is None or position < stop):
+                return position
+        raise ValueError(f"{value!r} não está ativa")
+    
+    def count(self, value: StatusCondition) -> int:
+        return 1 if value in self else 0
+    
+    def reverse(self):
+        self._items = dict(reversed(self._items.items()))
+    
+    def sort(self, *, key=None, reverse: bool = False):
+        """Ordena como list.sort (sem `key`, pelo nome da condição)"""
+        items = sorted(self._items.values(), key=key or (lambda active: active.condition_name), reverse=reverse)
+        self._items = {active.condition_name: active for active in items}
+    
+    def clear(self):
+        self._items.clear()
+    
+    def get(self, condition_name: str) -> Optional[StatusCondition]:
+        """Instância ativa da condição, se houver"""
+        return self._items.get(condition_name)
+    
+    def discard(self, condition_name: str) -> Optional[StatusCondition]:
+        """Remove a condição pelo nome (todas as pilhas); retorna a instância removida"""
+        return self._items.pop(condition_name, None)
+    
+    def names(self) -> List[str]:
+        return list(self._items)
+
+
+class ConditionSystem(Revisioned):
     """Gerenciador do sistema de condições"""
     
-    def __init__(self):
+    def __init__(self, load_defaults: bool = True):
         self.conditions: Dict[str, Condition] = {}
-        self._init_default_conditions()
+        # Incompatibilidades nos dois sentidos, refeitas quando `revision` muda
+        self._incompatible_revision = -1
+        self._incompatible: Dict[str, FrozenSet[str]] = {}
+        if load_defaults:
+            self._init_default_conditions()
     
     def _init_default_conditions(self):
         """Inicializa condições padrão (baseado em D&D 5e)"""
@@ -158,6 +292,7 @@ class ConditionSystem:
         for condition in default_conditions:
             self.add_condition(condition)
     
+    @mutates
     def add_condition(self, condition: Condition):
         """Adiciona uma condição ao sistema"""
         self.conditions[condition.name] = condition
@@ -166,30 +301,50 @@ class ConditionSystem:
         """Retorna uma condição pelo nome"""
         return self.conditions.get(name)
     
+    def incompatible_with(self, condition_name: str) -> FrozenSet[str]:
+        """Condições canceladas por `condition_name`: as que ela lista em
+        `incompatible_with` e as que a listam
+        """
+        if self._incompatible_revision != self.revision:
+            incompatible: Dict[str, Set[str]] = {name: set() for name in self.conditions}
+            for name, condition in self.conditions.items():
+                for other in condition.incompatible_with:
+                    incompatible[name].add(other)
+                    incompatible.setdefault(other, set()).add(name)
+            self._incompatible = {name: frozenset(names - {name}) for name, names in incompatible.items()}
+            self._incompatible_revision = self.revision
+        return self._incompatible.get(condition_name, frozenset())
+    
     def apply_condition(
         self,
-        active_conditions: List[StatusCondition],
+        active_conditions: Union[ActiveConditions, List[StatusCondition]],
         condition_name: str,
         duration: Optional[int] = None,
         source: str = ""
     ) -> Dict:
         """Aplica uma condição a uma entidade"""
+        if not isinstance(active_conditions, ActiveConditions):
+            active = ActiveConditions(active_conditions)
+            result = self.apply_condition(active, condition_name, duration, source)
+            active_conditions[:] = active
+            return result
+        
         condition = self.get_condition(condition_name)
         if not condition:
             return {'success': False, 'error': 'Condição não encontrada'}
         
-        # Verificar incompatibilidades
-        for active in active_conditions:
-            if active.condition_name in condition.incompatible_with:
-                # Remover condição incompatível
-                active_conditions.remove(active)
+        # Remover condições incompatíveis
+        incompatible = self.incompatible_with(condition_name)
+        if len(incompatible) <= len(active_conditions):
+            for name in incompatible:
+                active_conditions.discard(name)
+        else:
+            for name in active_conditions.names():
+                if name in incompatible:
+                    active_conditions.discard(name)
         
         # Verificar se já existe e pode empilhar
-        existing = None
-        for active in active_conditions:
-            if active.condition_name == condition_name:
-                existing = active
-                break
+        existing = active_conditions.get(condition_name)
         
         if existing:
             if condition.can_stack and existing.stacks < condition.max_stacks:
@@ -213,26 +368,37 @@ class ConditionSystem:
     
     def remove_condition(
         self,
-        active_conditions: List[StatusCondition],
+        active_conditions: Union[ActiveConditions, List[StatusCondition]],
         condition_name: str,
         remove_all_stacks: bool = False
     ) -> bool:
         """Remove uma condição"""
-        for i, active in enumerate(active_conditions):
-            if active.condition_name == condition_name:
-                if remove_all_stacks or active.stacks <= 1:
-                    active_conditions.pop(i)
-                else:
-                    active.stacks -= 1
-                return True
-        return False
-    
-    def update_conditions(self, active_conditions: List[StatusCondition]) -> List[Dict]:
+        if not isinstance(active_conditions, ActiveConditions):
+            active = ActiveConditions(active_conditions)
+            removed = self.remove_condition(active, condition_name, remove_all_stacks)
+            active_conditions[:] = active
+            return removed
+        
+        active = active_conditions.get(condition_name)
+        if active is None:
+            return False
+        if remove_all_stacks or active.stacks <= 1:
+            active_conditions.discard(condition_name)
+        else:
+            active.stacks -= 1
+        return True
+    
+    def update_conditions(self, active_conditions: Union[ActiveConditions, List[StatusCondition]]) -> List[Dict]:
         """Atualiza duração das condições e retorna efeitos"""
+        if not isinstance(active_conditions, ActiveConditions):
+            active = ActiveConditions(active_conditions)
+            effects = self.update_conditions(active)
+            active_conditions[:] = active
+            return effects
+        
         effects = []
-        to_remove = []
         
-        for i, active in enumerate(active_conditions):
+        for active in active_conditions:
             condition = self.get_condition(active.condition_name)
             if not condition:
                 continue
@@ -252,19 +418,15 @@ class ConditionSystem:
                     'source': active.condition_name
                 })
             
-            # Decrementar duração
+            # Decrementar duração; remover condições expiradas
             if condition.duration_type in ["rounds", "minutes", "hours"]:
                 active.remaining_duration -= 1
                 if active.remaining_duration <= 0:
-                    to_remove.append(i)
-        
-        # Remover condições expiradas
-        for i in reversed(to_remove):
-            active_conditions.pop(i)
+                    active_conditions.discard(active.condition_name)
         
         return effects
     
-    def calculate_total_effects(self, active_conditions: List[StatusCondition]) -> StatusEffect:
+    def calculate_total_effects(self, active_conditions: Iterable[StatusCondition]) -> StatusEffect:
         """Calcula efeitos totais de todas condições ativas"""
         total = StatusEffect()
         
@@ -298,38 +460,12 @@ class ConditionSystem:
         
         return total
     
-    def to_json(self) -> str:
+    def to_json(self, compact: bool = False) -> str:
         """Exporta sistema para JSON"""
         data = {
-            'conditions': {
-                name: {
-                    'name': cond.name,
-                    'severity': cond.severity.value,
-                    'description': cond.description,
-                    'effects': {
-                        'attribute_modifiers': cond.effects.attribute_modifiers,
-                        'movement_modifier': cond.effects.movement_modifier,
-                        'ac_modifier': cond.effects.ac_modifier,
-                        'attack_modifier': cond.effects.attack_modifier,
-                        'save_modifiers': cond.effects.save_modifiers,
-                        'damage_over_time': cond.effects.damage_over_time,
-                        'heal_over_time': cond.effects.heal_over_time,
-                        'prevents_actions': list(cond.effects.prevents_actions),
-                        'grants_advantage': list(cond.effects.grants_advantage),
-                        'grants_disadvantage': list(cond.effects.grants_disadvantage)
-                    },
-                    'duration_type': cond.duration_type,
-                    'default_duration': cond.default_duration,
-                    'can_stack': cond.can_stack,
-                    'max_stacks': cond.max_stacks,
-                    'removable_by': cond.removable_by,
-                    'incompatible_with': cond.incompatible_with,
-                    'icon': cond.icon
-                }
-                for name, cond in self.conditions.items()
-            }
+            'conditions': {name: encode(cond) for name, cond in self.conditions.items()}
         }
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return dumps(data, compact)
     
     def save_to_file(self, filepath: str):
         """Salva sistema em arquivo JSON"""
@@ -337,41 +473,21 @@ class ConditionSystem:
             f.write(self.to_json())
     
     @classmethod
-    def load_from_file(cls, filepath: str):
-        """Carrega sistema de arquivo JSON"""
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            system = cls()
-            
-            system.conditions.clear()
-            
-            for name, cond_data in data.get('conditions', {}).items():
-                effects = StatusEffect(
-                    attribute_modifiers=cond_data['effects'].get('attribute_modifiers', {}),
-                    movement_modifier=cond_data['effects'].get('movement_modifier', 1.0),
-                    ac_modifier=cond_data['effects'].get('ac_modifier', 0),
-                    attack_modifier=cond_data['effects'].get('attack_modifier', 0),
-                    save_modifiers=cond_data['effects'].get('save_modifiers', {}),
-                    damage_over_time=cond_data['effects'].get('damage_over_time', 0),
-                    heal_over_time=cond_data['effects'].get('heal_over_time', 0),
-                    prevents_actions=set(cond_data['effects'].get('prevents_actions', [])),
-                    grants_advantage=set(cond_data['effects'].get('grants_advantage', [])),
-                    grants_disadvantage=set(cond_data['effects'].get('grants_disadvantage', []))
-                )
-                
-                condition = Condition(
-                    name=cond_data['name'],
-                    severity=ConditionSeverity(cond_data['severity']),
-                    description=cond_data['description'],
-                    effects=effects,
-                    duration_type=cond_data.get('duration_type', 'rounds'),
-                    default_duration=cond_data.get('default_duration', 1),
-                    can_stack=cond_data.get('can_stack', False),
-                    max_stacks=cond_data.get('max_stacks', 1),
-                    removable_by=cond_data.get('removable_by', []),
-                    incompatible_with=cond_data.get('incompatible_with', []),
-                    icon=cond_data.get('icon', '')
-                )
-                system.add_condition(condition)
-            
-            return system
+    def from_json(cls, json_str: str):
+        """Importa sistema de JSON"""
+        return cls.from_data(loads(json_str))
+    
+    @classmethod
+    def from_data(cls, data: Dict):
+        """Cria o sistema a partir do JSON já interpretado"""
+        system = cls(load_defaults=False)
+        
+        for name, cond_data in data.get('conditions', {}).items():
+            system.add_condition(decode(Condition, cond_data))
+        
+        return system
+    
+    @classmethod
+    def load_from_file(cls, filepath: Source, progress: Optional[ProgressCallback] = None):
+        """Carrega sistema de arquivo JSON, uma condição por vez (ver EquipmentSystem.load_from_file)"""
+        return load_system(cls, filepath, {'conditions': (Condition, 'add_condition')}, progress)
@@ -1,9 +1,10 @@
 """
 Sistema de Moedas e Economia
 """
-import json
 from typing import Dict, List, Optional
 from dataclasses import dataclass, field
+from .serialization import decode, dumps, encode, loads
+from .tracking import Revisioned, mutates
 
 
 @dataclass
@@ -25,14 +26,15 @@ class ExchangeRate:
     fee_percentage: float = 0.0  # Taxa de conversão
 
 
-class CurrencySystem:
+class CurrencySystem(Revisioned):
     """Gerenciador do sistema de moedas"""
     
-    def __init__(self):
+    def __init__(self, load_defaults: bool = True):
         self.currencies: Dict[str, Currency] = {}
         self.base_currency: Optional[str] = None
         self.exchange_rates: List[ExchangeRate] = []
-        self._init_default_currencies()
+        if load_defaults:
+            self._init_default_currencies()
     
     def _init_default_currencies(self):
         """Inicializa moedas padrão (baseado em D&D)"""
@@ -49,15 +51,18 @@ class CurrencySystem:
         
         self.base_currency = "Copper"
     
+    @mutates
     def add_currency(self, currency: Currency):
         """Adiciona uma moeda ao sistema"""
         self.currencies[currency.name] = currency
     
+    @mutates
     def set_base_currency(self, currency_name: str):
         """Define a moeda base do sistema"""
         if currency_name in self.currencies:
             self.base_currency = currency_name
     
+    @mutates
     def add_exchange_rate(self, rate: ExchangeRate):
         """Adiciona uma taxa de câmbio"""
         self.exchange_rates.append(rate)
@@ -131,70 +136,42 @@ class CurrencySystem:
         
         return result
     
-    def to_json(self) -> str:
+    def to_json(self, compact: bool = False) -> str:
         """Exporta sistema para JSON"""
         data = {
             'base_currency': self.base_currency,
-            'currencies': {
-                name: {
-                    'name': curr.name,
-                    'abbreviation': curr.abbreviation,
-                    'base_value': curr.base_value,
-                    'weight': curr.weight,
-                    'description': curr.description
-                }
-                for name, curr in self.currencies.items()
-            },
-            'exchange_rates': [
-                {
-                    'from_currency': rate.from_currency,
-                    'to_currency': rate.to_currency,
-                    'rate': rate.rate,
-                    'fee_percentage': rate.fee_percentage
-                }
-                for rate in self.exchange_rates
-            ]
+            'currencies': {name: encode(curr) for name, curr in self.currencies.items()},
+            'exchange_rates': [encode(rate) for rate in self.exchange_rates]
         }
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return dumps(data, compact)
     
     def save_to_file(self, filepath: str):
         """Salva sistema em arquivo JSON"""
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(self.to_json())
     
+    @classmethod
+    def from_json(cls, json_str: str):
+        """Importa sistema de JSON"""
+        data = loads(json_str)
+        system = cls(load_defaults=False)
+        
+        # Carregar moedas
+        for name, curr_data in data.get('currencies', {}).items():
+            system.add_currency(decode(Currency, curr_data))
+        
+        # Definir moeda base
+        if 'base_currency' in data:
+            system.base_currency = data['base_currency']
+        
+        # Carregar taxas de câmbio
+        for rate_data in data.get('exchange_rates', []):
+            system.add_exchange_rate(decode(ExchangeRate, rate_data))
+        
+        return system
+    
     @classmethod
     def load_from_file(cls, filepath: str):
         """Carrega sistema de arquivo JSON"""
         with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            system = cls()
-            
-            # Limpar moedas padrão se necessário
-            system.currencies.clear()
-            
-            # Carregar moedas
-            for name, curr_data in data.get('currencies', {}).items():
-                currency = Currency(
-                    name=curr_data['name'],
-                    abbreviation=curr_data['abbreviation'],
-                    base_value=curr_data['base_value'],
-                    weight=curr_data.get('weight', 0.01),
-                    description=curr_data.get('description', '')
-                )
-                system.add_currency(currency)
-            
-            # Definir moeda base
-            if 'base_currency' in data:
-                system.base_currency = data['base_currency']
-            
-            # Carregar taxas de câmbio
-            for rate_data in data.get('exchange_rates', []):
-                rate = ExchangeRate(
-                    from_currency=rate_data['from_currency'],
-                    to_currency=rate_data['to_currency'],
-                    rate=rate_data['rate'],
-                    fee_percentage=rate_data.get('fee_percentage', 0.0)
-                )
-                system.add_exchange_rate(rate)
-            
-            return system
+            return cls.from_json(f.read())
@@ -0,0 +1,252 @@
+"""
+Sistema de Dados
+
+Expressões suportadas (somas e subtrações de termos):
+    "2d6+3", "d20", "1d%"      NdM, dado percentual, modificador fixo
+    "4d6kh3", "2d20kl1"        mantém os N maiores/menores
+    "3d6!"                     dado explosivo (rola de novo no valor máximo)
+    "1d20adv", "1d20dis"       vantagem/desvantagem (rola o termo duas vezes)
+
+As expressões são compiladas uma vez e ficam em cache. `DiceRoller` usa
+um gerador com semente (reprodutível) e, se o NumPy estiver instalado,
+rola lotes grandes de forma vetorizada.
+"""
+import random
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import List, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dependência opcional
+    np = None
+
+MAX_DICE = 1000  # Dados por termo
+MAX_TERMS = 20  # Termos (dados e modificadores) por expressão
+MAX_EXPRESSION_LENGTH = 200
+MAX_SIDES = 10000
+MAX_EXPLOSIONS = 100  # Rerrolagens por dado explosivo
+BATCH_THRESHOLD = 64  # Dados por chamada a partir dos quais vale usar NumPy
+
+_TERM_RE = re.compile(
+    r"(?P<sign>[+-])?\s*(?:"
+    r"(?P<count>\d*)d(?P<sides>\d+|%)"
+    r"(?P<keep>k[hl]?\d+)?(?P<explode>!)?(?P<adv>adv|dis)?"
+    r"|(?P<flat>\d+))\s*",
+    re.IGNORECASE
+)
+
+
+class DiceError(ValueError):
+    """Expressão de dados inválida"""
+
+
+@dataclass(frozen=True)
+class DiceTerm:
+    """Um termo NdM com seus modificadores"""
+    count: int
+    sides: int
+    sign: int = 1
+    keep_highest: Optional[int] = None
+    keep_lowest: Optional[int] = None
+    explode: bool = False
+    advantage: int = 0  # 1: vantagem, -1: desvantagem
+    
+    def _keep(self, rolls: List[int]) -> List[int]:
+        if self.keep_highest is not None:
+            return sorted(rolls, reverse=True)[:self.keep_highest]
+        if self.keep_lowest is not None:
+            return sorted(rolls)[:self.keep_lowest]
+        return rolls
+    
+    def _roll_once(self, rng: random.Random) -> Tuple[int, List[int]]:
+        rolls = []
+        for _ in range(self.count):
+            value = rng.randint(1, self.sides)
+            if self.explode:
+                extra = value
+                explosions = 0
+                while extra == self.sides and explosions < MAX_EXPLOSIONS:
+                    extra = rng.randint(1, self.sides)
+                    value += extra
+                    explosions += 1
+            rolls.append(value)
+        kept = self._keep(rolls)
+        return sum(kept), rolls
+    
+    def roll(self, rng: random.Random) -> Tuple[int, List[int]]:
+        """(total com sinal, dados rolados) de uma rolagem do termo"""
+        total, rolls = self._roll_once(rng)
+        if self.advantage:
+            other_total, other_rolls = self._roll_once(rng)
+            if (other_total > total) == (self.advantage > 0) and other_total != total:
+                total, rolls = other_total, other_rolls
+        return self.sign * total, rolls
+    
+    def roll_array(self, generator, times: int):
+        """Totais com sinal de `times` rolagens (NumPy)"""
+        totals = self._roll_array_once(generator, times)
+        if self.advantage:
+            other = self._roll_array_once(generator, times)
+            totals = np.maximum(totals, other) if self.advantage > 0 else np.minimum(totals, other)
+        return self.sign * totals
+    
+    def _roll_array_once(self, generator, times: int):
+        rolls = generator.integers(1, self.sides + 1, size=(times, self.count), dtype=np.int64)
+        if self.explode:
+            exploding = rolls == self.sides
+            for _ in range(MAX_EXPLOSIONS):
+                if not exploding.any():
+                    break
+                extra = generator.integers(1, self.sides + 1, size=int(exploding.sum()), dtype=np.int64)
+                rolls[exploding] += extra
+                still = np.zeros_like(exploding)
+                still[exploding] = extra == self.sides
+                exploding = still
+        if self.keep_highest is not None:
+            rolls = np.sort(rolls, axis=1)[:, self.count - self.keep_highest:]
+        elif self.keep_lowest is not None:
+            rolls = np.sort(rolls, axis=1)[:, :self.keep_lowest]
+        return rolls.sum(axis=1)
+    
+    @property
+    def dice_count(self) -> int:
+        return self.count * (2 if self.advantage else 1)
+
+
+@dataclass(frozen=True)
+class DiceExpression:
+    """Expressão de dados compilada (imutável, segura para cache)"""
+    text: str
+    terms: Tuple[DiceTerm, ...]
+    modifier: int = 0
+    
+    @property
+    def dice_count(self) -> int:
+        return sum(term.dice_count for term in self.terms)
+
+
+@dataclass
+class RollResult:
+    """Resultado de uma rolagem"""
+    expression: str
+    total: int
+    rolls: List[List[int]] = field(default_factory=list)  # Dados de cada termo
+    modifier: int = 0
+    
+    def to_dict(self) -> dict:
+        return {'dice': self.expression, 'result': self.total, 'rolls': self.rolls, 'modifier': self.modifier}
+
+
+def parse_dice(text: str) -> DiceExpression:
+    """Compila uma expressão de dados (resultado em cache por texto)
+    
+    O tamanho é conferido antes do cache: textos longos demais não são
+    guardados nem analisados.
+    """
+    if not isinstance(text, str) or not text.strip():
+        raise DiceError("Expressão de dados vazia")
+    if len(text) > MAX_EXPRESSION_LENGTH:
+        raise DiceError(f"Expressão de dados maior que {MAX_EXPRESSION_LENGTH} caracteres")
+    return _parse_dice(text)
+
+
+@lru_cache(maxsize=1024)
+def _parse_dice(text: str) -> DiceExpression:
+    source = text.strip()
+    terms: List[DiceTerm] = []
+    modifier = 0
+    position = 0
+    terms_seen = 0
+    while position < len(source):
+        match = _TERM_RE.match(source, position)
+        if match is None or match.end() == position:
+            raise DiceError(f"Expressão de dados inválida: {text!r}")
+        if position > 0 and match.group('sign') is None:
+            raise DiceError(f"Operador ausente em {text!r}")
+        position = match.end()
+        terms_seen += 1
+        if terms_seen > MAX_TERMS:
+            raise DiceError(f"Expressão com mais de {MAX_TERMS} termos: {text!r}")
+        sign = -1 if match.group('sign') == '-' else 1
+        
+        if match.group('flat') is not None:
+            modifier += sign * int(match.group('flat'))
+            continue
+        
+        count = int(match.group('count') or 1)
+        sides = 100 if match.group('sides') == '%' else int(match.group('sides'))
+        if not 1 <= count <= MAX_DICE or not 1 <= sides <= MAX_SIDES:
+            raise DiceError(f"Quantidade ou faces fora do limite em {text!r}")
+        
+        keep_highest = keep_lowest = None
+        keep = (match.group('keep') or '').lower()
+        if keep:
+            amount = int(keep.lstrip('khl'))
+            if not 1 <= amount <= count:
+                raise DiceError(f"Número de dados mantidos inválido em {text!r}")
+            if keep.startswith('kl'):
+                keep_lowest = amount
+            else:
+                keep_highest = amount
+        
+        explode = match.group('explode') is not None
+        if explode and sides == 1:
+            raise DiceError(f"Dado de uma face não pode explodir: {text!r}")
+        
+        adv = (match.group('adv') or '').lower()
+        terms.append(DiceTerm(
+            count=count,
+            sides=sides,
+            sign=sign,
+            keep_highest=keep_highest,
+            keep_lowest=keep_lowest,
+            explode=explode,
+            advantage=1 if adv == 'adv' else -1 if adv == 'dis' else 0
+        ))
+    
+    return DiceExpression(source, tuple(terms), modifier)
+
+
+class DiceRoller:
+    """Gerador de rolagens com semente (um por sala)"""
+    
+    def __init__(self, seed: Optional[int] = None):
+        if seed is None:
+            seed = random.SystemRandom().getrandbits(64)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.generator = np.random.default_rng(seed) if np is not None else None
+    
+    def roll(self, expression: Union[str, DiceExpression]) -> RollResult:
+        """Rola a expressão uma vez, com o detalhe de cada dado"""
+        parsed = parse_dice(expression) if isinstance(expression, str) else expression
+        total = parsed.modifier
+        rolls = []
+        for term in parsed.terms:
+            value, dice = term.roll(self.rng)
+            total += value
+            rolls.append(dice)
+        return RollResult(parsed.text, total, rolls, parsed.modifier)
+    
+    def roll_many(self, expression: Union[str, DiceExpression], times: int) -> List[int]:
+        """Totais de `times` rolagens independentes (ex.: dano em vários alvos)
+        
+        Com NumPy e lotes grandes, cada termo é rolado de uma vez para todas
+        as repetições.
+        """
+        parsed = parse_dice(expression) if isinstance(expression, str) else expression
+        if times <= 0:
+            return []
+        if self.generator is None or parsed.dice_count * times < BATCH_THRESHOLD:
+            return [self.roll(parsed).total for _ in range(times)]
+        totals = np.full(times, parsed.modifier, dtype=np.int64)
+        for term in parsed.terms:
+            totals += term.roll_array(self.generator, times)
+        return totals.tolist()
+
+
+def roll(expression: str, seed: Optional[int] = None) -> RollResult:
+    """Atalho: rola uma expressão com um gerador novo"""
+    return DiceRoller(seed).roll(expression)
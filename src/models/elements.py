@@ -1,10 +1,11 @@
 """
 Sistema de Elementos
 """
-import json
 from typing import Dict, List, Optional
 from dataclasses import dataclass, field
 from enum import Enum
+from .serialization import decode, dumps, encode, loads
+from .tracking import Revisioned, mutates
 
 
 class ElementType(Enum):
@@ -46,17 +47,18 @@ class ElementalResistance:
     percentage: float = 0.0  # -100 a 200 (vulnerável a imune+)
 
 
-class ElementSystem:
+class ElementSystem(Revisioned):
     """Gerenciador do sistema de elementos"""
     
-    def __init__(self):
+    def __init__(self, load_defaults: bool = True):
         self.elements: Dict[str, ElementType] = {e.value: e for e in ElementType}
         self.interactions: List[ElementInteraction] = []
         self.max_resistance_player: float = 75.0  # % máxima para players
         self.max_resistance_monster: float = 100.0  # % máxima para monstros
         self.allow_immunity_player: bool = False
         self.allow_immunity_monster: bool = True
-        self._init_default_interactions()
+        if load_defaults:
+            self._init_default_interactions()
     
     def _init_default_interactions(self):
         """Inicializa interações padrão entre elementos"""
@@ -95,6 +97,7 @@ class ElementSystem:
         for interaction in default_interactions:
             self.add_interaction(interaction)
     
+    @mutates
     def add_interaction(self, interaction: ElementInteraction):
         """Adiciona uma interação entre elementos"""
         self.interactions.append(interaction)
@@ -180,19 +183,11 @@ class ElementSystem:
         
         return {'valid': True}
     
-    def to_json(self) -> str:
+    def to_json(self, compact: bool = False) -> str:
         """Exporta sistema para JSON"""
         data = {
             'elements': [e.value for e in ElementType],
-            'interactions': [
-                {
-                    'attacking_element': inter.attacking_element.value,
-                    'defending_element': inter.defending_element.value,
-                    'damage_multiplier': inter.damage_multiplier,
-                    'additional_effects': inter.additional_effects
-                }
-                for inter in self.interactions
-            ],
+            'interactions': [encode(inter) for inter in self.interactions],
             'settings': {
                 'max_resistance_player': self.max_resistance_player,
                 'max_resistance_monster': self.max_resistance_monster,
@@ -200,38 +195,34 @@ class ElementSystem:
                 'allow_immunity_monster': self.allow_immunity_monster
             }
         }
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return dumps(data, compact)
     
     def save_to_file(self, filepath: str):
         """Salva sistema em arquivo JSON"""
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(self.to_json())
     
+    @classmethod
+    def from_json(cls, json_str: str):
+        """Importa sistema de JSON"""
+        data = loads(json_str)
+        system = cls(load_defaults=False)
+        
+        # Carregar configurações
+        settings = data.get('settings', {})
+        system.max_resistance_player = settings.get('max_resistance_player', 75.0)
+        system.max_resistance_monster = settings.get('max_resistance_monster', 100.0)
+        system.allow_immunity_player = settings.get('allow_immunity_player', False)
+        system.allow_immunity_monster = settings.get('allow_immunity_monster', True)
+        
+        # Carregar interações
+        for inter_data in data.get('interactions', []):
+            system.add_interaction(decode(ElementInteraction, inter_data))
+        
+        return system
+    
     @classmethod
     def load_from_file(cls, filepath: str):
         """Carrega sistema de arquivo JSON"""
         with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            system = cls()
-            
-            # Carregar configurações
-            settings = data.get('settings', {})
-            system.max_resistance_player = settings.get('max_resistance_player', 75.0)
-            system.max_resistance_monster = settings.get('max_resistance_monster', 100.0)
-            system.allow_immunity_player = settings.get('allow_immunity_player', False)
-            system.allow_immunity_monster = settings.get('allow_immunity_monster', True)
-            
-            # Limpar interações padrão
-            system.interactions.clear()
-            
-            # Carregar interações
-            for inter_data in data.get('interactions', []):
-                interaction = ElementInteraction(
-                    attacking_element=ElementType(inter_data['attacking_element']),
-                    defending_element=ElementType(inter_data['defending_element']),
-                    damage_multiplier=inter_data.get('damage_multiplier', 1.0),
-                    additional_effects=inter_data.get('additional_effects', [])
-                )
-                system.add_interaction(interaction)
-            
-            return system
+            return cls.from_json(f.read())
@@ -1,11 +1,16 @@
 """
 Sistema de Equipamentos
 """
-import json
 from typing import Dict, List, Optional, Set
 from dataclasses import dataclass, field
 from enum import Enum
 
+from .catalog_store import CatalogStore
+from .dice import DiceExpression, parse_dice
+from .serialization import decode, dumps, encode, loads
+from .streaming import ProgressCallback, Source, load_system
+from .tracking import Revisioned, mutates
+
 
 class EquipmentTag(Enum):
     """Tags de equipamento"""
@@ -73,6 +78,10 @@ class WeaponStats:
     critical_multiplier: float = 2.0
     range: Optional[int] = None  # Para armas à distância
     properties: List[str] = field(default_factory=list)  # "finesse", "versatile", etc
+    
+    def damage_expression(self) -> DiceExpression:
+        """Dado de dano compilado (DiceError se a expressão for inválida)"""
+        return parse_dice(self.damage_dice)
 
 
 @dataclass
@@ -116,13 +125,25 @@ class Equipment:
     # Visual
     icon: str = ""
     model: str = ""
+    
+    def to_dict(self) -> Dict:
+        """Representação JSON do equipamento"""
+        return encode(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Equipment':
+        """Cria o equipamento a partir de `to_dict`"""
+        return decode(cls, data)
+
 
 
-class EquipmentSystem:
+class EquipmentSystem(Revisioned):
     """Gerenciador do sistema de equipamentos"""
     
     def __init__(self):
         self.equipment_database: Dict[str, Equipment] = {}
+        # Banco SQLite do catálogo (use_store); None = dict em memória
+        self.store: Optional[CatalogStore] = None
         self.rarity_colors: Dict[str, str] = {
             "common": "#FFFFFF",
             "uncommon": "#00FF00",
@@ -131,6 +152,30 @@ class EquipmentSystem:
             "legendary": "#FF8000"
         }
     
+    @mutates
+    def use_store(self, store: CatalogStore):
+        """Passa o catálogo para um banco SQLite
+        
+        Os itens já carregados são copiados para o banco; a partir daí
+        apenas os itens consultados ficam em memória.
+        """
+        catalog = store.catalog(
+            'equipment', Equipment.to_dict, Equipment.from_dict,
+            columns={
+                'rarity': lambda eq: eq.rarity,
+                'slot': lambda eq: eq.slot.value if eq.slot else None,
+                'min_level': lambda eq: eq.requirements.min_level,
+                'value': lambda eq: eq.value
+            },
+            tags=lambda eq: [tag.value for tag in eq.tags],
+            requirements=lambda eq: eq.requirements.required_attributes
+        )
+        if catalog is not self.equipment_database:
+            catalog.update_many(self.equipment_database.items())
+        self.equipment_database = catalog
+        self.store = store
+    
+    @mutates
     def add_equipment(self, equipment: Equipment):
         """Adiciona equipamento ao banco de dados"""
         self.equipment_database[equipment.name] = equipment
@@ -277,6 +322,8 @@ class EquipmentSystem:
     
     def get_items_by_tag(self, tag: EquipmentTag) -> List[Equipment]:
         """Retorna todos itens com uma tag específica"""
+        if self.store is not None:
+            return self.equipment_database.with_tag(tag.value)
         return [
             item for item in self.equipment_database.values()
             if tag in item.tags
@@ -284,133 +331,99 @@ class EquipmentSystem:
     
     def get_items_by_rarity(self, rarity: str) -> List[Equipment]:
         """Retorna todos itens de uma raridade"""
+        if self.store is not None:
+            return self.equipment_database.where(rarity=rarity)
         return [
             item for item in self.equipment_database.values()
             if item.rarity == rarity
         ]
     
-    def to_json(self) -> str:
-        """Exporta sistema para JSON"""
+    def get_items_by_slot(self, slot: EquipmentSlot) -> List[Equipment]:
+        """Retorna todos itens de um slot"""
+        if self.store is not None:
+            return self.equipment_database.where(slot=slot.value)
+        return [
+            item for item in self.equipment_database.values()
+            if item.slot == slot
+        ]
+    
+    def get_equippable_items(self, character_data: Dict) -> List[Equipment]:
+        """Retorna os itens cujos requisitos o personagem atende"""
+        if self.store is not None:
+            # Nível e atributos filtrados pelo índice; o resto item a item
+            candidates = self.equipment_database.meeting_requirements(
+                character_data.get('attributes', {}), character_data.get('level', 0)
+            )
+        else:
+            candidates = list(self.equipment_database.values())
+        return [
+            item for item in candidates
+            if self.check_requirements(item.name, character_data)['can_equip']
+        ]
+    
+    def to_json(self, inline: bool = False, compact: bool = False,
+                base_dir: Optional[str] = None) -> str:
+        """Exporta sistema para JSON
+        
+        Com um banco SQLite, exporta apenas a referência ao banco (ou o
+        catálogo inteiro, com `inline=True`), relativa a `base_dir` (a pasta
+        do mundo), se informado. A transação pendente não é gravada aqui:
+        quem salva chama `store.commit()` depois de gravar o JSON.
+        """
+        if self.store is not None and not inline:
+            return dumps({
+                'store': self.store.reference(base_dir),
+                'rarity_colors': self.rarity_colors
+            }, compact)
         data = {
             'equipment': {
-                name: {
-                    'name': eq.name,
-                    'description': eq.description,
-                    'tags': [tag.value for tag in eq.tags],
-                    'slot': eq.slot.value if eq.slot else None,
-                    'weight': eq.weight,
-                    'value': eq.value,
-                    'max_stack': eq.max_stack,
-                    'rarity': eq.rarity,
-                    'weapon_stats': {
-                        'damage_dice': eq.weapon_stats.damage_dice,
-                        'damage_type': eq.weapon_stats.damage_type.value,
-                        'attack_bonus': eq.weapon_stats.attack_bonus,
-                        'critical_range': eq.weapon_stats.critical_range,
-                        'critical_multiplier': eq.weapon_stats.critical_multiplier,
-                        'range': eq.weapon_stats.range,
-                        'properties': eq.weapon_stats.properties
-                    } if eq.weapon_stats else None,
-                    'armor_stats': {
-                        'ac_bonus': eq.armor_stats.ac_bonus,
-                        'max_dex_bonus': eq.armor_stats.max_dex_bonus,
-                        'armor_type': eq.armor_stats.armor_type,
-                        'magical_ac_bonus': eq.armor_stats.magical_ac_bonus,
-                        'stealth_disadvantage': eq.armor_stats.stealth_disadvantage
-                    } if eq.armor_stats else None,
-                    'attribute_modifiers': eq.attribute_modifiers,
-                    'skill_modifiers': eq.skill_modifiers,
-                    'on_equip_effects': eq.on_equip_effects,
-                    'on_use_effects': eq.on_use_effects,
-                    'charges': eq.charges,
-                    'requirements': {
-                        'min_level': eq.requirements.min_level,
-                        'required_attributes': eq.requirements.required_attributes,
-                        'required_proficiencies': eq.requirements.required_proficiencies,
-                        'required_race': eq.requirements.required_race,
-                        'required_class': eq.requirements.required_class
-                    },
-                    'icon': eq.icon,
-                    'model': eq.model
-                }
+                name: eq.to_dict()
                 for name, eq in self.equipment_database.items()
             },
             'rarity_colors': self.rarity_colors
         }
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return dumps(data, compact)
     
     def save_to_file(self, filepath: str):
-        """Salva sistema em arquivo JSON"""
+        """Salva sistema em arquivo JSON (e a transação do banco SQLite, se houver)"""
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(self.to_json())
+        if self.store is not None:
+            self.store.commit()
+    
+    @classmethod
+    def from_json(cls, json_str: str, base_dir: Optional[str] = None):
+        """Importa sistema de JSON"""
+        return cls.from_data(loads(json_str), base_dir)
+    
+    @classmethod
+    def from_data(cls, data: Dict, base_dir: Optional[str] = None):
+        """Cria o sistema a partir do JSON já interpretado
+        
+        Um banco SQLite com caminho relativo é aberto a partir de `base_dir`.
+        """
+        system = cls()
+        
+        if 'rarity_colors' in data:
+            system.rarity_colors = data['rarity_colors']
+        
+        if data.get('store'):
+            system.use_store(CatalogStore.open(data['store'], base_dir))
+        
+        for name, eq_data in data.get('equipment', {}).items():
+            equipment = Equipment.from_dict(eq_data)
+            system.add_equipment(equipment)
+        
+        return system
     
     @classmethod
-    def load_from_file(cls, filepath: str):
-        """Carrega sistema de arquivo JSON"""
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            system = cls()
-            
-            if 'rarity_colors' in data:
-                system.rarity_colors = data['rarity_colors']
-            
-            for name, eq_data in data.get('equipment', {}).items():
-                # Carregar weapon_stats se existir
-                weapon_stats = None
-                if eq_data.get('weapon_stats'):
-                    ws = eq_data['weapon_stats']
-                    weapon_stats = WeaponStats(
-                        damage_dice=ws['damage_dice'],
-                        damage_type=DamageType(ws['damage_type']),
-                        attack_bonus=ws.get('attack_bonus', 0),
-                        critical_range=ws.get('critical_range', 20),
-                        critical_multiplier=ws.get('critical_multiplier', 2.0),
-                        range=ws.get('range'),
-                        properties=ws.get('properties', [])
-                    )
-                
-                # Carregar armor_stats se existir
-                armor_stats = None
-                if eq_data.get('armor_stats'):
-                    ars = eq_data['armor_stats']
-                    armor_stats = ArmorStats(
-                        ac_bonus=ars['ac_bonus'],
-                        max_dex_bonus=ars.get('max_dex_bonus'),
-                        armor_type=ars.get('armor_type', 'light'),
-                        magical_ac_bonus=ars.get('magical_ac_bonus', 0),
-                        stealth_disadvantage=ars.get('stealth_disadvantage', False)
-                    )
-                
-                # Carregar requirements
-                req_data = eq_data.get('requirements', {})
-                requirements = ItemRequirements(
-                    min_level=req_data.get('min_level', 1),
-                    required_attributes=req_data.get('required_attributes', {}),
-                    required_proficiencies=req_data.get('required_proficiencies', []),
-                    required_race=req_data.get('required_race'),
-                    required_class=req_data.get('required_class')
-                )
-                
-                equipment = Equipment(
-                    name=eq_data['name'],
-                    description=eq_data['description'],
-                    tags={EquipmentTag(tag) for tag in eq_data.get('tags', [])},
-                    slot=EquipmentSlot(eq_data['slot']) if eq_data.get('slot') else None,
-                    weight=eq_data.get('weight', 0.0),
-                    value=eq_data.get('value', 0),
-                    max_stack=eq_data.get('max_stack', 1),
-                    rarity=eq_data.get('rarity', 'common'),
-                    weapon_stats=weapon_stats,
-                    armor_stats=armor_stats,
-                    attribute_modifiers=eq_data.get('attribute_modifiers', {}),
-                    skill_modifiers=eq_data.get('skill_modifiers', {}),
-                    on_equip_effects=eq_data.get('on_equip_effects', []),
-                    on_use_effects=eq_data.get('on_use_effects', []),
-                    charges=eq_data.get('charges'),
-                    requirements=requirements,
-                    icon=eq_data.get('icon', ''),
-                    model=eq_data.get('model', '')
-                )
-                system.add_equipment(equipment)
-            
-            return system
+    def load_from_file(cls, filepath: Source, progress: Optional[ProgressCallback] = None,
+                       base_dir: Optional[str] = None):
+        """Carrega sistema de arquivo JSON (caminho, bytes ou arquivo binário)
+        
+        Cada item é convertido assim que é lido, sem montar antes o dict do
+        arquivo inteiro; `progress(lidos, total)` recebe o avanço em bytes.
+        `base_dir` como em `from_data`.
+        """
+        return load_system(cls, filepath, {'equipment': (Equipment, 'add_equipment')}, progress,
+                           base_dir=base_dir)
@@ -0,0 +1,332 @@
+"""
+Fórmulas de atributos secundários
+
+Uma fórmula é uma expressão aritmética sobre atributos:
+    "strength * 2 + dexterity"
+    "max(1, floor(constitution / 2)) + level"
+    "10 if level >= 5 else 5"
+
+Operadores: + - * / // % ** (e unários + -), comparações, and/or/not e
+a if cond else b. Funções: min, max, abs, round, floor, ceil, sqrt e
+clamp(x, mínimo, máximo). Qualquer outro elemento (atributos de objetos,
+índices, strings, lambdas, nomes iniciados por '_', ...) é rejeitado com
+FormulaError.
+
+A fórmula é validada sobre a árvore do `ast` e compilada uma vez para uma
+função Python; o resultado fica em cache por texto. Atributos ausentes
+valem 0.
+
+Com NumPy instalado, `Formula.evaluate_columns` avalia a mesma fórmula
+sobre colunas (um array por atributo, uma linha por entidade) de uma vez:
+as funções viram ufuncs do NumPy e `a if c else b` vira `np.where`.
+"""
+import ast
+import functools
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Mapping, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - dependência opcional
+    np = None
+
+MAX_FORMULA_LENGTH = 1000
+MAX_NODES = 200
+
+Number = Union[int, float]
+
+
+class FormulaError(ValueError):
+    """Fórmula inválida ou que não pode ser avaliada"""
+
+
+def _clamp(value: Number, low: Number, high: Number) -> Number:
+    return max(low, min(value, high))
+
+
+# Nome na fórmula: (função, mínimo de argumentos, máximo de argumentos)
+FUNCTIONS: Dict[str, Tuple[Callable, int, int]] = {
+    'min': (min, 2, 16),
+    'max': (max, 2, 16),
+    'abs': (abs, 1, 1),
+    'round': (round, 1, 2),
+    'floor': (math.floor, 1, 1),
+    'ceil': (math.ceil, 1, 1),
+    'sqrt': (math.sqrt, 1, 1),
+    'clamp': (_clamp, 3, 3),
+}
+
+_BINARY_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+_UNARY_OPS = (ast.UAdd, ast.USub, ast.Not)
+_COMPARE_OPS = (ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE)
+_ALLOWED = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.BoolOp, ast.Compare, ast.IfExp,
+    ast.Call, ast.Name, ast.Load, ast.Constant, ast.And, ast.Or
+) + _BINARY_OPS + _UNARY_OPS + _COMPARE_OPS
+
+
+@dataclass(frozen=True)
+class Formula:
+    """Fórmula compilada (imutável, segura para cache)"""
+    text: str
+    variables: Tuple[str, ...]
+    function: Callable[[Mapping[str, Number]], Number]
+
+    def __call__(self, values: Mapping[str, Number]) -> Number:
+        """Avalia sem tratamento de erros (caminho rápido)"""
+        return self.function(values)
+
+    def evaluate(self, values: Mapping[str, Number]) -> Number:
+        """Avalia; erros de cálculo (divisão por zero, ...) viram FormulaError"""
+        try:
+            return self.function(values)
+        except (ArithmeticError, ValueError, TypeError) as e:
+            raise FormulaError(f"Erro ao avaliar {self.text!r}: {e}")
+
+    def evaluate_columns(self, columns: Mapping[str, Any], rows: int) -> Any:
+        """Avalia sobre colunas NumPy de `rows` linhas; retorna um array
+
+        Colunas ausentes valem 0. Colunas inteiras são avaliadas em int64;
+        divisão por zero, valores inválidos e estouro de inteiros em
+        qualquer linha viram FormulaError, como na avaliação escalar.
+        """
+        if np is None:
+            raise FormulaError("Avaliação em colunas requer NumPy")
+        function = _vectorized(self.text)
+        values = {}
+        for name in self.variables:
+            if name in columns:
+                column = np.asarray(columns[name])
+                values[name] = column.astype(np.int64) if column.dtype.kind in 'biu' else column
+        try:
+            with np.errstate(divide='raise', over='raise', invalid='raise'):
+                result = function(values)
+        except (ArithmeticError, ValueError, TypeError) as e:
+            raise FormulaError(f"Erro ao avaliar {self.text!r}: {e}")
+        return np.broadcast_to(result, (rows,))
+
+
+class _Validator(ast.NodeVisitor):
+    """Confere cada nó contra a lista permitida e coleta as variáveis"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.variables: Dict[str, None] = {}
+        self.nodes = 0
+
+    def generic_visit(self, node: ast.AST):
+        self.nodes += 1
+        if self.nodes > MAX_NODES:
+            raise FormulaError(f"Fórmula muito complexa: {self.text!r}")
+        if not isinstance(node, _ALLOWED):
+            raise FormulaError(f"Elemento não permitido ({type(node).__name__}) em {self.text!r}")
+        super().generic_visit(node)
+
+    def visit_Constant(self, node: ast.Constant):
+        if type(node.value) not in (int, float):
+            raise FormulaError(f"Apenas números são permitidos como constantes em {self.text!r}")
+        self.generic_visit(node)
+
+    def visit_Name(self, node: ast.Name):
+        if node.id.startswith('_'):
+            raise FormulaError(f"Nome não permitido: {node.id!r}")
+        if node.id in FUNCTIONS:
+            raise FormulaError(f"Função {node.id!r} usada como valor em {self.text!r}")
+        self.variables.setdefault(node.id)
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in FUNCTIONS:
+            name = node.func.id if isinstance(node.func, ast.Name) else type(node.func).__name__
+            raise FormulaError(f"Função não permitida: {name!r}")
+        if node.keywords or any(isinstance(arg, ast.Starred) for arg in node.args):
+            raise FormulaError(f"Argumentos nomeados ou desempacotados não são permitidos em {self.text!r}")
+        _, low, high = FUNCTIONS[node.func.id]
+        if not low <= len(node.args) <= high:
+            raise FormulaError(f"{node.func.id} recebe de {low} a {high} argumentos")
+        self.nodes += 1
+        for arg in node.args:
+            self.visit(arg)
+
+
+class _Rewriter(ast.NodeTransformer):
+    """Funções -> _fn_<nome>; potência -> math.pow (float, sem inteiros gigantes)"""
+
+    def visit_Call(self, node: ast.Call):
+        self.generic_visit(node)
+        node.func = ast.Name(id=f'_fn_{node.func.id}', ctx=ast.Load())
+        return node
+
+    def visit_BinOp(self, node: ast.BinOp):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Pow):
+            return ast.Call(func=ast.Name(id='_pow', ctx=ast.Load()), args=[node.left, node.right], keywords=[])
+        return node
+
+
+def _generate(tree: ast.Expression, variables: Tuple[str, ...], namespace: Dict[str, Any],
+              filename: str) -> Callable:
+    """Gera `_formula(_values)`: lê as variáveis e retorna a expressão"""
+    lines = ['def _formula(_values):']
+    if variables:
+        lines.append('    _get = _values.get')
+        lines.extend(f'    {name} = _get({name!r}, 0)' for name in variables)
+    lines.append(f'    return {ast.unparse(tree)}')
+    namespace['__builtins__'] = {}
+    exec(compile('\n'.join(lines), filename, 'exec'), namespace)
+    return namespace['_formula']
+
+
+@lru_cache(maxsize=1024)
+def compile_formula(text: str) -> Formula:
+    """Valida e compila uma fórmula (resultado em cache por texto)"""
+    if not isinstance(text, str) or not text.strip():
+        raise FormulaError("Fórmula vazia")
+    if len(text) > MAX_FORMULA_LENGTH:
+        raise FormulaError(f"Fórmula maior que {MAX_FORMULA_LENGTH} caracteres")
+    source = text.strip()
+    try:
+        tree = ast.parse(source, mode='eval')
+    except (SyntaxError, ValueError, RecursionError, MemoryError) as e:
+        raise FormulaError(f"Fórmula inválida {text!r}: {e}")
+
+    validator = _Validator(source)
+    validator.visit(tree)
+    variables = tuple(validator.variables)
+
+    namespace = {f'_fn_{name}': function for name, (function, _, _) in FUNCTIONS.items()}
+    namespace['_pow'] = math.pow
+    function = _generate(_Rewriter().visit(tree), variables, namespace, f'<fórmula {source!r}>')
+    return Formula(source, variables, function)
+
+
+def _fold(function: Callable) -> Callable:
+    return lambda *values: functools.reduce(function, values)
+
+
+def _np_and(*values):
+    # `a and b` elemento a elemento: a se falso, senão b
+    return functools.reduce(lambda a, b: np.where(a, b, a), values)
+
+
+def _np_or(*values):
+    return functools.reduce(lambda a, b: np.where(a, a, b), values)
+
+
+def _np_pow(base, exponent):
+    return np.power(np.asarray(base, dtype=np.float64), exponent)
+
+
+def _np_clamp(value, low, high):
+    # Mesma ordem de _clamp: com low > high vale low
+    return np.maximum(low, np.minimum(value, high))
+
+
+def _np_int(function: Callable) -> Callable:
+    # floor/ceil/round(x) retornam int no caminho escalar
+    def apply(value):
+        result = function(value)
+        return result.astype(np.int64) if result.dtype.kind == 'f' else result
+    return apply
+
+
+def _np_round(value, ndigits=None):
+    if ndigits is None:
+        return _np_int(np.round)(value)
+    return np.round(value, ndigits)
+
+
+def _np_number(value):
+    # Comparações dão arrays bool, em que + é "ou"; no Python True + True == 2
+    array = np.asarray(value)
+    return array.astype(np.int64) if array.dtype.kind == 'b' else value
+
+
+def _np_arithmetic(operation: Callable, checked: bool = False) -> Callable:
+    # Com `checked`: inteiros do NumPy estouram em silêncio (o int do Python
+    # não estoura), então refaz a conta em float64 e confere se cabe em int64
+    def apply(left, right):
+        left, right = _np_number(left), _np_number(right)
+        result = operation(left, right)
+        if checked and np.asarray(result).dtype.kind in 'iu':
+            exact = operation(np.asarray(left, dtype=np.float64), np.asarray(right, dtype=np.float64))
+            if np.any(np.abs(exact) >= 2.0 ** 63):
+                raise OverflowError("estouro de inteiro")
+        return result
+    return apply
+
+
+_ARITHMETIC_OPS = {
+    ast.Add: '_np_add', ast.Sub: '_np_sub', ast.Mult: '_np_mul',
+    ast.Div: '_np_div', ast.FloorDiv: '_np_floordiv', ast.Mod: '_np_mod',
+}
+_SIGN_OPS = {ast.USub: '_np_neg', ast.UAdd: '_np_pos'}
+
+
+class _VectorRewriter(ast.NodeTransformer):
+    """Troca funções e construções escalares pelas equivalentes do NumPy"""
+
+    def visit_Call(self, node: ast.Call):
+        self.generic_visit(node)
+        node.func = ast.Name(id=f'_np_{node.func.id}', ctx=ast.Load())
+        return node
+
+    def visit_BinOp(self, node: ast.BinOp):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Pow):
+            return self._call('_np_pow', node.left, node.right)
+        if type(node.op) in _ARITHMETIC_OPS:
+            return self._call(_ARITHMETIC_OPS[type(node.op)], node.left, node.right)
+        return node
+
+    def visit_UnaryOp(self, node: ast.UnaryOp):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return self._call('_np_not', node.operand)
+        return self._call(_SIGN_OPS[type(node.op)], node.operand)
+
+    def visit_BoolOp(self, node: ast.BoolOp):
+        self.generic_visit(node)
+        return self._call('_np_and' if isinstance(node.op, ast.And) else '_np_or', *node.values)
+
+    def visit_IfExp(self, node: ast.IfExp):
+        self.generic_visit(node)
+        return self._call('_np_where', node.test, node.body, node.orelse)
+
+    def visit_Compare(self, node: ast.Compare):
+        self.generic_visit(node)
+        if len(node.ops) == 1:
+            return node
+        # a < b < c -> (a < b) & (b < c)
+        operands = [node.left] + node.comparators
+        pairs = [ast.Compare(left=operands[i], ops=[op], comparators=[operands[i + 1]])
+                 for i, op in enumerate(node.ops)]
+        return self._call('_np_all', *pairs)
+
+    @staticmethod
+    def _call(name: str, *args: ast.AST) -> ast.Call:
+        return ast.Call(func=ast.Name(id=name, ctx=ast.Load()), args=list(args), keywords=[])
+
+
+@lru_cache(maxsize=1024)
+def _vectorized(text: str) -> Callable:
+    """Versão NumPy de uma fórmula já validada por compile_formula"""
+    formula = compile_formula(text)
+    namespace = {
+        '_np_min': _fold(np.minimum), '_np_max': _fold(np.maximum), '_np_abs': np.abs,
+        '_np_round': _np_round, '_np_floor': _np_int(np.floor), '_np_ceil': _np_int(np.ceil),
+        '_np_sqrt': np.sqrt, '_np_clamp': _np_clamp, '_np_pow': _np_pow, '_np_not': np.logical_not,
+        '_np_add': _np_arithmetic(np.add, checked=True),
+        '_np_sub': _np_arithmetic(np.subtract, checked=True),
+        '_np_mul': _np_arithmetic(np.multiply, checked=True),
+        '_np_div': _np_arithmetic(np.true_divide), '_np_floordiv': _np_arithmetic(np.floor_divide),
+        '_np_mod': _np_arithmetic(np.mod),
+        '_np_neg': lambda value: np.negative(_np_number(value)),
+        '_np_pos': lambda value: np.positive(_np_number(value)),
+        '_np_and': _np_and, '_np_or': _np_or, '_np_where': np.where, '_np_all': _fold(np.logical_and),
+    }
+    tree = _VectorRewriter().visit(ast.parse(formula.text, mode='eval'))
+    return _generate(ast.fix_missing_locations(tree), formula.variables, namespace,
+                     f'<fórmula vetorizada {formula.text!r}>')
@@ -1,10 +1,12 @@
 """
 Sistema de Línguas e Criptografia
 """
-import json
 import random
 from typing import Dict, List, Optional, Set
 from dataclasses import dataclass, field
+from .serialization import decode, dumps, encode, loads
+from .streaming import ProgressCallback, Source, load_system
+from .tracking import Revisioned, mutates
 
 
 @dataclass
@@ -28,14 +30,15 @@ class LanguageProficiency:
     understand_percentage: float = 0.0  # 0-100%
 
 
-class LanguageSystem:
+class LanguageSystem(Revisioned):
     """Gerenciador do sistema de línguas"""
     
-    def __init__(self):
+    def __init__(self, load_defaults: bool = True):
         self.languages: Dict[str, Language] = {}
         self.unknown_text_marker = "[Língua Desconhecida]"
         self.cipher_characters = "!@#$%^&*()_+-=[]{}|;:',.<>?/~`"
-        self._init_default_languages()
+        if load_defaults:
+            self._init_default_languages()
     
     def _init_default_languages(self):
         """Inicializa línguas padrão"""
@@ -102,6 +105,7 @@ class LanguageSystem:
         for language in default_languages:
             self.add_language(language)
     
+    @mutates
     def add_language(self, language: Language):
         """Adiciona uma língua ao sistema"""
         self.languages[language.name] = language
@@ -256,26 +260,16 @@ class LanguageSystem:
         
         return 0.0
     
-    def to_json(self) -> str:
+    def to_json(self, compact: bool = False) -> str:
         """Exporta sistema para JSON"""
         data = {
-            'languages': {
-                name: {
-                    'name': lang.name,
-                    'script': lang.script,
-                    'difficulty': lang.difficulty,
-                    'description': lang.description,
-                    'related_languages': lang.related_languages,
-                    'speakers': lang.speakers
-                }
-                for name, lang in self.languages.items()
-            },
+            'languages': {name: encode(lang) for name, lang in self.languages.items()},
             'settings': {
                 'unknown_text_marker': self.unknown_text_marker,
                 'cipher_characters': self.cipher_characters
             }
         }
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return dumps(data, compact)
     
     def save_to_file(self, filepath: str):
         """Salva sistema em arquivo JSON"""
@@ -283,30 +277,27 @@ class LanguageSystem:
             f.write(self.to_json())
     
     @classmethod
-    def load_from_file(cls, filepath: str):
-        """Carrega sistema de arquivo JSON"""
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            system = cls()
-            
-            # Limpar línguas padrão
-            system.languages.clear()
-            
-            # Carregar configurações
-            settings = data.get('settings', {})
-            system.unknown_text_marker = settings.get('unknown_text_marker', '[Língua Desconhecida]')
-            system.cipher_characters = settings.get('cipher_characters', system.cipher_characters)
-            
-            # Carregar línguas
-            for name, lang_data in data.get('languages', {}).items():
-                language = Language(
-                    name=lang_data['name'],
-                    script=lang_data['script'],
-                    difficulty=lang_data.get('difficulty', 1),
-                    description=lang_data.get('description', ''),
-                    related_languages=lang_data.get('related_languages', []),
-                    speakers=lang_data.get('speakers', [])
-                )
-                system.add_language(language)
-            
-            return system
+    def from_json(cls, json_str: str):
+        """Importa sistema de JSON"""
+        return cls.from_data(loads(json_str))
+    
+    @classmethod
+    def from_data(cls, data: Dict):
+        """Cria o sistema a partir do JSON já interpretado"""
+        system = cls(load_defaults=False)
+        
+        # Carregar configurações
+        settings = data.get('settings', {})
+        system.unknown_text_marker = settings.get('unknown_text_marker', '[Língua Desconhecida]')
+        system.cipher_characters = settings.get('cipher_characters', system.cipher_characters)
+        
+        # Carregar línguas
+        for name, lang_data in data.get('languages', {}).items():
+            system.add_language(decode(Language, lang_data))
+        
+        return system
+    
+    @classmethod
+    def load_from_file(cls, filepath: Source, progress: Optional[ProgressCallback] = None):
+        """Carrega sistema de arquivo JSON, uma língua por vez (ver EquipmentSystem.load_from_file)"""
+        return load_system(cls, filepath, {'languages': (Language, 'add_language')}, progress)
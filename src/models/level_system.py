@@ -1,11 +1,12 @@
 """
 Sistema de Níveis e Experiência
 """
-import json
 import math
 from typing import Dict, Optional, List
 from dataclasses import dataclass, field
 from enum import Enum
+from .serialization import decode, dumps, encode, loads
+from .tracking import Revisioned, mutates
 
 
 class XPScalingType(Enum):
@@ -54,7 +55,7 @@ class MultiLevelConfig:
     xp_distribution_mode: str = "manual"  # "manual", "auto_by_usage"
 
 
-class LevelSystem:
+class LevelSystem(Revisioned):
     """Gerenciador do sistema de níveis"""
     
     def __init__(self):
@@ -64,6 +65,7 @@ class LevelSystem:
         self.multi_level_config: MultiLevelConfig = MultiLevelConfig()
         self.attribute_warnings: List[str] = []
     
+    @mutates
     def set_enabled(self, enabled: bool):
         """Ativa ou desativa o sistema de níveis"""
         self.enabled = enabled
@@ -77,6 +79,7 @@ class LevelSystem:
         if not self.enabled:
             self.attribute_warnings.append("AVISO: Sistema de níveis desativado, mas há atributos que dependem dele!")
     
+    @mutates
     def add_level_config(self, config: LevelConfig):
         """Adiciona configuração de nível para um tipo de entidade"""
         self.level_configs[config.entity_type] = config
@@ -132,79 +135,43 @@ class LevelSystem:
             "rebirth_count": rebirth_count + 1
         }
     
-    def to_json(self) -> str:
+    def to_json(self, compact: bool = False) -> str:
         """Exporta sistema de níveis para JSON"""
         data = {
             'enabled': self.enabled,
             'level_configs': {
-                entity_type.value: {
-                    'entity_type': config.entity_type.value,
-                    'max_level': config.max_level,
-                    'scaling_type': config.scaling_type.value,
-                    'base_xp': config.base_xp,
-                    'scaling_factor': config.scaling_factor,
-                    'reset_xp_on_levelup': config.reset_xp_on_levelup,
-                    'manual_xp_table': config.manual_xp_table,
-                    'attribute_bonuses_per_level': config.attribute_bonuses_per_level
-                }
+                entity_type.value: encode(config)
                 for entity_type, config in self.level_configs.items()
             },
-            'reborn_config': {
-                'enabled': self.reborn_config.enabled,
-                'max_rebirths': self.reborn_config.max_rebirths,
-                'bonuses_per_rebirth': self.reborn_config.bonuses_per_rebirth,
-                'level_reset_to': self.reborn_config.level_reset_to
-            },
-            'multi_level_config': {
-                'enabled': self.multi_level_config.enabled,
-                'level_types': self.multi_level_config.level_types,
-                'xp_distribution_mode': self.multi_level_config.xp_distribution_mode
-            }
+            'reborn_config': encode(self.reborn_config),
+            'multi_level_config': encode(self.multi_level_config)
         }
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return dumps(data, compact)
     
     def save_to_file(self, filepath: str):
         """Salva sistema em arquivo JSON"""
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(self.to_json())
     
+    @classmethod
+    def from_json(cls, json_str: str):
+        """Importa sistema de JSON"""
+        data = loads(json_str)
+        system = cls()
+        system.enabled = data.get('enabled', True)
+        
+        # Carregar configs de nível
+        for entity_type_str, config_data in data.get('level_configs', {}).items():
+            system.add_level_config(decode(LevelConfig, config_data))
+        
+        # Carregar configs de reborn e multi-level
+        system.reborn_config = decode(RebornConfig, data.get('reborn_config', {}))
+        system.multi_level_config = decode(MultiLevelConfig, data.get('multi_level_config', {}))
+        
+        return system
+    
     @classmethod
     def load_from_file(cls, filepath: str):
         """Carrega sistema de arquivo JSON"""
         with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            system = cls()
-            system.enabled = data.get('enabled', True)
-            
-            # Carregar configs de nível
-            for entity_type_str, config_data in data.get('level_configs', {}).items():
-                config = LevelConfig(
-                    entity_type=EntityType(config_data['entity_type']),
-                    max_level=config_data['max_level'],
-                    scaling_type=XPScalingType(config_data['scaling_type']),
-                    base_xp=config_data.get('base_xp', 100),
-                    scaling_factor=config_data.get('scaling_factor', 1.5),
-                    reset_xp_on_levelup=config_data.get('reset_xp_on_levelup', True),
-                    manual_xp_table=config_data.get('manual_xp_table', []),
-                    attribute_bonuses_per_level=config_data.get('attribute_bonuses_per_level', {})
-                )
-                system.add_level_config(config)
-            
-            # Carregar config de reborn
-            reborn_data = data.get('reborn_config', {})
-            system.reborn_config = RebornConfig(
-                enabled=reborn_data.get('enabled', False),
-                max_rebirths=reborn_data.get('max_rebirths', 0),
-                bonuses_per_rebirth=reborn_data.get('bonuses_per_rebirth', {}),
-                level_reset_to=reborn_data.get('level_reset_to', 1)
-            )
-            
-            # Carregar config multi-level
-            multi_data = data.get('multi_level_config', {})
-            system.multi_level_config = MultiLevelConfig(
-                enabled=multi_data.get('enabled', False),
-                level_types=multi_data.get('level_types', []),
-                xp_distribution_mode=multi_data.get('xp_distribution_mode', 'manual')
-            )
-            
-            return system
+            return cls.from_json(f.read())
@@ -1,10 +1,11 @@
 """
 Sistema de Magia/Spell Slots/Stamina
 """
-import json
 from typing import Dict, List, Optional
 from dataclasses import dataclass, field
 from enum import Enum
+from .serialization import decode, dumps, encode, loads
+from .tracking import Revisioned, mutates
 
 
 class CasterType(Enum):
@@ -64,15 +65,16 @@ class AlternativeResource:
     regeneration_rules: Dict = field(default_factory=dict)
 
 
-class MagicSystem:
+class MagicSystem(Revisioned):
     """Gerenciador do sistema de magia"""
     
-    def __init__(self):
+    def __init__(self, load_defaults: bool = True):
         self.spell_slot_tables: Dict[str, SpellSlotTable] = {}
         self.mana_system = ManaSystem()
         self.stamina_system = StaminaSystem()
         self.alternative_resources: Dict[str, AlternativeResource] = {}
-        self._init_default_tables()
+        if load_defaults:
+            self._init_default_tables()
     
     def _init_default_tables(self):
         """Inicializa tabelas padrão de spell slots"""
@@ -128,6 +130,7 @@ class MagicSystem:
         
         self.add_spell_slot_table(half_caster)
     
+    @mutates
     def add_spell_slot_table(self, table: SpellSlotTable):
         """Adiciona uma tabela de spell slots"""
         self.spell_slot_tables[table.name] = table
@@ -176,107 +179,50 @@ class MagicSystem:
         
         return stamina
     
+    @mutates
     def add_alternative_resource(self, resource: AlternativeResource):
         """Adiciona recurso alternativo (Ki, Aura, etc)"""
         self.alternative_resources[resource.name] = resource
     
-    def to_json(self) -> str:
+    def to_json(self, compact: bool = False) -> str:
         """Exporta sistema para JSON"""
         data = {
-            'spell_slot_tables': {
-                name: {
-                    'name': table.name,
-                    'caster_type': table.caster_type.value,
-                    'slots_by_level': {
-                        str(lvl): slots for lvl, slots in table.slots_by_level.items()
-                    }
-                }
-                for name, table in self.spell_slot_tables.items()
-            },
-            'mana_system': {
-                'enabled': self.mana_system.enabled,
-                'scaling': self.mana_system.scaling.value,
-                'base_mana': self.mana_system.base_mana,
-                'mana_per_level': self.mana_system.mana_per_level,
-                'primary_attribute': self.mana_system.primary_attribute,
-                'attribute_multiplier': self.mana_system.attribute_multiplier,
-                'regeneration_rate': self.mana_system.regeneration_rate
-            },
-            'stamina_system': {
-                'enabled': self.stamina_system.enabled,
-                'base_stamina': self.stamina_system.base_stamina,
-                'stamina_per_level': self.stamina_system.stamina_per_level,
-                'stamina_per_attribute': self.stamina_system.stamina_per_attribute,
-                'regeneration_rate': self.stamina_system.regeneration_rate
-            },
+            'spell_slot_tables': {name: encode(table) for name, table in self.spell_slot_tables.items()},
+            'mana_system': encode(self.mana_system),
+            'stamina_system': encode(self.stamina_system),
             'alternative_resources': {
-                name: {
-                    'name': res.name,
-                    'max_value': res.max_value,
-                    'scaling_attribute': res.scaling_attribute,
-                    'regeneration_rules': res.regeneration_rules
-                }
-                for name, res in self.alternative_resources.items()
+                name: encode(res) for name, res in self.alternative_resources.items()
             }
         }
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return dumps(data, compact)
     
     def save_to_file(self, filepath: str):
         """Salva sistema em arquivo JSON"""
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(self.to_json())
     
+    @classmethod
+    def from_json(cls, json_str: str):
+        """Importa sistema de JSON"""
+        data = loads(json_str)
+        system = cls(load_defaults=False)
+        
+        # Carregar tabelas de spell slots
+        for name, table_data in data.get('spell_slot_tables', {}).items():
+            system.add_spell_slot_table(decode(SpellSlotTable, table_data))
+        
+        # Carregar sistemas de mana e stamina
+        system.mana_system = decode(ManaSystem, data.get('mana_system', {}))
+        system.stamina_system = decode(StaminaSystem, data.get('stamina_system', {}))
+        
+        # Carregar recursos alternativos
+        for name, res_data in data.get('alternative_resources', {}).items():
+            system.add_alternative_resource(decode(AlternativeResource, res_data))
+        
+        return system
+    
     @classmethod
     def load_from_file(cls, filepath: str):
         """Carrega sistema de arquivo JSON"""
         with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            system = cls()
-            
-            # Limpar tabelas padrão se necessário
-            system.spell_slot_tables.clear()
-            
-            # Carregar tabelas de spell slots
-            for name, table_data in data.get('spell_slot_tables', {}).items():
-                table = SpellSlotTable(
-                    name=table_data['name'],
-                    caster_type=CasterType(table_data['caster_type']),
-                    slots_by_level={
-                        int(lvl): slots for lvl, slots in table_data['slots_by_level'].items()
-                    }
-                )
-                system.add_spell_slot_table(table)
-            
-            # Carregar sistema de mana
-            mana_data = data.get('mana_system', {})
-            system.mana_system = ManaSystem(
-                enabled=mana_data.get('enabled', False),
-                scaling=ManaScaling(mana_data.get('scaling', 'level_based')),
-                base_mana=mana_data.get('base_mana', 100),
-                mana_per_level=mana_data.get('mana_per_level', 10),
-                primary_attribute=mana_data.get('primary_attribute'),
-                attribute_multiplier=mana_data.get('attribute_multiplier', 5.0),
-                regeneration_rate=mana_data.get('regeneration_rate', 10)
-            )
-            
-            # Carregar sistema de stamina
-            stamina_data = data.get('stamina_system', {})
-            system.stamina_system = StaminaSystem(
-                enabled=stamina_data.get('enabled', False),
-                base_stamina=stamina_data.get('base_stamina', 100),
-                stamina_per_level=stamina_data.get('stamina_per_level', 5),
-                stamina_per_attribute=stamina_data.get('stamina_per_attribute', {}),
-                regeneration_rate=stamina_data.get('regeneration_rate', 20)
-            )
-            
-            # Carregar recursos alternativos
-            for name, res_data in data.get('alternative_resources', {}).items():
-                resource = AlternativeResource(
-                    name=res_data['name'],
-                    max_value=res_data['max_value'],
-                    scaling_attribute=res_data.get('scaling_attribute'),
-                    regeneration_rules=res_data.get('regeneration_rules', {})
-                )
-                system.add_alternative_resource(resource)
-            
-            return system
+            return cls.from_json(f.read())
@@ -1,10 +1,12 @@
 """
 Sistema de Proficiências
 """
-import json
 from typing import Dict, List, Optional
 from dataclasses import dataclass, field
 from enum import Enum
+from .serialization import decode, dumps, encode, loads
+from .streaming import ProgressCallback, Source, load_system
+from .tracking import Revisioned, mutates
 
 
 class ProficiencyType(Enum):
@@ -36,7 +38,7 @@ class Proficiency:
     description: str = ""
 
 
-class ProficiencySystem:
+class ProficiencySystem(Revisioned):
     """Gerenciador do sistema de proficiências"""
     
     def __init__(self):
@@ -53,6 +55,7 @@ class ProficiencySystem:
             ProficiencyLevel(name="Master", bonus=8, damage_multiplier=2.0)
         ]
     
+    @mutates
     def add_proficiency(self, proficiency: Proficiency):
         """Adiciona uma proficiência"""
         self.proficiencies[proficiency.name] = proficiency
@@ -72,40 +75,13 @@ class ProficiencySystem:
         """Calcula bônus de proficiência baseado no nível do personagem"""
         return 2 + ((character_level - 1) // 4)
     
-    def to_json(self) -> str:
+    def to_json(self, compact: bool = False) -> str:
         """Exporta sistema para JSON"""
         data = {
-            'proficiencies': {
-                name: {
-                    'name': prof.name,
-                    'proficiency_type': prof.proficiency_type.value,
-                    'levels': [
-                        {
-                            'name': lvl.name,
-                            'bonus': lvl.bonus,
-                            'damage_multiplier': lvl.damage_multiplier,
-                            'ac_bonus': lvl.ac_bonus,
-                            'special_effects': lvl.special_effects
-                        }
-                        for lvl in prof.levels
-                    ],
-                    'requirements': prof.requirements,
-                    'description': prof.description
-                }
-                for name, prof in self.proficiencies.items()
-            },
-            'default_levels': [
-                {
-                    'name': lvl.name,
-                    'bonus': lvl.bonus,
-                    'damage_multiplier': lvl.damage_multiplier,
-                    'ac_bonus': lvl.ac_bonus,
-                    'special_effects': lvl.special_effects
-                }
-                for lvl in self.proficiency_levels
-            ]
+            'proficiencies': {name: encode(prof) for name, prof in self.proficiencies.items()},
+            'default_levels': [encode(lvl) for lvl in self.proficiency_levels]
         }
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return dumps(data, compact)
     
     def save_to_file(self, filepath: str):
         """Salva sistema em arquivo JSON"""
@@ -113,45 +89,28 @@ class ProficiencySystem:
             f.write(self.to_json())
     
     @classmethod
-    def load_from_file(cls, filepath: str):
-        """Carrega sistema de arquivo JSON"""
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            system = cls()
-            
-            # Carregar níveis padrão
-            if 'default_levels' in data:
-                system.proficiency_levels = [
-                    ProficiencyLevel(
-                        name=lvl['name'],
-                        bonus=lvl['bonus'],
-                        damage_multiplier=lvl.get('damage_multiplier', 1.0),
-                        ac_bonus=lvl.get('ac_bonus', 0),
-                        special_effects=lvl.get('special_effects', [])
-                    )
-                    for lvl in data['default_levels']
-                ]
-            
-            # Carregar proficiências
-            for name, prof_data in data.get('proficiencies', {}).items():
-                levels = [
-                    ProficiencyLevel(
-                        name=lvl['name'],
-                        bonus=lvl['bonus'],
-                        damage_multiplier=lvl.get('damage_multiplier', 1.0),
-                        ac_bonus=lvl.get('ac_bonus', 0),
-                        special_effects=lvl.get('special_effects', [])
-                    )
-                    for lvl in prof_data.get('levels', [])
-                ]
-                
-                proficiency = Proficiency(
-                    name=prof_data['name'],
-                    proficiency_type=ProficiencyType(prof_data['proficiency_type']),
-                    levels=levels,
-                    requirements=prof_data.get('requirements', {}),
-                    description=prof_data.get('description', '')
-                )
-                system.add_proficiency(proficiency)
-            
-            return system
+    def from_json(cls, json_str: str):
+        """Importa sistema de JSON"""
+        return cls.from_data(loads(json_str))
+    
+    @classmethod
+    def from_data(cls, data: Dict):
+        """Cria o sistema a partir do JSON já interpretado"""
+        system = cls()
+        
+        # Carregar níveis padrão
+        if 'default_levels' in data:
+            system.proficiency_levels = [
+                decode(ProficiencyLevel, lvl) for lvl in data['default_levels']
+            ]
+        
+        # Carregar proficiências
+        for name, prof_data in data.get('proficiencies', {}).items():
+            system.add_proficiency(decode(Proficiency, prof_data))
+        
+        return system
+    
+    @classmethod
+    def load_from_file(cls, filepath: Source, progress: Optional[ProgressCallback] = None):
+        """Carrega sistema de arquivo JSON, uma proficiência por vez (ver EquipmentSystem.load_from_file)"""
+        return load_system(cls, filepath, {'proficiencies': (Proficiency, 'add_proficiency')}, progress)
@@ -1,10 +1,12 @@
 """
 Sistema de Raças
 """
-import json
 from typing import Dict, List, Optional
 from dataclasses import dataclass, field
 from enum import Enum
+from .serialization import decode, dumps, encode, loads
+from .streaming import ProgressCallback, Source, load_system
+from .tracking import Revisioned, mutates
 
 
 class SizeCategory(Enum):
@@ -43,7 +45,7 @@ class Race:
     special_rules: Dict = field(default_factory=dict)
 
 
-class RaceSystem:
+class RaceSystem(Revisioned):
     """Gerenciador do sistema de raças"""
     
     def __init__(self):
@@ -61,6 +63,7 @@ class RaceSystem:
             SizeCategory.GARGANTUAN: {"ac_bonus": -4, "stealth_bonus": -8, "strength_bonus": 8}
         }
     
+    @mutates
     def add_race(self, race: Race):
         """Adiciona uma raça ao sistema"""
         self.races[race.name] = race
@@ -91,36 +94,15 @@ class RaceSystem:
         
         return modifiers
     
-    def to_json(self) -> str:
+    def to_json(self, compact: bool = False) -> str:
         """Exporta sistema de raças para JSON"""
         data = {
-            'races': {
-                name: {
-                    'name': race.name,
-                    'size': race.size.value,
-                    'movement': {
-                        'base_speed': race.movement.base_speed,
-                        'climb_speed': race.movement.climb_speed,
-                        'swim_speed': race.movement.swim_speed,
-                        'fly_speed': race.movement.fly_speed,
-                        'burrow_speed': race.movement.burrow_speed
-                    },
-                    'attribute_modifiers': race.attribute_modifiers,
-                    'available_talents': race.available_talents,
-                    'racial_abilities': race.racial_abilities,
-                    'languages': race.languages,
-                    'age_range': race.age_range,
-                    'height_range': race.height_range,
-                    'weight_range': race.weight_range,
-                    'special_rules': race.special_rules
-                }
-                for name, race in self.races.items()
-            },
+            'races': {name: encode(race) for name, race in self.races.items()},
             'size_modifiers': {
                 size.value: mods for size, mods in self.size_modifiers.items()
             }
         }
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return dumps(data, compact)
     
     def save_to_file(self, filepath: str):
         """Salva sistema em arquivo JSON"""
@@ -128,40 +110,27 @@ class RaceSystem:
             f.write(self.to_json())
     
     @classmethod
-    def load_from_file(cls, filepath: str):
-        """Carrega sistema de arquivo JSON"""
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            system = cls()
-            
-            for name, race_data in data.get('races', {}).items():
-                movement = MovementRules(
-                    base_speed=race_data['movement']['base_speed'],
-                    climb_speed=race_data['movement'].get('climb_speed'),
-                    swim_speed=race_data['movement'].get('swim_speed'),
-                    fly_speed=race_data['movement'].get('fly_speed'),
-                    burrow_speed=race_data['movement'].get('burrow_speed')
-                )
-                
-                race = Race(
-                    name=race_data['name'],
-                    size=SizeCategory(race_data['size']),
-                    movement=movement,
-                    attribute_modifiers=race_data.get('attribute_modifiers', {}),
-                    available_talents=race_data.get('available_talents', []),
-                    racial_abilities=race_data.get('racial_abilities', []),
-                    languages=race_data.get('languages', []),
-                    age_range=tuple(race_data.get('age_range', [0, 100])),
-                    height_range=tuple(race_data.get('height_range', [150, 180])),
-                    weight_range=tuple(race_data.get('weight_range', [50, 90])),
-                    special_rules=race_data.get('special_rules', {})
-                )
-                system.add_race(race)
-            
-            if 'size_modifiers' in data:
-                system.size_modifiers = {
-                    SizeCategory(size): mods
-                    for size, mods in data['size_modifiers'].items()
-                }
-            
-            return system
+    def from_json(cls, json_str: str):
+        """Importa sistema de JSON"""
+        return cls.from_data(loads(json_str))
+    
+    @classmethod
+    def from_data(cls, data: Dict):
+        """Cria o sistema a partir do JSON já interpretado"""
+        system = cls()
+        
+        for name, race_data in data.get('races', {}).items():
+            system.add_race(decode(Race, race_data))
+        
+        if 'size_modifiers' in data:
+            system.size_modifiers = {
+                SizeCategory(size): mods
+                for size, mods in data['size_modifiers'].items()
+            }
+        
+        return system
+    
+    @classmethod
+    def load_from_file(cls, filepath: Source, progress: Optional[ProgressCallback] = None):
+        """Carrega sistema de arquivo JSON, uma raça por vez (ver EquipmentSystem.load_from_file)"""
+        return load_system(cls, filepath, {'races': (Race, 'add_race')}, progress)
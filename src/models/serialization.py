@@ -0,0 +1,216 @@
+"""
+Serialização dos dataclasses de regras
+
+Codificador e decodificador de cada dataclass são derivados dos seus campos
+no primeiro uso e gerados como código Python (uma função por classe, sem
+introspecção a cada objeto):
+
+    encode(obj)              dataclass -> dict pronto para JSON
+    decode(cls, data)        dict -> dataclass (campos ausentes usam o padrão)
+    dumps(data, compact)     texto JSON (indentado ou compacto)
+    loads(text)
+
+Tipos suportados: str/int/float/bool, Enum, dataclasses aninhados,
+Optional[...], List/Set/FrozenSet/Tuple (e `tuple` sem parâmetros) e
+Dict[...]; chaves int/Enum viram texto no JSON e voltam ao tipo original.
+Campos cujo nome começa com '_' não são serializados.
+
+Com `orjson` instalado, dumps/loads o usam (mesma saída, mais rápido).
+"""
+import dataclasses
+import json
+import threading
+from enum import Enum
+from typing import Any, Callable, Dict, Tuple, Type, TypeVar, Union, get_args, get_origin, get_type_hints
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+T = TypeVar('T')
+
+_encoders: Dict[type, Callable[[Any], Dict]] = {}
+_decoders: Dict[type, Callable[[Dict], Any]] = {}
+_lock = threading.RLock()
+# Classes com geração em andamento (tipos recursivos)
+_generating = set()
+
+_SCALARS = (str, int, float, bool, type(None), Any)
+_LISTS = (list, set, frozenset, tuple)
+
+
+def dumps(data: Any, compact: bool = False) -> str:
+    """JSON UTF-8: indentado (arquivos editáveis) ou compacto (rede, pacotes, banco)"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (0 if compact else orjson.OPT_INDENT_2)
+        return orjson.dumps(data, option=option).decode('utf-8')
+    if compact:
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def loads(text: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def encode(obj: Any) -> Dict:
+    """Dataclass -> dict (listas e dicts sem conversão são compartilhados)"""
+    encoder = _encoders.get(type(obj))
+    if encoder is None:
+        encoder = encoder_for(type(obj))
+    return encoder(obj)
+
+
+def decode(cls: Type[T], data: Dict) -> T:
+    """Dict (de `encode`) -> dataclass"""
+    decoder = _decoders.get(cls)
+    if decoder is None:
+        decoder = decoder_for(cls)
+    return decoder(data)
+
+
+def encoder_for(cls: type) -> Callable[[Any], Dict]:
+    with _lock:
+        if cls not in _encoders:
+            _encoders[cls] = _generate(cls, encoding=True)
+        return _encoders[cls]
+
+
+def decoder_for(cls: type) -> Callable[[Dict], Any]:
+    with _lock:
+        if cls not in _decoders:
+            _decoders[cls] = _generate(cls, encoding=False)
+        return _decoders[cls]
+
+
+def _serialized_fields(cls: type):
+    if not dataclasses.is_dataclass(cls):
+        raise TypeError(f"{cls.__name__} não é um dataclass")
+    hints = get_type_hints(cls)
+    return [(f, hints.get(f.name, Any)) for f in dataclasses.fields(cls) if not f.name.startswith('_')]
+
+
+class _Builder:
+    """Gera as expressões de conversão de um campo, por tipo"""
+
+    def __init__(self, encoding: bool):
+        self.encoding = encoding
+        self.namespace: Dict[str, Any] = {}
+        self.depth = 0
+
+    def bind(self, prefix: str, value: Any) -> str:
+        name = f'_{prefix}{len(self.namespace)}'
+        self.namespace[name] = value
+        return name
+
+    def expr(self, tp: Any, value: str) -> str:
+        """Expressão que converte `value`; igual a `value` se não há o que converter"""
+        origin, args = get_origin(tp), get_args(tp)
+        if tp in _SCALARS or tp is dict or tp is Dict:
+            return value
+        if origin is Union:
+            options = [arg for arg in args if arg is not type(None)]
+            if len(options) != 1:
+                return value
+            inner = self.expr(options[0], value)
+            return value if inner == value else f'(None if {value} is None else {inner})'
+        if isinstance(tp, type) and issubclass(tp, Enum):
+            return f'{value}.value' if self.encoding else f'{self.bind("enum", tp)}({value})'
+        if dataclasses.is_dataclass(tp):
+            if tp in _generating:
+                # Tipo recursivo: resolvido a cada chamada
+                function = encode if self.encoding else (lambda data, _cls=tp: decode(_cls, data))
+            else:
+                function = encoder_for(tp) if self.encoding else decoder_for(tp)
+            return f'{self.bind("nested", function)}({value})'
+        if tp in _LISTS or origin in _LISTS:
+            return self._sequence(origin or tp, args, value)
+        if origin is dict:
+            return self._mapping(args, value)
+        return value
+
+    def _sequence(self, kind: type, args: Tuple, value: str) -> str:
+        if kind is tuple and args and not (len(args) == 2 and args[1] is Ellipsis):
+            item_types = args  # Tuple[int, str]: um tipo por posição
+        else:
+            item_types = args[:1] or (Any,)
+        self.depth += 1
+        item = f'_v{self.depth}'
+        if len(item_types) == 1:
+            converted = self.expr(item_types[0], item)
+            self.depth -= 1
+            if self.encoding:
+                if kind is list and converted == item:
+                    return value
+                return f'[{converted} for {item} in {value}]' if converted != item else f'list({value})'
+            if kind is list:
+                return value if converted == item else f'[{converted} for {item} in {value}]'
+            builder = {set: 'set', frozenset: 'frozenset', tuple: 'tuple'}[kind]
+            return f'{builder}({value})' if converted == item else f'{builder}({converted} for {item} in {value})'
+        # Tupla heterogênea: converte posição a posição
+        parts = [self.expr(item_type, f'{value}[{index}]') for index, item_type in enumerate(item_types)]
+        self.depth -= 1
+        if self.encoding:
+            return '[' + ', '.join(parts) + ']'
+        return '(' + ', '.join(parts) + ',)'
+
+    def _mapping(self, args: Tuple, value: str) -> str:
+        key_type, value_type = args if args else (Any, Any)
+        self.depth += 1
+        key, item = f'_k{self.depth}', f'_v{self.depth}'
+        if self.encoding:
+            if key_type in (str, Any):
+                converted_key = key
+            elif isinstance(key_type, type) and issubclass(key_type, Enum):
+                converted_key = f'{key}.value'
+            else:
+                converted_key = f'str({key})'
+        else:
+            if key_type in (int, float):
+                converted_key = f'{key_type.__name__}({key})'
+            else:
+                converted_key = self.expr(key_type, key)
+        converted = self.expr(value_type, item)
+        self.depth -= 1
+        if converted_key == key and converted == item:
+            return value
+        return f'{{{converted_key}: {converted} for {key}, {item} in {value}.items()}}'
+
+
+def _generate(cls: type, encoding: bool) -> Callable:
+    _generating.add(cls)
+    try:
+        return _compile(cls, _Builder(encoding))
+    finally:
+        _generating.discard(cls)
+
+
+def _compile(cls: type, builder: _Builder) -> Callable:
+    encoding = builder.encoding
+    lines = []
+    if encoding:
+        for f, tp in _serialized_fields(cls):
+            lines.append(f'        {f.name!r}: {builder.expr(tp, "obj." + f.name)},')
+        source = 'def encode(obj):\n    return {\n' + '\n'.join(lines) + '\n    }\n'
+    else:
+        for f, tp in _serialized_fields(cls):
+            if not f.init:
+                continue
+            converted = builder.expr(tp, f'data[{f.name!r}]')
+            if f.default is not dataclasses.MISSING:
+                fallback = builder.bind('default', f.default)
+            elif f.default_factory is not dataclasses.MISSING:
+                fallback = builder.bind('factory', f.default_factory) + '()'
+            else:
+                lines.append(f'        {f.name}={converted},')
+                continue
+            lines.append(f'        {f.name}={converted} if {f.name!r} in data else {fallback},')
+        source = 'def decode(data):\n    return _cls(\n' + '\n'.join(lines) + '\n    )\n'
+        builder.namespace['_cls'] = cls
+    exec(compile(source, f'<serialization {cls.__qualname__}>', 'exec'), builder.namespace)
+    function = builder.namespace['encode' if encoding else 'decode']
+    function.__source__ = source
+    return function
@@ -0,0 +1,187 @@
+"""
+Carregamento incremental dos arquivos de regras
+
+`json.load` monta o dict bruto do arquivo inteiro antes da conversão para
+dataclasses, dobrando o pico de memória em catálogos grandes. Aqui o
+arquivo é lido em blocos e o objeto de topo é percorrido chave a chave:
+as entradas dos catálogos ('equipment', 'talents', ...) são decodificadas
+e convertidas uma de cada vez; as demais chaves são lidas inteiras.
+
+    system = EquipmentSystem.load_from_file(path, progress=on_progress)
+
+`progress(lidos, total)` recebe bytes lidos e tamanho do arquivo (total 0
+se desconhecido), no máximo uma vez por bloco, para barras de carregamento.
+"""
+import codecs
+import io
+import json
+import os
+from typing import Any, BinaryIO, Callable, Dict, Optional, Tuple, Union
+
+from .serialization import decode
+
+ProgressCallback = Callable[[int, int], None]
+Source = Union[str, bytes, BinaryIO]
+
+CHUNK_SIZE = 1 << 16
+_WHITESPACE = ' \t\n\r'
+_NUMBER_CHARS = frozenset('0123456789+-.eE')
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Buffer de texto sobre um arquivo binário lido em blocos"""
+
+    def __init__(self, stream: BinaryIO, total: int, progress: Optional[ProgressCallback]):
+        self.stream = stream
+        self.total = total
+        self.progress = progress
+        self.utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.buffer = ''
+        self.pos = 0
+        self.read_bytes = 0
+        self.eof = False
+
+    def fill(self, size: int = CHUNK_SIZE) -> bool:
+        """Lê mais um bloco; descarta o que já foi consumido"""
+        if self.eof:
+            return False
+        chunk = self.stream.read(size)
+        if chunk:
+            self.read_bytes += len(chunk)
+            text = self.utf8.decode(chunk)
+            if self.progress is not None:
+                self.progress(self.read_bytes, self.total)
+        else:
+            self.eof = True
+            text = self.utf8.decode(b'', final=True)
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Próximo caractere não branco ('' no fim do arquivo)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            found = repr(char) if char else 'fim do arquivo'
+            raise ValueError(f"JSON inválido: esperado {' ou '.join(repr(c) for c in chars)}, encontrado {found}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decodifica o próximo valor JSON completo"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+                # Um número só termina em um delimitador: se o resto do buffer
+                # ainda pode continuá-lo ('1.' + '5', '1.5e' + '3'), lê mais
+                if self.eof or type(value) not in (int, float) or not all(
+                        char in _NUMBER_CHARS for char in self.buffer[end:]):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # Valor incompleto: lê mais (blocos crescentes para valores grandes)
+            self.fill(max(CHUNK_SIZE, len(self.buffer) - self.pos))
+
+
+def _open(source: Source) -> Tuple[BinaryIO, int, bool]:
+    """(arquivo binário, tamanho, precisa fechar)"""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source), len(source), False
+    if isinstance(source, str):
+        stream = open(source, 'rb')
+        return stream, os.fstat(stream.fileno()).st_size, True
+    try:
+        total = os.fstat(source.fileno()).st_size
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        total = 0
+    return source, total, False
+
+
+def stream_object(source: Source, catalogs: Dict[str, Callable[[Any, Any], None]],
+                  progress: Optional[ProgressCallback] = None) -> Dict[str, Any]:
+    """Percorre o objeto JSON de topo de `source` (caminho, bytes ou arquivo binário)
+
+    Para cada chave de `catalogs` cujo valor é objeto ou lista, chama
+    `catalogs[chave](nome_ou_índice, valor)` entrada a entrada. Retorna as
+    demais chaves, com os catálogos vazios ({} ou []).
+    """
+    stream, total, owned = _open(source)
+    try:
+        reader = _Reader(stream, total, progress)
+        rest: Dict[str, Any] = {}
+        reader.expect('{')
+        if reader.peek() == '}':
+            reader.pos += 1
+            return rest
+        while True:
+            key = reader.value()
+            reader.expect(':')
+            callback = catalogs.get(key)
+            opening = reader.peek()
+            if callback is not None and opening in '{[':
+                _stream_container(reader, opening, callback)
+                rest[key] = {} if opening == '{' else []
+            else:
+                rest[key] = reader.value()
+            if reader.expect(',}') == '}':
+                return rest
+    finally:
+        if owned:
+            stream.close()
+
+
+def _stream_container(reader: _Reader, opening: str, callback: Callable[[Any, Any], None]):
+    closing = '}' if opening == '{' else ']'
+    reader.pos += 1
+    if reader.peek() == closing:
+        reader.pos += 1
+        return
+    index = 0
+    while True:
+        if opening == '{':
+            name = reader.value()
+            reader.expect(':')
+        else:
+            name = index
+        callback(name, reader.value())
+        index += 1
+        if reader.expect(',' + closing) == closing:
+            return
+
+
+def load_system(cls, source: Source, catalogs: Dict[str, Tuple[type, str]],
+                progress: Optional[ProgressCallback] = None, **options):
+    """Cria o sistema `cls` convertendo os catálogos item a item
+
+    `catalogs` = {chave no JSON: (dataclass do item, método add_* do sistema)}.
+    As demais chaves (e `options`) vão para `cls.from_data`; os itens são
+    adicionados depois, na ordem do arquivo.
+    """
+    items: Dict[str, list] = {key: [] for key in catalogs}
+
+    def collector(key: str, item_cls: type):
+        append = items[key].append
+        return lambda name, data: append(decode(item_cls, data))
+
+    rest = stream_object(
+        source, {key: collector(key, item_cls) for key, (item_cls, _) in catalogs.items()}, progress
+    )
+    system = cls.from_data(rest, **options)
+    for key, (_, adder) in catalogs.items():
+        add = getattr(system, adder)
+        for item in items[key]:
+            add(item)
+    return system
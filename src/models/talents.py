@@ -1,10 +1,13 @@
 """
 Sistema de Talentos/Boons
 """
-import json
 from typing import Dict, List, Optional
 from dataclasses import dataclass, field
 from enum import Enum
+from .catalog_store import CatalogStore
+from .serialization import decode, dumps, encode, loads
+from .streaming import ProgressCallback, Source, load_system
+from .tracking import Revisioned, mutates
 
 
 class TalentWeight(Enum):
@@ -56,6 +59,15 @@ class Talent:
     requirements: TalentRequirement = field(default_factory=TalentRequirement)
     effects: TalentEffect = field(default_factory=TalentEffect)
     max_stacks: int = 1  # Quantas vezes pode ser pego
+    
+    def to_dict(self) -> Dict:
+        """Representação JSON do talento"""
+        return encode(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Talent':
+        """Cria o talento a partir de `to_dict`"""
+        return decode(cls, data)
 
 
 @dataclass
@@ -67,13 +79,33 @@ class TalentBuildRules:
     type_restrictions: Dict[str, int] = field(default_factory=dict)  # {type: max_count}
 
 
-class TalentSystem:
+class TalentSystem(Revisioned):
     """Gerenciador do sistema de talentos"""
     
     def __init__(self):
         self.talents: Dict[str, Talent] = {}
         self.build_rules = TalentBuildRules()
+        # Banco SQLite do catálogo (use_store); None = dict em memória
+        self.store: Optional[CatalogStore] = None
+    
+    @mutates
+    def use_store(self, store: CatalogStore):
+        """Passa os talentos para um banco SQLite (ver EquipmentSystem.use_store)"""
+        catalog = store.catalog(
+            'talents', Talent.to_dict, Talent.from_dict,
+            columns={
+                'talent_type': lambda t: t.talent_type.value,
+                'weight': lambda t: t.weight.value,
+                'min_level': lambda t: t.requirements.min_level
+            },
+            requirements=lambda t: t.requirements.required_attributes
+        )
+        if catalog is not self.talents:
+            catalog.update_many(self.talents.items())
+        self.talents = catalog
+        self.store = store
     
+    @mutates
     def add_talent(self, talent: Talent):
         """Adiciona um talento ao sistema"""
         self.talents[talent.name] = talent
@@ -156,6 +188,8 @@ class TalentSystem:
     
     def get_talents_by_type(self, talent_type: TalentType) -> List[Talent]:
         """Retorna todos talentos de um tipo específico"""
+        if self.store is not None:
+            return self.talents.where(talent_type=talent_type.value)
         return [t for t in self.talents.values() if t.talent_type == talent_type]
     
     def calculate_total_effects(self, talent_names: List[str]) -> TalentEffect:
@@ -191,34 +225,20 @@ class TalentSystem:
         
         return total_effect
     
-    def to_json(self) -> str:
-        """Exporta sistema para JSON"""
-        data = {
-            'talents': {
-                name: {
-                    'name': talent.name,
-                    'talent_type': talent.talent_type.value,
-                    'weight': talent.weight.value,
-                    'description': talent.description,
-                    'requirements': {
-                        'min_level': talent.requirements.min_level,
-                        'required_attributes': talent.requirements.required_attributes,
-                        'required_talents': talent.requirements.required_talents,
-                        'required_race': talent.requirements.required_race,
-                        'required_class': talent.requirements.required_class
-                    },
-                    'effects': {
-                        'attribute_bonuses': talent.effects.attribute_bonuses,
-                        'skill_bonuses': talent.effects.skill_bonuses,
-                        'special_abilities': talent.effects.special_abilities,
-                        'damage_bonus': talent.effects.damage_bonus,
-                        'ac_bonus': talent.effects.ac_bonus,
-                        'save_bonuses': talent.effects.save_bonuses
-                    },
-                    'max_stacks': talent.max_stacks
+    def to_json(self, inline: bool = False, compact: bool = False,
+                base_dir: Optional[str] = None) -> str:
+        """Exporta sistema para JSON (ver EquipmentSystem.to_json)"""
+        if self.store is not None and not inline:
+            talents = {'store': self.store.reference(base_dir)}
+        else:
+            talents = {
+                'talents': {
+                    name: talent.to_dict()
+                    for name, talent in self.talents.items()
                 }
-                for name, talent in self.talents.items()
-            },
+            }
+        data = {
+            **talents,
             'build_rules': {
                 'max_talents': self.build_rules.max_talents,
                 'max_points': self.build_rules.max_points,
@@ -226,57 +246,46 @@ class TalentSystem:
                 'type_restrictions': self.build_rules.type_restrictions
             }
         }
-        return json.dumps(data, indent=2, ensure_ascii=False)
+        return dumps(data, compact)
     
     def save_to_file(self, filepath: str):
-        """Salva sistema em arquivo JSON"""
+        """Salva sistema em arquivo JSON (e a transação do banco SQLite, se houver)"""
         with open(filepath, 'w', encoding='utf-8') as f:
             f.write(self.to_json())
+        if self.store is not None:
+            self.store.commit()
     
     @classmethod
-    def load_from_file(cls, filepath: str):
-        """Carrega sistema de arquivo JSON"""
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            system = cls()
-            
-            # Carregar regras de construção
-            rules_data = data.get('build_rules', {})
-            system.build_rules = TalentBuildRules(
-                max_talents=rules_data.get('max_talents', 3),
-                max_points=rules_data.get('max_points', 6),
-                allow_duplicates=rules_data.get('allow_duplicates', False),
-                type_restrictions=rules_data.get('type_restrictions', {})
-            )
-            
-            # Carregar talentos
-            for name, talent_data in data.get('talents', {}).items():
-                requirements = TalentRequirement(
-                    min_level=talent_data['requirements'].get('min_level', 1),
-                    required_attributes=talent_data['requirements'].get('required_attributes', {}),
-                    required_talents=talent_data['requirements'].get('required_talents', []),
-                    required_race=talent_data['requirements'].get('required_race'),
-                    required_class=talent_data['requirements'].get('required_class')
-                )
-                
-                effects = TalentEffect(
-                    attribute_bonuses=talent_data['effects'].get('attribute_bonuses', {}),
-                    skill_bonuses=talent_data['effects'].get('skill_bonuses', {}),
-                    special_abilities=talent_data['effects'].get('special_abilities', []),
-                    damage_bonus=talent_data['effects'].get('damage_bonus', 0),
-                    ac_bonus=talent_data['effects'].get('ac_bonus', 0),
-                    save_bonuses=talent_data['effects'].get('save_bonuses', {})
-                )
-                
-                talent = Talent(
-                    name=talent_data['name'],
-                    talent_type=TalentType(talent_data['talent_type']),
-                    weight=TalentWeight(talent_data['weight']),
-                    description=talent_data['description'],
-                    requirements=requirements,
-                    effects=effects,
-                    max_stacks=talent_data.get('max_stacks', 1)
-                )
-                system.add_talent(talent)
-            
-            return system
+    def from_json(cls, json_str: str, base_dir: Optional[str] = None):
+        """Importa sistema de JSON"""
+        return cls.from_data(loads(json_str), base_dir)
+    
+    @classmethod
+    def from_data(cls, data: Dict, base_dir: Optional[str] = None):
+        """Cria o sistema a partir do JSON já interpretado (ver EquipmentSystem.from_data)"""
+        system = cls()
+        
+        # Carregar regras de construção
+        rules_data = data.get('build_rules', {})
+        system.build_rules = TalentBuildRules(
+            max_talents=rules_data.get('max_talents', 3),
+            max_points=rules_data.get('max_points', 6),
+            allow_duplicates=rules_data.get('allow_duplicates', False),
+            type_restrictions=rules_data.get('type_restrictions', {})
+        )
+        
+        # Carregar talentos
+        if data.get('store'):
+            system.use_store(CatalogStore.open(data['store'], base_dir))
+        for name, talent_data in data.get('talents', {}).items():
+            talent = Talent.from_dict(talent_data)
+            system.add_talent(talent)
+        
+        return system
+    
+    @classmethod
+    def load_from_file(cls, filepath: Source, progress: Optional[ProgressCallback] = None,
+                       base_dir: Optional[str] = None):
+        """Carrega sistema de arquivo JSON, um talento por vez (ver EquipmentSystem.load_from_file)"""
+        return load_system(cls, filepath, {'talents': (Talent, 'add_talent')}, progress,
+                           base_dir=base_dir)
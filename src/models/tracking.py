@@ -0,0 +1,28 @@
+"""
+Rastreamento de alterações dos sistemas de regras
+
+Cada sistema tem um contador `revision`, incrementado pelos métodos que o
+alteram (`add_*`, `create_*`, `set_*`). Quem guarda a revisão salva pode
+saber se o sistema mudou desde então sem compará-lo por inteiro.
+"""
+from functools import wraps
+
+
+class Revisioned:
+    """Base dos sistemas de regras com contador de revisão"""
+    
+    revision: int = 0
+    
+    def mark_dirty(self):
+        """Registra uma alteração feita diretamente nos atributos do sistema"""
+        self.revision += 1
+
+
+def mutates(method):
+    """Decora um método que altera o sistema, incrementando `revision`"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self.revision += 1
+        return result
+    return wrapper
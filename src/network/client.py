@@ -2,10 +2,17 @@
 Cliente WebSocket para conectar ao servidor
 """
 import asyncio
-import websockets
+import copy
 import json
+import os
+import websockets
 import logging
-from typing import Callable, Optional
+from typing import Callable, Dict, List, Optional
+from urllib.parse import quote
+
+from src.network.client_dispatch import DISPATCH_INLINE, HandlerDispatcher
+from src.network.codec import CodecError, JSON_CODEC, available_codecs, decode_frame, get_codec
+from src.network.world_sync import apply_patch, diff_world, PatchError, world_hash
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,25 +21,61 @@ logger = logging.getLogger(__name__)
 class GameClient:
     """Cliente de jogo com WebSocket"""
     
-    def __init__(self, host: str = 'localhost', port: int = 5000):
-        self.uri = f"ws://{host}:{port}"
+    def __init__(self, host: str = 'localhost', port: int = 5000,
+                 codecs: Optional[List[str]] = None, room: str = 'default',
+                 auto_reconnect: bool = False, handler_mode: str = DISPATCH_INLINE,
+                 handler_workers: int = 1, on_pending: Optional[Callable[[], None]] = None,
+                 cache_dir: Optional[str] = None):
+        # A sala vai no caminho para que um roteador possa redirecionar a conexão
+        self.room = room
+        self.uri = f"ws://{host}:{port}/{quote(room, safe='')}"
+        # Cache em disco do último mundo recebido (por servidor + sala)
+        self.cache_dir = cache_dir
+        # Codecs oferecidos no registro (em ordem de preferência)
+        self.offered_codecs = codecs if codecs is not None else available_codecs()
+        self.codec = JSON_CODEC
         self.websocket: Optional[websockets.WebSocketClientProtocol] = None
         self.connected = False
         self.role: Optional[str] = None  # 'gm' ou 'player'
         self.name: Optional[str] = None
         
-        # Callbacks para diferentes tipos de mensagens
+        # Sessão emitida no registro; `last_seq` é a última mensagem da sala recebida
+        self.session: Optional[str] = None
+        self.last_seq = 0
+        self.auto_reconnect = auto_reconnect
+        self._closing = False
+        
+        # Cópia local do mundo sincronizada por revisão
+        self.world_data: Dict = {}
+        self.world_revision = 0
+        self.world_epoch: Optional[str] = None  # Linhagem das revisões no servidor
+        self._cached_hash: Optional[tuple] = None  # (revisão, hash) do mundo em cache
+        
+        # Callbacks para diferentes tipos de mensagens (síncronos ou async def),
+        # executados fora do laço de recepção conforme `handler_mode`
         self.message_handlers: dict[str, Callable] = {}
+        self.dispatcher = HandlerDispatcher(handler_mode, handler_workers, on_pending=on_pending)
     
     def register_handler(self, message_type: str, handler: Callable):
         """Registra handler para tipo de mensagem"""
         self.message_handlers[message_type] = handler
     
+    def process_pending(self, max_calls: Optional[int] = None) -> int:
+        """Modo `queue`: executa os handlers pendentes na thread que chamar (ex.: UI)"""
+        return self.dispatcher.process_pending(max_calls)
+    
+    async def wait_handlers(self):
+        """Aguarda os handlers já recebidos serem despachados"""
+        await self.dispatcher.join()
+    
     async def connect(self):
         """Conecta ao servidor"""
         try:
+            # Redirecionamentos HTTP (roteador de salas) são seguidos automaticamente
             self.websocket = await websockets.connect(self.uri)
+            self.codec = JSON_CODEC
             self.connected = True
+            self._closing = False
             logger.info(f"Conectado ao servidor: {self.uri}")
             return True
         except Exception as e:
@@ -41,11 +84,16 @@ class GameClient:
             return False
     
     async def disconnect(self):
-        """Desconecta do servidor"""
+        """Desconecta do servidor (salvando o cache do mundo, se ativo)"""
+        self._closing = True
+        await self.save_world_cache()
         if self.websocket:
             await self.websocket.close()
             self.connected = False
             logger.info("Desconectado do servidor")
+        # Entrega o que já foi recebido e encerra a tarefa de despacho
+        await self.dispatcher.join()
+        await self.dispatcher.close()
     
     async def send_message(self, message_type: str, data: dict = None):
         """Envia mensagem ao servidor"""
@@ -59,15 +107,94 @@ class GameClient:
         }
         
         try:
-            await self.websocket.send(json.dumps(message))
+            frame = self.codec.encode(message)
+            if not self.codec.binary:
+                frame = frame.decode('utf-8')
+            await self.websocket.send(frame)
             return True
         except Exception as e:
             logger.error(f"Erro ao enviar mensagem: {e}")
             return False
     
+    @property
+    def cache_path(self) -> Optional[str]:
+        """Arquivo de cache do mundo deste servidor e sala"""
+        if not self.cache_dir:
+            return None
+        return os.path.join(self.cache_dir, quote(self.uri, safe='') + '.json')
+    
+    async def load_world_cache(self) -> bool:
+        """Carrega o mundo guardado em disco (se a cópia local ainda está vazia)"""
+        path = self.cache_path
+        if path is None or self.world_data or not os.path.exists(path):
+            return False
+        
+        def read():
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        
+        try:
+            cached = await asyncio.to_thread(read)
+            data, revision = cached['data'], cached['revision']
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Cache do mundo ignorado: {e}")
+            return False
+        self.world_data = data
+        self.world_revision = revision
+        self.world_epoch = cached.get('epoch')
+        self._cached_hash = (revision, cached.get('hash'))
+        logger.info(f"Mundo carregado do cache (revisão {revision})")
+        return True
+    
+    async def save_world_cache(self) -> bool:
+        """Grava a cópia local do mundo em disco (escrita atômica, fora do event loop)"""
+        path = self.cache_path
+        if path is None or not self.world_data:
+            return False
+        # Serializa aqui: o mundo pode ser alterado pelo laço de recepção
+        content = json.dumps(self.world_data, default=str)
+        digest = world_hash(self.world_data)
+        header = json.dumps({'epoch': self.world_epoch, 'revision': self.world_revision, 'hash': digest})
+        
+        def write():
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp = f"{path}.tmp"
+            with open(temp, 'w', encoding='utf-8') as f:
+                f.write(header[:-1] + ', "data": ' + content + '}')
+            os.replace(temp, path)
+        
+        try:
+            await asyncio.to_thread(write)
+        except OSError as e:
+            logger.warning(f"Erro ao salvar cache do mundo: {e}")
+            return False
+        self._cached_hash = (self.world_revision, digest)
+        return True
+    
+    async def _cache_offer(self) -> Optional[Dict]:
+        """Época, revisão e hash do mundo em cache, enviados no registro"""
+        if self.cache_path is None:
+            return None
+        await self.load_world_cache()
+        if not self.world_data:
+            return None
+        cached = self._cached_hash
+        return {
+            'epoch': self.world_epoch,
+            'revision': self.world_revision,
+            'hash': cached[1] if cached and cached[0] == self.world_revision else world_hash(self.world_data)
+        }
+    
+    async def _registration_data(self, **data) -> Dict:
+        data.update(room=self.room, codecs=self.offered_codecs, batch=True)
+        cache = await self._cache_offer()
+        if cache is not None:
+            data['cache'] = cache
+        return data
+    
     async def register_as_gm(self):
         """Registra como Game Master"""
-        success = await self.send_message('register_gm')
+        success = await self.send_message('register_gm', await self._registration_data())
         if success:
             self.role = 'gm'
             logger.info("Registrado como GM")
@@ -75,20 +202,139 @@ class GameClient:
     
     async def register_as_player(self, player_name: str):
         """Registra como jogador"""
-        success = await self.send_message('register_player', {'name': player_name})
+        success = await self.send_message('register_player', await self._registration_data(name=player_name))
         if success:
             self.role = 'player'
             self.name = player_name
             logger.info(f"Registrado como jogador: {player_name}")
         return success
     
+    async def resume(self):
+        """Retoma a sessão anterior pedindo apenas as mensagens perdidas"""
+        return await self.send_message('resume', {
+            'session': self.session,
+            'seq': self.last_seq,
+            'revision': self.world_revision,
+            'epoch': self.world_epoch,
+            'codecs': self.offered_codecs,
+            'batch': True
+        })
+    
+    async def reconnect(self, max_attempts: Optional[int] = None,
+                        initial_delay: float = 0.5, max_delay: float = 10.0) -> bool:
+        """Reconecta com espera exponencial e retoma a sessão (ou registra de novo)"""
+        delay = initial_delay
+        attempt = 0
+        while not self._closing and (max_attempts is None or attempt < max_attempts):
+            attempt += 1
+            if await self.connect():
+                if self.session:
+                    return await self.resume()
+                if self.role == 'gm':
+                    return await self.register_as_gm()
+                if self.role == 'player':
+                    return await self.register_as_player(self.name)
+                return True
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, max_delay)
+        return False
+    
     async def update_world(self, world_data: dict):
-        """Atualiza dados do mundo (apenas GM)"""
+        """Atualiza dados do mundo (apenas GM)
+        
+        Se já existe uma revisão conhecida, envia apenas as diferenças
+        (patch_world); caso contrário envia o mundo completo.
+        """
         if self.role != 'gm':
             logger.error("Apenas GM pode atualizar o mundo")
             return False
         
-        return await self.send_message('update_world', {'world_data': world_data})
+        if self.world_revision == 0:
+            return await self.send_full_world(world_data)
+        
+        ops = diff_world(self.world_data, world_data)
+        if not ops:
+            return True
+        
+        success = await self.send_message('patch_world', {
+            'base_revision': self.world_revision,
+            'ops': ops
+        })
+        if success:
+            self.world_data = copy.deepcopy(world_data)
+            self.world_revision += 1
+            self._cached_hash = None
+        return success
+    
+    async def send_full_world(self, world_data: dict):
+        """Envia o mundo completo ao servidor (apenas GM)"""
+        success = await self.send_message('update_world', {'world_data': world_data})
+        if success:
+            self.world_data = copy.deepcopy(world_data)
+            self.world_revision += 1
+            self._cached_hash = None
+        return success
+    
+    async def request_snapshot(self):
+        """Pede ao servidor o estado completo do mundo"""
+        return await self.send_message('request_snapshot', {'revision': self.world_revision})
+    
+    async def _sync_world(self, data: dict) -> bool:
+        """Mantém a cópia local do mundo; retorna False se a mensagem foi descartada"""
+        msg_type = data.get('type')
+        
+        if msg_type in ('registration_success', 'resume_success'):
+            # Frames seguintes chegam no codec negociado
+            self.codec = get_codec(data.get('codec'))
+            self.session = data.get('session')
+        
+        elif msg_type == 'resume_failed':
+            # Sessão expirou: registrar novamente (o servidor manda o snapshot)
+            self.session = None
+            if self.role == 'gm':
+                await self.register_as_gm()
+            elif self.role == 'player':
+                await self.register_as_player(self.name)
+        
+        elif msg_type in ('world_data', 'world_updated'):
+            self.world_data = data.get('data', {})
+            self.world_revision = data.get('revision', self.world_revision)
+            self.world_epoch = data.get('epoch', self.world_epoch)
+            self._cached_hash = None
+            if msg_type == 'world_data' and self.cache_path is not None:
+                # Snapshot completo: atualiza o cache para a próxima entrada
+                asyncio.get_running_loop().create_task(self.save_world_cache())
+        
+        elif msg_type == 'world_not_modified':
+            # O mundo em cache é o atual: só adota a revisão do servidor
+            if self._cached_hash and self._cached_hash[0] == self.world_revision:
+                self._cached_hash = (data['revision'], self._cached_hash[1])
+            self.world_revision = data['revision']
+            self.world_epoch = data.get('epoch', self.world_epoch)
+        
+        elif msg_type == 'world_patch':
+            if data.get('base_revision') != self.world_revision:
+                # Ficamos para trás: pedir o estado completo
+                logger.info(f"Revisão {self.world_revision} desatualizada, pedindo snapshot")
+                await self.request_snapshot()
+                return False
+            try:
+                apply_patch(self.world_data, data.get('ops', []))
+            except PatchError as e:
+                logger.error(f"Erro ao aplicar patch: {e}")
+                await self.request_snapshot()
+                return False
+            self.world_revision = data['revision']
+            self.world_epoch = data.get('epoch', self.world_epoch)
+            self._cached_hash = None
+        
+        elif msg_type == 'patch_rejected' and self.role == 'gm':
+            # Servidor está em outra revisão: reenviar o mundo completo
+            logger.warning(f"Patch rejeitado: {data.get('reason')}")
+            self.world_revision = data.get('revision', 0)
+            await self.send_full_world(self.world_data)
+        
+        return True
     
     async def send_chat_message(self, message: str):
         """Envia mensagem de chat"""
@@ -99,13 +345,19 @@ class GameClient:
             'timestamp': time.time()
         })
     
-    async def roll_dice(self, dice: str, result: int):
-        """Envia resultado de rolagem de dados"""
-        return await self.send_message('dice_roll', {
+    async def roll_dice(self, dice: str, result: Optional[int] = None, times: int = 1):
+        """Pede uma rolagem ao servidor ("2d6+3", "1d20adv", "4d6kh3"...)
+        
+        O servidor rola e difunde o resultado; `result` é mantido apenas por
+        compatibilidade e é ignorado. `times` rola a expressão várias vezes.
+        """
+        data = {
             'sender': self.name or self.role or 'Unknown',
-            'dice': dice,
-            'result': result
-        })
+            'dice': dice
+        }
+        if times != 1:
+            data['times'] = times
+        return await self.send_message('dice_roll', data)
     
     async def update_character(self, character_data: dict):
         """Envia atualização de personagem"""
@@ -118,6 +370,23 @@ class GameClient:
         """Envia ping ao servidor"""
         return await self.send_message('ping')
     
+    async def _handle_message(self, data: dict):
+        """Sincroniza o mundo e chama o handler registrado para o tipo"""
+        msg_type = data.get('type')
+        if 'seq' in data:
+            # Mensagens da sala, registro e `resync` trazem a sequência atual
+            self.last_seq = data['seq']
+        
+        if not await self._sync_world(data):
+            return
+        
+        # Chamar handler se existir (sem bloquear a recepção)
+        handler = self.message_handlers.get(msg_type)
+        if handler is not None:
+            self.dispatcher.submit(handler, msg_type, data)
+        else:
+            logger.info(f"Mensagem recebida ({msg_type}): {data}")
+    
     async def receive_messages(self):
         """Recebe mensagens do servidor"""
         if not self.connected or not self.websocket:
@@ -126,26 +395,30 @@ class GameClient:
         try:
             async for message in self.websocket:
                 try:
-                    data = json.loads(message)
-                    msg_type = data.get('type')
-                    
-                    # Chamar handler se existir
-                    if msg_type in self.message_handlers:
-                        self.message_handlers[msg_type](data)
-                    else:
-                        logger.info(f"Mensagem recebida ({msg_type}): {data}")
+                    data = decode_frame(message, self.codec)
+                except CodecError as e:
+                    logger.error(f"Erro ao decodificar mensagem: {e}")
+                    continue
                 
-                except json.JSONDecodeError:
-                    logger.error("Erro ao decodificar mensagem")
+                if data.get('type') == 'batch':
+                    # Modo tick do servidor: várias mensagens em um frame
+                    for item in data.get('messages', []):
+                        await self._handle_message(item)
+                else:
+                    await self._handle_message(data)
         
         except websockets.exceptions.ConnectionClosed:
             logger.info("Conexão fechada pelo servidor")
             self.connected = False
     
     async def run(self):
-        """Executa o cliente"""
-        if await self.connect():
+        """Executa o cliente (reconectando se `auto_reconnect`)"""
+        if not self.connected and not await self.connect():
+            return
+        while True:
             await self.receive_messages()
+            if not self.auto_reconnect or self._closing or not await self.reconnect():
+                break
 
 
 # Exemplo de uso
@@ -0,0 +1,210 @@
+"""
+Despacho dos handlers do cliente fora do laço de recepção
+
+O laço de recepção apenas decodifica, sincroniza o mundo e enfileira; os
+handlers rodam em uma tarefa separada, na ordem de chegada:
+
+    inline  handlers síncronos chamados no event loop (padrão)
+    thread  handlers síncronos executados em um pool de threads
+    queue   handlers síncronos entregues a outra thread (ex.: a thread
+            principal do Kivy), que chama `process_pending()` periodicamente
+
+Handlers `async def` sempre rodam no event loop. Eventos de mundo completo
+pendentes (`world_updated`, `world_data`) são agrupados: se a interface
+está atrasada, apenas o mais recente é entregue.
+"""
+import asyncio
+import inspect
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, FrozenSet, Optional
+
+logger = logging.getLogger(__name__)
+
+DISPATCH_INLINE = 'inline'
+DISPATCH_THREAD = 'thread'
+DISPATCH_QUEUE = 'queue'
+DISPATCH_MODES = (DISPATCH_INLINE, DISPATCH_THREAD, DISPATCH_QUEUE)
+
+# Tipos cujo conteúdo substitui o anterior (o mundo completo)
+COALESCED_TYPES: FrozenSet[str] = frozenset({'world_updated', 'world_data'})
+
+
+class _Call:
+    __slots__ = ('handler', 'msg_type', 'data')
+
+    def __init__(self, handler: Callable, msg_type: Optional[str], data: Dict):
+        self.handler = handler
+        self.msg_type = msg_type
+        self.data = data
+
+
+class _CallQueue:
+    """Fila FIFO de chamadas com agrupamento por tipo (segura entre threads)"""
+
+    def __init__(self, coalesce: FrozenSet[str]):
+        self.coalesce = coalesce
+        self.calls: Deque[_Call] = deque()
+        self._pending: Dict[Optional[str], _Call] = {}
+        self._lock = threading.Lock()
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self.calls)
+
+    def put(self, call: _Call) -> bool:
+        """Enfileira; retorna False se substituiu uma chamada pendente"""
+        with self._lock:
+            if call.msg_type in self.coalesce:
+                pending = self._pending.get(call.msg_type)
+                replaced = pending is not None
+                if replaced:
+                    # O mais recente vai para o fim da fila: eventos enfileirados
+                    # antes dele (ex.: world_patch) não podem chegar depois
+                    self.calls.remove(pending)
+                    self.coalesced += 1
+                self._pending[call.msg_type] = call
+                self.calls.append(call)
+                return not replaced
+            self.calls.append(call)
+            return True
+
+    def get(self) -> Optional[_Call]:
+        with self._lock:
+            if not self.calls:
+                return None
+            call = self.calls.popleft()
+            if self._pending.get(call.msg_type) is call:
+                del self._pending[call.msg_type]
+            return call
+
+    def clear(self):
+        with self._lock:
+            self.calls.clear()
+            self._pending.clear()
+
+
+class HandlerDispatcher:
+    """Executa os handlers de mensagens sem bloquear a recepção"""
+
+    def __init__(self, mode: str = DISPATCH_INLINE, max_workers: int = 1,
+                 coalesce: FrozenSet[str] = COALESCED_TYPES,
+                 on_pending: Optional[Callable[[], None]] = None):
+        if mode not in DISPATCH_MODES:
+            raise ValueError(f"Modo de despacho desconhecido: {mode}")
+        self.mode = mode
+        self.max_workers = max_workers
+        # Chamadas aguardando a tarefa do event loop
+        self.queue = _CallQueue(coalesce)
+        # Modo queue: chamadas síncronas aguardando a outra thread
+        self.ui_queue = _CallQueue(coalesce)
+        # Modo queue: avisado (na thread do event loop) quando há chamadas novas
+        self.on_pending = on_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._idle: Optional[asyncio.Event] = None
+        self.dispatched = 0
+        self.errors = 0
+
+    @property
+    def coalesced(self) -> int:
+        return self.queue.coalesced + self.ui_queue.coalesced
+
+    @property
+    def backlog(self) -> int:
+        return len(self.queue) + len(self.ui_queue)
+
+    def start(self):
+        """Inicia a tarefa de despacho no event loop atual (idempotente)"""
+        if self._task is not None and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        if self.mode == DISPATCH_THREAD and self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='bard-handler')
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def submit(self, handler: Callable, msg_type: Optional[str], data: Dict):
+        """Enfileira a chamada do handler (chamado pelo laço de recepção)"""
+        self.start()
+        self.queue.put(_Call(handler, msg_type, data))
+        self._idle.clear()
+        self._wakeup.set()
+
+    async def join(self):
+        """Aguarda até que as chamadas do event loop tenham sido processadas"""
+        if self._idle is not None:
+            await self._idle.wait()
+
+    async def close(self):
+        """Para a tarefa de despacho e descarta as chamadas do event loop
+
+        Chamadas já entregues à outra thread (modo queue) continuam
+        disponíveis em `process_pending()`.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.queue.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            call = self.queue.get()
+            if call is None:
+                self._idle.set()
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            try:
+                if inspect.iscoroutinefunction(call.handler):
+                    await call.handler(call.data)
+                elif self.mode == DISPATCH_THREAD:
+                    await loop.run_in_executor(self._executor, call.handler, call.data)
+                elif self.mode == DISPATCH_QUEUE:
+                    if self.ui_queue.put(call) and self.on_pending is not None:
+                        self.on_pending()
+                    continue
+                else:
+                    result = call.handler(call.data)
+                    if inspect.isawaitable(result):
+                        await result
+                self.dispatched += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.errors += 1
+                logger.exception(f"Erro no handler de {call.msg_type}")
+            # Deixa o laço de recepção avançar entre handlers
+            await asyncio.sleep(0)
+
+    def process_pending(self, max_calls: Optional[int] = None) -> int:
+        """Modo queue: executa as chamadas pendentes na thread atual
+
+        Para o Kivy: `Clock.schedule_interval(lambda dt: client.process_pending(), 0)`.
+        Retorna quantas chamadas foram executadas.
+        """
+        done = 0
+        while max_calls is None or done < max_calls:
+            call = self.ui_queue.get()
+            if call is None:
+                break
+            try:
+                call.handler(call.data)
+                self.dispatched += 1
+            except Exception:
+                self.errors += 1
+                logger.exception(f"Erro no handler de {call.msg_type}")
+            done += 1
+        return done
@@ -0,0 +1,203 @@
+"""
+Modo multiprocesso: salas distribuídas entre processos worker
+
+Um processo roteador escuta a porta pública e redireciona (HTTP 307) cada
+conexão para o worker que hospeda a sala indicada no caminho da URI
+(ws://host:porta/<sala>). Cada worker é um GameServer independente em uma
+porta interna, então cada sala fica inteira em um único processo/núcleo.
+
+Cada worker só aceita registros de salas que ele hospeda: um `room` no
+registro diferente do caminho, que cairia em outro worker, é rejeitado.
+
+Mensagens entre processos (ex.: anúncios para todas as mesas) passam por
+um barramento; `LocalBus` é o substituto local baseado em
+multiprocessing.Queue, com a mesma interface que um pub/sub externo teria.
+"""
+import asyncio
+import logging
+import multiprocessing
+import threading
+import zlib
+from http import HTTPStatus
+from typing import Dict, List, Optional
+
+import websockets
+
+from src.network.dispatch import SchemaError
+from src.network.rooms import room_from_path
+from src.network.server import GameServer
+
+logger = logging.getLogger(__name__)
+
+
+class LocalBus:
+    """Barramento entre processos: uma fila por worker"""
+
+    def __init__(self, num_workers: int):
+        self.queues = [multiprocessing.Queue() for _ in range(num_workers)]
+
+    def publish(self, message: Dict):
+        """Entrega a mensagem a todos os workers"""
+        for queue in self.queues:
+            queue.put(message)
+
+    def subscription(self, worker_index: int):
+        return self.queues[worker_index]
+
+
+def worker_for(room_id: str, num_workers: int) -> int:
+    """Índice estável do worker que hospeda a sala"""
+    return zlib.crc32(room_id.encode('utf-8')) % num_workers
+
+
+class WorkerServer(GameServer):
+    """GameServer de um worker: recusa salas hospedadas por outro worker"""
+
+    def __init__(self, host: str, port: int, worker_index: int, num_workers: int, **options):
+        super().__init__(host, port, **options)
+        self.worker_index = worker_index
+        self.num_workers = num_workers
+
+    def registration_room(self, websocket, data: Dict) -> str:
+        room_id = super().registration_room(websocket, data)
+        if worker_for(room_id, self.num_workers) != self.worker_index:
+            # Ficaria separada do estado da sala no worker certo
+            raise SchemaError(f"Sala {room_id!r} hospedada por outro worker: conecte em /{room_id}")
+        return room_id
+
+
+async def _listen_bus(server: GameServer, queue):
+    """Repassa mensagens do barramento para todas as salas do worker"""
+    loop = asyncio.get_running_loop()
+    messages: asyncio.Queue = asyncio.Queue()
+
+    def read():
+        # Thread daemon: bloqueada em queue.get, não impede o processo de encerrar
+        while True:
+            message = queue.get()
+            try:
+                loop.call_soon_threadsafe(messages.put_nowait, message)
+            except RuntimeError:  # event loop já encerrado
+                return
+            if message is None:
+                return
+
+    threading.Thread(target=read, name='bus-reader', daemon=True).start()
+    while True:
+        message = await messages.get()
+        if message is None:
+            break
+        await server.broadcast(message)
+
+
+def _run_worker(host: str, port: int, worker_index: int, num_workers: int, queue, server_options: Dict):
+    """Ponto de entrada de um processo worker"""
+    server = WorkerServer(host, port, worker_index, num_workers, **server_options)
+
+    async def main():
+        listener = asyncio.ensure_future(_listen_bus(server, queue))
+        try:
+            await server.start()
+        finally:
+            listener.cancel()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+class RoomRouter:
+    """Roteador de salas: redireciona cada conexão para o worker da sala"""
+
+    def __init__(self, host: str, port: int, worker_ports: List[int]):
+        self.host = host
+        self.port = port
+        self.worker_ports = worker_ports
+        self.routed = 0
+
+    def worker_for(self, room_id: str) -> int:
+        """Índice estável do worker que hospeda a sala"""
+        return worker_for(room_id, len(self.worker_ports))
+
+    def process_request(self, connection, request):
+        """Responde o handshake com um redirecionamento para o worker"""
+        room_id = room_from_path(request.path)
+        worker_port = self.worker_ports[self.worker_for(room_id)]
+        hostname = request.headers.get('Host', self.host).rsplit(':', 1)[0]
+        response = connection.respond(HTTPStatus.TEMPORARY_REDIRECT, '')
+        response.headers['Location'] = f"ws://{hostname}:{worker_port}{request.path}"
+        self.routed += 1
+        return response
+
+    async def _unreachable(self, websocket):
+        # Todo handshake é redirecionado em process_request
+        await websocket.close()
+
+    async def start(self):
+        async with websockets.serve(
+            self._unreachable, self.host, self.port, process_request=self.process_request
+        ):
+            logger.info(f"Roteador de salas em {self.host}:{self.port} -> portas {self.worker_ports}")
+            await asyncio.Future()
+
+
+class GameCluster:
+    """Servidor multiprocesso: N workers GameServer atrás de um roteador"""
+
+    def __init__(
+        self,
+        host: str = 'localhost',
+        port: int = 5000,
+        num_workers: int = 2,
+        server_options: Optional[Dict] = None
+    ):
+        self.host = host
+        self.port = port
+        self.num_workers = num_workers
+        # Workers ocupam as portas seguintes à pública
+        self.worker_ports = [port + 1 + i for i in range(num_workers)]
+        self.server_options = server_options or {}
+        self.bus = LocalBus(num_workers)
+        self.processes: List[multiprocessing.Process] = []
+
+    def start_workers(self):
+        """Inicia os processos worker"""
+        for index, worker_port in enumerate(self.worker_ports):
+            process = multiprocessing.Process(
+                target=_run_worker,
+                args=(self.host, worker_port, index, self.num_workers,
+                      self.bus.subscription(index), self.server_options),
+                daemon=True
+            )
+            process.start()
+            self.processes.append(process)
+        logger.info(f"{self.num_workers} workers iniciados")
+
+    def stop_workers(self):
+        """Encerra os processos worker"""
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join()
+        self.processes.clear()
+
+    def announce(self, message: Dict):
+        """Envia uma mensagem para todas as salas de todos os workers"""
+        self.bus.publish(message)
+
+    async def start(self):
+        """Inicia workers e roteador (roda para sempre)"""
+        self.start_workers()
+        try:
+            await RoomRouter(self.host, self.port, self.worker_ports).start()
+        finally:
+            self.stop_workers()
+
+    def run(self):
+        """Executa o cluster"""
+        asyncio.run(self.start())
+
+
+if __name__ == "__main__":
+    GameCluster(num_workers=multiprocessing.cpu_count()).run()
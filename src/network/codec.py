@@ -0,0 +1,167 @@
+"""
+Codecs de transporte negociados por conexão (JSON, MessagePack, CBOR)
+
+MessagePack e CBOR são opcionais: só ficam disponíveis se `msgpack` ou
+`cbor2` estiverem instalados. JSON é sempre suportado e é o formato usado
+até a negociação terminar (e por clientes antigos que não negociam).
+
+Frames binários recebidos só são aceitos com tipos que o JSON representa
+(dict de chaves str, list, str, números, bool, None): bytes, datas, tags
+CBOR etc. quebrariam a retransmissão para clientes JSON da mesma sala.
+"""
+import json
+import struct
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - dependência opcional
+    msgpack = None
+
+try:
+    import cbor2
+except ImportError:  # pragma: no cover - dependência opcional
+    cbor2 = None
+
+
+class Codec:
+    """Interface de um codec de mensagens"""
+    name = ''
+    binary = True  # False: enviado como frame de texto
+
+    def encode(self, message: Dict) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        raise NotImplementedError
+
+    def encode_batch(self, frames: Sequence[bytes]) -> bytes:
+        """Junta frames já serializados em {'type': 'batch', 'messages': [...]}
+
+        Implementações concretas concatenam os bytes sem reserializar.
+        """
+        return self.encode({'type': 'batch', 'messages': [self.decode(frame) for frame in frames]})
+
+
+class JsonCodec(Codec):
+    """JSON UTF-8 compacto"""
+    name = 'json'
+    binary = False
+
+    def encode(self, message: Dict) -> bytes:
+        return json.dumps(message, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    def encode_batch(self, frames: Sequence[bytes]) -> bytes:
+        return b'{"type":"batch","messages":[' + b','.join(frames) + b']}'
+
+
+class MsgPackCodec(Codec):
+    """MessagePack (requer `msgpack`)"""
+    name = 'msgpack'
+
+    def encode(self, message: Dict) -> bytes:
+        return msgpack.packb(message, use_bin_type=True)
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+    def encode_batch(self, frames: Sequence[bytes]) -> bytes:
+        # Mapa de 2 chaves + cabeçalho de array seguido dos frames concatenados
+        header = b'\x82' + msgpack.packb('type') + msgpack.packb('batch') + msgpack.packb('messages')
+        return header + msgpack.Packer().pack_array_header(len(frames)) + b''.join(frames)
+
+
+class CborCodec(Codec):
+    """CBOR (requer `cbor2`)"""
+    name = 'cbor'
+
+    def encode(self, message: Dict) -> bytes:
+        return cbor2.dumps(message)
+
+    def decode(self, data: Union[bytes, str]) -> Any:
+        return cbor2.loads(data)
+
+    def encode_batch(self, frames: Sequence[bytes]) -> bytes:
+        # Mapa de 2 chaves + cabeçalho de array (tipo maior 4) seguido dos frames
+        header = b'\xa2' + cbor2.dumps('type') + cbor2.dumps('batch') + cbor2.dumps('messages')
+        return header + _cbor_array_header(len(frames)) + b''.join(frames)
+
+
+def _cbor_array_header(length: int) -> bytes:
+    if length < 24:
+        return bytes((0x80 + length,))
+    if length < 0x100:
+        return bytes((0x98, length))
+    if length < 0x10000:
+        return b'\x99' + struct.pack('>H', length)
+    return b'\x9a' + struct.pack('>I', length)
+
+
+JSON_CODEC = JsonCodec()
+
+# Codecs disponíveis neste ambiente, em ordem de preferência
+CODECS: Dict[str, Codec] = {}
+if msgpack is not None:
+    CODECS['msgpack'] = MsgPackCodec()
+if cbor2 is not None:
+    CODECS['cbor'] = CborCodec()
+CODECS['json'] = JSON_CODEC
+
+
+class CodecError(ValueError):
+    """Frame que não pôde ser decodificado"""
+
+
+def get_codec(name: Optional[str]) -> Codec:
+    """Retorna o codec pelo nome (JSON se desconhecido)"""
+    return CODECS.get(name, JSON_CODEC)
+
+
+def available_codecs() -> List[str]:
+    """Nomes dos codecs suportados, do preferido ao fallback"""
+    return list(CODECS)
+
+
+def negotiate(offered: Optional[List[str]]) -> Codec:
+    """Escolhe o primeiro codec oferecido pelo cliente que também é suportado aqui"""
+    for name in offered or []:
+        if name in CODECS:
+            return CODECS[name]
+    return JSON_CODEC
+
+
+_JSON_SCALARS = (str, int, float, bool, type(None))
+
+
+def _check_json_safe(value: Any):
+    """Levanta CodecError se `value` tem algo que o JSON não representa"""
+    stack = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, _JSON_SCALARS):
+            continue
+        if isinstance(item, list):
+            stack.extend(item)
+        elif isinstance(item, dict):
+            for key in item:
+                if not isinstance(key, str):
+                    raise CodecError(f"Chave não textual: {type(key).__name__}")
+            stack.extend(item.values())
+        else:
+            raise CodecError(f"Tipo sem equivalente em JSON: {type(item).__name__}")
+
+
+def decode_frame(data: Union[bytes, str], codec: Codec) -> Any:
+    """Decodifica um frame recebido; frames de texto são sempre JSON"""
+    try:
+        if isinstance(data, str):
+            return json.loads(data)
+        message = codec.decode(data)
+    except Exception as e:
+        raise CodecError(f"Frame inválido para {codec.name}: {e}") from e
+    if codec is not JSON_CODEC:
+        _check_json_safe(message)
+    return message
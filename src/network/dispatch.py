@@ -0,0 +1,141 @@
+"""
+Despacho de mensagens por tipo com validação de schema e histogramas de latência
+"""
+import bisect
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+# Schema: {campo: (tipo ou tupla de tipos, obrigatório)}
+FieldSpec = Tuple[Union[type, Tuple[type, ...]], bool]
+# Handler: async (websocket, data, frame_recebido) -> None
+Handler = Callable[[Any, Dict, Any], Awaitable[Any]]
+
+
+class SchemaError(ValueError):
+    """Mensagem não corresponde ao schema do seu tipo"""
+
+
+def compile_schema(schema: Dict[str, FieldSpec]) -> Callable[[Dict], None]:
+    """Pré-compila um schema em uma função de validação
+
+    Campos opcionais aceitam None; campos extras são ignorados.
+    """
+    checks = tuple(
+        (name, types if isinstance(types, tuple) else (types,), required)
+        for name, (types, required) in schema.items()
+    )
+
+    def validate(data: Dict):
+        for name, types, required in checks:
+            value = data.get(name)
+            if value is None:
+                if required:
+                    raise SchemaError(f"Campo obrigatório ausente: {name}")
+            elif not isinstance(value, types):
+                raise SchemaError(f"Tipo inválido para {name}: {type(value).__name__}")
+
+    return validate
+
+
+class LatencyHistogram:
+    """Histograma de latência com baldes exponenciais (em segundos)"""
+
+    # 50 µs até ~1.6 s, dobrando a cada balde
+    DEFAULT_BUCKETS = tuple(0.00005 * 2 ** i for i in range(16))
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Último balde: acima do maior limite
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Limite superior do balde que contém o quantil q"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        running = 0
+        for i, bucket_count in enumerate(self.counts):
+            running += bucket_count
+            if running >= target:
+                return min(self.buckets[i], self.max) if i < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict:
+        return {
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'mean_ms': (self.total / self.count * 1000) if self.count else 0.0,
+            'p50_ms': self.quantile(0.50) * 1000,
+            'p95_ms': self.quantile(0.95) * 1000,
+            'p99_ms': self.quantile(0.99) * 1000,
+            'max_ms': self.max * 1000,
+        }
+
+
+class _Route:
+    __slots__ = ('handler', 'validate', 'histogram', 'rejected', 'errors')
+
+    def __init__(self, handler: Handler, validate: Optional[Callable[[Dict], None]]):
+        self.handler = handler
+        self.validate = validate
+        self.histogram = LatencyHistogram()
+        self.rejected = 0
+        self.errors = 0
+
+
+class MessageDispatcher:
+    """Registro tipo de mensagem -> handler assíncrono"""
+
+    def __init__(self):
+        self.routes: Dict[str, _Route] = {}
+        self.unknown = 0
+
+    def register(self, msg_type: str, handler: Handler, schema: Optional[Dict[str, FieldSpec]] = None):
+        """Registra o handler de um tipo; o schema é compilado uma única vez"""
+        self.routes[msg_type] = _Route(handler, compile_schema(schema) if schema else None)
+
+    def message_types(self) -> List[str]:
+        return list(self.routes)
+
+    async def dispatch(self, msg_type: Optional[str], websocket, data: Dict, frame=None) -> bool:
+        """Valida e executa o handler do tipo; SchemaError é propagado ao chamador
+
+        Retorna False se o tipo não tem handler registrado.
+        """
+        route = self.routes.get(msg_type)
+        if route is None:
+            self.unknown += 1
+            return False
+
+        if route.validate is not None:
+            try:
+                route.validate(data)
+            except SchemaError:
+                route.rejected += 1
+                raise
+
+        start = time.perf_counter()
+        try:
+            await route.handler(websocket, data, frame)
+        except Exception:
+            route.errors += 1
+            raise
+        finally:
+            route.histogram.observe(time.perf_counter() - start)
+        return True
+
+    def stats(self) -> Dict[str, Dict]:
+        """Latência e contadores por tipo de mensagem"""
+        return {
+            msg_type: {**route.histogram.snapshot(), 'rejected': route.rejected, 'errors': route.errors}
+            for msg_type, route in self.routes.items()
+        }
@@ -0,0 +1,236 @@
+"""
+Registro de métricas em processo (contadores, gauges e histogramas)
+
+As métricas ficam em memória e podem ser lidas como dicionário (mensagem
+`stats`) ou no formato texto do Prometheus (endpoint HTTP opcional).
+Gauges podem ser calculados na leitura (`fn`), sem custo no caminho quente.
+"""
+import asyncio
+import json
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.network.dispatch import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+LabelValues = Tuple[str, ...]
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+
+    def samples(self) -> List[Tuple[str, LabelValues, float]]:
+        """(sufixo, valores dos rótulos, valor) para a exposição"""
+        raise NotImplementedError
+
+    def snapshot(self):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Contador monotônico, opcionalmente com rótulos
+
+    Com `fn`, o total é calculado na leitura a partir de contadores que já
+    existem em outro lugar (ex.: por conexão).
+    """
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 fn: Optional[Callable[[], float]] = None):
+        super().__init__(name, help_text, labelnames)
+        self.values: Dict[LabelValues, float] = {}
+        self.fn = fn
+
+    def inc(self, amount: float = 1, labels: LabelValues = ()):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def samples(self):
+        if self.fn is not None:
+            return [('', (), self.fn())]
+        return [('', labels, value) for labels, value in self.values.items()]
+
+    def snapshot(self):
+        if self.fn is not None:
+            return self.fn()
+        if not self.labelnames:
+            return self.values.get((), 0)
+        return {'/'.join(labels): value for labels, value in self.values.items()}
+
+
+class Gauge(_Metric):
+    """Valor instantâneo; com `fn` é calculado apenas na leitura"""
+    kind = 'gauge'
+
+    def __init__(self, name: str, help_text: str, fn: Optional[Callable[[], float]] = None):
+        super().__init__(name, help_text)
+        self.fn = fn
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+    def get(self) -> float:
+        return self.fn() if self.fn is not None else self.value
+
+    def samples(self):
+        return [('', (), self.get())]
+
+    def snapshot(self):
+        return self.get()
+
+
+class Histogram(_Metric):
+    """Histograma de durações (segundos) com os baldes do LatencyHistogram"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self.histogram = LatencyHistogram()
+
+    def observe(self, seconds: float):
+        self.histogram.observe(seconds)
+
+    def samples(self):
+        histogram = self.histogram
+        result = []
+        running = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            running += count
+            result.append(('_bucket', (f'{bound:g}',), running))
+        result.append(('_bucket', ('+Inf',), histogram.count))
+        result.append(('_sum', (), histogram.total))
+        result.append(('_count', (), histogram.count))
+        return result
+
+    def snapshot(self):
+        return self.histogram.snapshot()
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: Tuple[str, ...], values: LabelValues) -> str:
+    if not values:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+class MetricsRegistry:
+    """Conjunto de métricas nomeadas de um servidor"""
+
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+
+    def _add(self, metric: _Metric) -> _Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Métrica já registrada: {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                fn: Optional[Callable[[], float]] = None) -> Counter:
+        return self._add(Counter(name, help_text, labelnames, fn))
+
+    def gauge(self, name: str, help_text: str, fn: Optional[Callable[[], float]] = None) -> Gauge:
+        return self._add(Gauge(name, help_text, fn))
+
+    def histogram(self, name: str, help_text: str) -> Histogram:
+        return self._add(Histogram(name, help_text))
+
+    def snapshot(self) -> Dict:
+        """Valores atuais como dicionário (para a mensagem `stats`)"""
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def render_prometheus(self) -> str:
+        """Exposição no formato texto do Prometheus (versão 0.0.4)"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for suffix, labels, value in metric.samples():
+                names = ('le',) if suffix == '_bucket' else metric.labelnames
+                lines.append(f'{metric.name}{suffix}{_format_labels(names, labels)} {value:g}')
+        return '\n'.join(lines) + '\n'
+
+
+class LoopLagMonitor:
+    """Mede o atraso do event loop (quanto um sleep curto se atrasa)"""
+
+    def __init__(self, histogram: Histogram, gauge: Gauge, interval: float = 0.5):
+        self.histogram = histogram
+        self.gauge = gauge
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.histogram.observe(lag)
+            self.gauge.set(lag)
+
+
+class MetricsHTTPServer:
+    """Endpoint HTTP mínimo: /metrics (Prometheus) e /stats (JSON)"""
+
+    def __init__(self, registry: MetricsRegistry, stats: Callable[[], Dict],
+                 host: str = '127.0.0.1', port: int = 9100):
+        self.registry = registry
+        self.stats = stats
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        logger.info(f"Métricas em http://{self.host}:{self.port}/metrics")
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), 5)
+            # Descarta os cabeçalhos da requisição
+            while (await asyncio.wait_for(reader.readline(), 5)) not in (b'\r\n', b'\n', b''):
+                pass
+            parts = request_line.decode('latin-1').split()
+            path = parts[1].split('?', 1)[0] if len(parts) > 1 else '/'
+            if path == '/metrics':
+                status, content_type = '200 OK', 'text/plain; version=0.0.4; charset=utf-8'
+                body = self.registry.render_prometheus().encode('utf-8')
+            elif path == '/stats':
+                status, content_type = '200 OK', 'application/json'
+                body = json.dumps(self.stats(), default=str).encode('utf-8')
+            else:
+                status, content_type, body = '404 Not Found', 'text/plain', b'not found\n'
+            writer.write(
+                f'HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n'
+                f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n'.encode('latin-1') + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
@@ -0,0 +1,225 @@
+"""
+Fila de saída por cliente com backpressure e descarte de clientes lentos
+
+Em modo tick (`tick_interval`), a fila é esvaziada uma vez por tick: as
+mensagens acumuladas saem em um único frame `batch` (se o cliente aceitar)
+e atualizações agrupáveis substituídas dentro do tick nunca são enviadas.
+"""
+import asyncio
+import time
+import logging
+from collections import deque
+from typing import Deque, Dict, Hashable, List, Optional
+
+from websockets.exceptions import ConnectionClosed
+
+from src.network.codec import Codec, JSON_CODEC
+
+logger = logging.getLogger(__name__)
+
+# Políticas por tipo de mensagem quando a fila está cheia
+POLICY_KEEP = 'keep'          # Sempre entregue (só é perdida se a fila estiver lotada)
+POLICY_DROP = 'drop'          # Baixa prioridade: descartada primeiro
+POLICY_COALESCE = 'coalesce'  # Mantém apenas a última pendente por chave
+
+DEFAULT_POLICIES: Dict[str, str] = {
+    'character_update': POLICY_COALESCE,
+    'pong': POLICY_DROP,
+}
+
+
+class _Entry:
+    """Frame pendente na fila"""
+    __slots__ = ('frame', 'msg_type', 'key', 'policy', 'codec')
+
+    def __init__(self, frame, msg_type: Optional[str], key: Optional[Hashable], policy: str, codec: Codec):
+        self.frame = frame
+        self.codec = codec  # Codec em que o frame foi serializado
+        self.msg_type = msg_type
+        self.key = key
+        self.policy = policy
+
+
+class ClientConnection:
+    """Conexão de um cliente com tarefa de escrita e fila limitada dedicadas"""
+
+    def __init__(
+        self,
+        websocket,
+        max_queue: int = 256,
+        evict_after: float = 10.0,
+        policies: Optional[Dict[str, str]] = None,
+        codec: Codec = JSON_CODEC,
+        tick_interval: Optional[float] = None
+    ):
+        self.websocket = websocket
+        self.codec = codec  # Formato negociado no registro
+        self.room = None  # Sala em que o cliente entrou no registro
+        self.requested_room: Optional[str] = None  # Sala indicada no caminho da URI
+        self.session: Optional[str] = None  # Token emitido no registro
+        self.max_queue = max_queue
+        self.evict_after = evict_after  # Segundos com fila cheia até desconectar
+        self.policies = DEFAULT_POLICIES if policies is None else policies
+        self.tick_interval = tick_interval  # None: envia assim que possível
+        self.accepts_batch = False  # Cliente anunciou suporte a frames `batch`
+
+        self.queue: Deque[_Entry] = deque()
+        self._pending: Dict[Hashable, _Entry] = {}
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self.full_since: Optional[float] = None
+        self.closed = False
+
+        # Contadores
+        self.sent = 0
+        self.frames = 0  # Frames escritos (menor que `sent` quando há batches)
+        self.bytes_sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_depth = 0
+
+    def start(self):
+        """Inicia a tarefa de escrita"""
+        if self._writer is None:
+            self._writer = asyncio.get_running_loop().create_task(self._write_loop())
+
+    async def stop(self):
+        """Encerra a tarefa de escrita descartando o que estiver pendente"""
+        self.closed = True
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._writer = None
+        self.queue.clear()
+        self._pending.clear()
+
+    @property
+    def depth(self) -> int:
+        return len(self.queue)
+
+    def enqueue(self, frame, msg_type: Optional[str] = None, key: Optional[Hashable] = None) -> bool:
+        """Coloca um frame na fila sem bloquear; retorna False se foi descartado"""
+        if self.closed:
+            return False
+
+        policy = self.policies.get(msg_type, POLICY_KEEP)
+
+        if policy == POLICY_COALESCE:
+            pending = self._pending.get((msg_type, key))
+            if pending is not None:
+                # Substitui o frame pendente mantendo a posição na fila
+                pending.frame = frame
+                self.coalesced += 1
+                return True
+
+        if len(self.queue) >= self.max_queue and not self._make_room(policy):
+            self.dropped += 1
+            self._check_eviction()
+            return False
+
+        entry = _Entry(frame, msg_type, key, policy, self.codec)
+        self.queue.append(entry)
+        if policy == POLICY_COALESCE:
+            self._pending[(msg_type, key)] = entry
+        self.max_depth = max(self.max_depth, len(self.queue))
+        self._wakeup.set()
+        return True
+
+    def _make_room(self, policy: str) -> bool:
+        """Tenta liberar espaço descartando a mensagem pendente de menor prioridade"""
+        if policy != POLICY_KEEP:
+            return False
+        for entry in self.queue:
+            if entry.policy != POLICY_KEEP:
+                self.queue.remove(entry)
+                self._forget(entry)
+                self.dropped += 1
+                return True
+        return False
+
+    def _forget(self, entry: _Entry):
+        if entry.policy == POLICY_COALESCE and self._pending.get((entry.msg_type, entry.key)) is entry:
+            del self._pending[(entry.msg_type, entry.key)]
+
+    def _check_eviction(self):
+        """Desconecta o cliente se a fila continuar cheia além do prazo"""
+        now = time.monotonic()
+        if self.full_since is None:
+            self.full_since = now
+        elif now - self.full_since > self.evict_after:
+            logger.warning(
+                f"Cliente lento desconectado (fila {len(self.queue)}, descartes {self.dropped})"
+            )
+            self.closed = True
+            asyncio.get_running_loop().create_task(self.websocket.close(code=1008, reason='slow consumer'))
+
+    async def _write_loop(self):
+        """Envia os frames da fila em ordem, um cliente por tarefa"""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                if not self.queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                if self.tick_interval:
+                    # Alinhado ao relógio: todos os clientes esvaziam no mesmo tick
+                    await asyncio.sleep(self.tick_interval - loop.time() % self.tick_interval)
+                    await self._flush_tick()
+                    continue
+                entry = self.queue.popleft()
+                self._forget(entry)
+                if len(self.queue) <= self.max_queue // 2:
+                    # Cliente voltou a acompanhar: zera o prazo de descarte
+                    self.full_since = None
+                await self.websocket.send(entry.frame, text=not entry.codec.binary)
+                self.sent += 1
+                self.frames += 1
+                self.bytes_sent += len(entry.frame)
+        except ConnectionClosed:
+            self.closed = True
+
+    async def _flush_tick(self):
+        """Envia tudo o que acumulou no tick, agrupando por codec"""
+        entries = list(self.queue)
+        self.queue.clear()
+        self._pending.clear()
+        self.full_since = None
+        start = 0
+        while start < len(entries):
+            codec = entries[start].codec
+            end = start + 1
+            while end < len(entries) and entries[end].codec is codec:
+                end += 1
+            await self._send_group(codec, [entry.frame for entry in entries[start:end]])
+            start = end
+
+    async def _send_group(self, codec: Codec, frames: List[bytes]):
+        text = not codec.binary
+        if self.accepts_batch and len(frames) > 1:
+            batch = codec.encode_batch(frames)
+            await self.websocket.send(batch, text=text)
+            self.frames += 1
+            self.bytes_sent += len(batch)
+        else:
+            for frame in frames:
+                await self.websocket.send(frame, text=text)
+                self.bytes_sent += len(frame)
+            self.frames += len(frames)
+        self.sent += len(frames)
+
+    def stats(self) -> Dict:
+        """Profundidade da fila e contadores de envio/descarte"""
+        return {
+            'codec': self.codec.name,
+            'queue_depth': len(self.queue),
+            'max_queue_depth': self.max_depth,
+            'sent': self.sent,
+            'frames': self.frames,
+            'bytes_sent': self.bytes_sent,
+            'dropped': self.dropped,
+            'coalesced': self.coalesced,
+        }
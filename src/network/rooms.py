@@ -0,0 +1,205 @@
+"""
+Salas (mesas/campanhas) hospedadas por um mesmo servidor
+"""
+import hashlib
+import json
+import secrets
+import time
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, Hashable, List, Optional, Tuple
+from urllib.parse import unquote
+
+from src.models.dice import DiceRoller
+from src.network.codec import Codec, JSON_CODEC, get_codec
+from src.network.outbound import ClientConnection
+from src.network.world_sync import world_hash
+
+DEFAULT_ROOM = 'default'
+
+
+def room_from_path(path: Optional[str]) -> str:
+    """Extrai o id da sala do caminho da URI (ws://host:porta/<sala>)"""
+    room_id = unquote((path or '').split('?', 1)[0].strip('/'))
+    return room_id or DEFAULT_ROOM
+
+
+class Room:
+    """Estado de uma mesa: membros, GM e mundo sincronizado"""
+
+    def __init__(self, room_id: str, history_size: int = 512, dice_seed: Optional[int] = None):
+        self.room_id = room_id
+        self.members: Dict[object, ClientConnection] = {}
+        self.gm_client = None
+        self.world_data: Dict = {}
+        self.world_revision = 0  # Incrementa a cada alteração do mundo
+        # Identifica a linhagem das revisões: uma sala recriada recomeça em outra época
+        self.world_epoch = secrets.token_hex(8)
+        # Patches desde o último mundo completo, para enviar só a diferença a
+        # clientes com cache: (revisão base, operações em JSON)
+        self.patch_log: Deque[Tuple[int, str]] = deque(maxlen=history_size)
+        self._hash_cache: Optional[Tuple[int, str]] = None
+        # Snapshot já serializado por codec: {codec: (revisão, frame)}
+        self._snapshot_cache: Dict[str, Tuple[int, bytes]] = {}
+        # Últimas mensagens difundidas, já serializadas (o conteúdo fica
+        # congelado mesmo que o mundo seja alterado depois), para reenvio
+        # após reconexão: (seq, tipo, chave, sessão excluída, codec, frame)
+        self.seq = 0
+        self.history: Deque[Tuple[int, Optional[str], Optional[Hashable], Optional[str], Codec, bytes]] = \
+            deque(maxlen=history_size)
+        self.fanout_histogram = None  # Histogram de métricas (definido pelo servidor)
+        # Rolagens autoritativas da sala; com semente do servidor, derivada do id da sala
+        if dice_seed is not None:
+            digest = hashlib.sha256(f"{dice_seed}:{room_id}".encode('utf-8')).digest()
+            dice_seed = int.from_bytes(digest[:8], 'big')
+        self.dice = DiceRoller(dice_seed)
+
+    def add(self, websocket, connection: ClientConnection):
+        self.members[websocket] = connection
+        connection.room = self
+
+    def remove(self, websocket):
+        connection = self.members.pop(websocket, None)
+        if connection is not None:
+            connection.room = None
+        if websocket == self.gm_client:
+            self.gm_client = None
+
+    @property
+    def is_idle(self) -> bool:
+        """Sala sem membros nem mundo pode ser descartada"""
+        return not self.members and not self.world_data
+
+    def set_world(self, world_data: Dict):
+        """Substitui o mundo inteiro (patches anteriores deixam de valer)"""
+        self.world_data = world_data
+        self.world_revision += 1
+        self.patch_log.clear()
+
+    def record_patch(self, base_revision: int, ops: List[Dict]):
+        """Guarda as operações de um patch já aplicado (congeladas em JSON)"""
+        self.patch_log.append((base_revision, json.dumps(ops, default=str)))
+
+    def world_hash(self) -> str:
+        """Hash do conteúdo atual do mundo (calculado uma vez por revisão)"""
+        if self._hash_cache is None or self._hash_cache[0] != self.world_revision:
+            self._hash_cache = (self.world_revision, world_hash(self.world_data))
+        return self._hash_cache[1]
+
+    def ops_since(self, revision: int) -> Optional[List[Dict]]:
+        """Operações que levam o mundo de `revision` até a atual, se registradas"""
+        if not self.patch_log or self.patch_log[0][0] > revision:
+            return None
+        ops: List[Dict] = []
+        expected = revision
+        for base_revision, encoded in self.patch_log:
+            if base_revision < revision:
+                continue
+            if base_revision != expected:
+                return None
+            ops.extend(json.loads(encoded))
+            expected += 1
+        return ops if expected == self.world_revision else None
+
+    def world_frame_for(self, codec: Codec, cache: Optional[Dict]) -> Tuple[bytes, str]:
+        """Frame que atualiza o mundo de um cliente, considerando o cache dele
+        
+        `cache` traz a época, a revisão e o hash do mundo guardado pelo
+        cliente. Responde `world_not_modified` se o conteúdo é o mesmo, um
+        `world_patch` se os patches desde a revisão dele ainda estão
+        registrados, ou o snapshot completo.
+        """
+        cache = cache or {}
+        revision = cache.get('revision')
+        same_epoch = cache.get('epoch') == self.world_epoch and isinstance(revision, int)
+        if same_epoch and revision == self.world_revision or \
+                cache.get('hash') and self.world_data and cache['hash'] == self.world_hash():
+            return codec.encode({
+                'type': 'world_not_modified',
+                'revision': self.world_revision,
+                'epoch': self.world_epoch,
+                'room': self.room_id
+            }), 'world_not_modified'
+        if same_epoch and 0 < revision < self.world_revision:
+            ops = self.ops_since(revision)
+            if ops is not None:
+                return codec.encode({
+                    'type': 'world_patch',
+                    'base_revision': revision,
+                    'revision': self.world_revision,
+                    'ops': ops,
+                    'epoch': self.world_epoch
+                }), 'world_patch'
+        return self.snapshot_frame(codec), 'world_data'
+
+    def snapshot_frame(self, codec: Codec = JSON_CODEC) -> bytes:
+        """Retorna o snapshot do mundo serializado, reaproveitando o cache da revisão"""
+        cached = self._snapshot_cache.get(codec.name)
+        if cached is None or cached[0] != self.world_revision:
+            cached = (self.world_revision, codec.encode({
+                'type': 'world_data',
+                'data': self.world_data,
+                'revision': self.world_revision,
+                'epoch': self.world_epoch,
+                'room': self.room_id
+            }))
+            self._snapshot_cache[codec.name] = cached
+        return cached[1]
+
+    def broadcast(self, message: Dict, exclude=None, key: Optional[Hashable] = None):
+        """Numera a mensagem e a coloca na fila de todos os membros da sala
+
+        A mensagem é serializada uma única vez por codec em uso. `key`
+        identifica mensagens que podem ser agrupadas (padrão: remetente).
+        """
+        start = time.perf_counter()
+        self.seq += 1
+        message = dict(message, seq=self.seq)
+        msg_type = message.get('type')
+        if key is None:
+            key = message.get('sender')
+
+        frames: Dict[str, bytes] = {}
+        for client, connection in self.members.items():
+            if client != exclude:
+                codec = connection.codec
+                frame = frames.get(codec.name)
+                if frame is None:
+                    frame = frames[codec.name] = codec.encode(message)
+                connection.enqueue(frame, msg_type, key)
+
+        if frames:
+            codec_name, frame = next(iter(frames.items()))
+            codec = get_codec(codec_name)
+        else:
+            codec, frame = JSON_CODEC, JSON_CODEC.encode(message)
+        excluded = self.members.get(exclude)
+        self.history.append((self.seq, msg_type, key, excluded.session if excluded else None, codec, frame))
+        if self.fanout_histogram is not None:
+            self.fanout_histogram.observe(time.perf_counter() - start)
+
+    def replay_since(self, connection: ClientConnection, seq: int) -> Optional[int]:
+        """Coloca na fila as mensagens posteriores a `seq` que a sessão perdeu
+
+        Retorna quantas foram reenviadas, ou None se o histórico já não cobre
+        o intervalo (cliente muito atrasado ou de outra instância da sala) ou
+        se o reenvio não caberia na fila de saída.
+        """
+        if seq > self.seq:
+            return None
+        oldest = self.history[0][0] if self.history else self.seq + 1
+        if seq + 1 < oldest:
+            return None
+        missed = [
+            entry for entry in islice(self.history, seq + 1 - oldest, None)
+            if entry[3] is None or entry[3] != connection.session
+        ]
+        if len(missed) > connection.max_queue - connection.depth:
+            # Não caberia na fila de saída: sai mais barato mandar o snapshot
+            return None
+        target = connection.codec
+        for _, msg_type, key, _, codec, frame in missed:
+            if codec is not target:
+                frame = target.encode(codec.decode(frame))
+            connection.enqueue(frame, msg_type, key)
+        return len(missed)
@@ -2,135 +2,633 @@
 Servidor WebSocket para comunicação local/LAN
 """
 import asyncio
+import secrets
 import websockets
-import json
-from typing import Set, Dict
+from typing import Dict, Hashable, List, Optional, Union
 import logging
 
+from src.network.codec import Codec, CodecError, JSON_CODEC, decode_frame, negotiate
+from src.network.dispatch import MessageDispatcher, SchemaError
+from src.network.metrics import LoopLagMonitor, MetricsHTTPServer, MetricsRegistry
+from src.network.outbound import ClientConnection
+from src.network.rooms import DEFAULT_ROOM, Room, room_from_path
+from src.network.sessions import SessionStore
+from src.network.world_sync import apply_patch, PatchError
+from src.models.dice import DiceError, parse_dice
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+MAX_ROLLS_PER_MESSAGE = 1000
+MAX_DICE_PER_MESSAGE = 100000  # Dados rolados por mensagem (dados da expressão x times)
+
 
 class GameServer:
-    """Servidor de jogo com WebSocket"""
+    """Servidor de jogo com WebSocket
     
-    def __init__(self, host: str = 'localhost', port: int = 5000):
+    Um mesmo servidor hospeda várias salas (mesas); cada cliente entra em
+    uma sala ao se registrar e recebe apenas as mensagens dela.
+    """
+    
+    def __init__(
+        self,
+        host: str = 'localhost',
+        port: int = 5000,
+        max_queue: int = 256,
+        slow_client_timeout: float = 10.0,
+        message_policies: Optional[Dict[str, str]] = None,
+        tick_interval: Optional[float] = None,
+        history_size: int = 512,
+        session_ttl: float = 300.0,
+        dice_seed: Optional[int] = None,
+        metrics_port: Optional[int] = None,
+        metrics_host: str = '127.0.0.1',
+        log_sample_every: int = 0,
+        admin_token: Optional[str] = None
+    ):
         self.host = host
         self.port = port
-        self.clients: Set[websockets.WebSocketServerProtocol] = set()
-        self.gm_client = None
-        self.world_data: Dict = {}
+        # Cada websocket tem sua própria fila de saída e tarefa de escrita
+        self.clients: Dict[websockets.WebSocketServerProtocol, ClientConnection] = {}
+        self.max_queue = max_queue
+        self.slow_client_timeout = slow_client_timeout
+        self.message_policies = message_policies
+        # Modo tick (ex.: 0.02–0.05 s): mensagens de cada cliente saem agrupadas por tick
+        self.tick_interval = tick_interval
+        self.rooms: Dict[str, Room] = {}
+        # Mensagens recentes guardadas por sala para retomar sessões
+        self.history_size = history_size
+        self.sessions = SessionStore(session_ttl)
+        # Semente dos dados: fixa -> rolagens reprodutíveis por sala
+        self.dice_seed = dice_seed
         self.running = False
+        
+        # Conteúdo de chat/dados só é registrado em DEBUG ou 1 a cada N mensagens
+        self.log_sample_every = log_sample_every
+        self._content_logs = 0
+        
+        # Tabela tipo de mensagem -> handler
+        self.dispatcher = MessageDispatcher()
+        self._register_handlers()
+        
+        # Métricas (endpoint HTTP só se metrics_port for informado)
+        self.metrics_port = metrics_port
+        self.metrics_host = metrics_host
+        # Quem envia este token em `stats` vê o servidor inteiro (None: ninguém)
+        self.admin_token = admin_token
+        self.metrics = MetricsRegistry()
+        self._register_metrics()
     
-    async def register_client(self, websocket):
-        """Registra novo cliente"""
-        self.clients.add(websocket)
+    async def register_client(self, websocket, room_id: str = DEFAULT_ROOM):
+        """Registra novo cliente (entra em uma sala apenas no registro)"""
+        connection = ClientConnection(
+            websocket,
+            max_queue=self.max_queue,
+            evict_after=self.slow_client_timeout,
+            policies=self.message_policies,
+            tick_interval=self.tick_interval
+        )
+        connection.requested_room = room_id
+        self.clients[websocket] = connection
+        self._connections_total.inc()
+        connection.start()
         logger.info(f"Cliente conectado. Total: {len(self.clients)}")
+    
+    def get_room(self, room_id: str) -> Room:
+        """Retorna a sala, criando-a se necessário"""
+        room = self.rooms.get(room_id)
+        if room is None:
+            room = self.rooms[room_id] = Room(room_id, self.history_size, self.dice_seed)
+            room.fanout_histogram = self._fanout_seconds
+            logger.info(f"Sala criada: {room_id}")
+        return room
+    
+    def join_room(self, websocket, room_id: str, send_world: bool = True,
+                  cache: Optional[Dict] = None) -> Optional[Room]:
+        """Move o cliente para a sala e envia o mundo dela
         
-        # Enviar dados do mundo para novo cliente
-        if self.world_data:
-            await websocket.send(json.dumps({
-                'type': 'world_data',
-                'data': self.world_data
-            }))
+        Com `cache` (época, revisão e hash do mundo guardado pelo cliente),
+        envia só `world_not_modified` ou a diferença quando possível.
+        """
+        connection = self.clients.get(websocket)
+        if connection is None:
+            return None
+        if connection.room is not None:
+            if connection.room.room_id == room_id:
+                return connection.room
+            self.leave_room(websocket)
+        room = self.get_room(room_id)
+        room.add(websocket, connection)
+        if send_world:
+            self.send_room_world(websocket, room, cache)
+        return room
+    
+    def send_room_world(self, websocket, room: Room, cache: Optional[Dict] = None):
+        """Envia o mundo da sala ao cliente, se houver mundo ou cache a validar"""
+        connection = self.clients.get(websocket)
+        if connection is not None and (room.world_data or cache is not None):
+            self.send_world(connection, room, cache)
+    
+    def send_world(self, connection: ClientConnection, room: Room, cache: Optional[Dict]) -> str:
+        """Coloca na fila o frame de mundo adequado ao cache do cliente"""
+        frame, kind = room.world_frame_for(connection.codec, cache)
+        self._world_sends.inc(labels=(kind,))
+        connection.enqueue(frame, kind)
+        return kind
+    
+    def leave_room(self, websocket):
+        """Remove o cliente da sua sala (descarta salas vazias sem mundo)"""
+        connection = self.clients.get(websocket)
+        room = connection.room if connection is not None else None
+        if room is None:
+            return
+        if websocket == room.gm_client:
+            logger.info(f"GM desconectado da sala {room.room_id}")
+        room.remove(websocket)
+        if room.is_idle:
+            del self.rooms[room.room_id]
+    
+    def room_of(self, websocket) -> Optional[Room]:
+        """Sala do cliente; clientes antigos que não se registram vão para a sala padrão"""
+        connection = self.clients.get(websocket)
+        if connection is None:
+            return None
+        return connection.room or self.join_room(websocket, connection.requested_room or DEFAULT_ROOM)
+    
+    def registration_room(self, websocket, data: Dict) -> str:
+        """Sala pedida no registro, ou a do caminho da conexão"""
+        connection = self.clients.get(websocket)
+        fallback = connection.requested_room if connection is not None else None
+        return data.get('room') or fallback or DEFAULT_ROOM
+    
+    async def send_snapshot(self, websocket):
+        """Envia o estado completo do mundo da sala com a revisão atual"""
+        connection = self.clients.get(websocket)
+        if connection is not None and connection.room is not None:
+            connection.enqueue(connection.room.snapshot_frame(connection.codec), 'world_data')
+    
+    async def send(self, websocket, payload: Dict):
+        """Envia uma mensagem para um único cliente"""
+        connection = self.clients.get(websocket)
+        if connection is not None:
+            connection.enqueue(connection.codec.encode(payload), payload.get('type'))
+    
+    def enqueue(self, websocket, frame, msg_type: Optional[str] = None,
+                key: Optional[Hashable] = None) -> bool:
+        """Coloca um frame na fila de saída do cliente"""
+        connection = self.clients.get(websocket)
+        if connection is None:
+            return False
+        return connection.enqueue(frame, msg_type, key)
+    
+    def get_client_stats(self, room: Optional[Room] = None) -> List[Dict]:
+        """Profundidade de fila e contadores de descarte por cliente (só da sala, se informada)"""
+        return [
+            {
+                'remote': str(getattr(ws, 'remote_address', '')),
+                'room': conn.room.room_id if conn.room else None,
+                'gm': conn.room is not None and ws == conn.room.gm_client,
+                **conn.stats()
+            }
+            for ws, conn in self.clients.items()
+            if room is None or conn.room is room
+        ]
     
     async def unregister_client(self, websocket):
-        """Remove cliente"""
-        self.clients.remove(websocket)
-        if websocket == self.gm_client:
-            self.gm_client = None
-            logger.info("GM desconectado")
+        """Remove cliente (a sessão continua válida para ser retomada)"""
+        self.leave_room(websocket)
+        connection = self.clients.pop(websocket, None)
+        if connection is not None:
+            self._closed_totals['sent'] += connection.sent
+            self._closed_totals['bytes_sent'] += connection.bytes_sent
+            self._closed_totals['dropped'] += connection.dropped
+            self._closed_totals['coalesced'] += connection.coalesced
+            self.sessions.detach(connection.session)
+            await connection.stop()
         logger.info(f"Cliente desconectado. Total: {len(self.clients)}")
     
-    async def broadcast(self, message: str, exclude=None):
-        """Envia mensagem para todos os clientes"""
-        if self.clients:
-            tasks = []
-            for client in self.clients:
-                if client != exclude:
-                    tasks.append(client.send(message))
-            await asyncio.gather(*tasks, return_exceptions=True)
+    async def broadcast(
+        self,
+        message: Dict,
+        exclude=None,
+        key: Optional[Hashable] = None,
+        room: Optional[Room] = None
+    ):
+        """Envia mensagem para os clientes de uma sala (ou de todas)
+        
+        A mensagem é serializada uma única vez por codec em uso e o mesmo
+        buffer é colocado na fila de cada cliente; nenhum cliente lento
+        bloqueia os demais.
+        """
+        rooms = [room] if room is not None else list(self.rooms.values())
+        for target in rooms:
+            target.broadcast(message, exclude=exclude, key=key)
+    
+    def _register_metrics(self):
+        """Cria as métricas do servidor; totais por conexão são somados só na leitura"""
+        metrics = self.metrics
+        # Contadores de conexões já encerradas, para os totais não regredirem
+        self._closed_totals = {'sent': 0, 'bytes_sent': 0, 'dropped': 0, 'coalesced': 0}
+        
+        def total(field: str):
+            return lambda: self._closed_totals[field] + sum(
+                getattr(conn, field) for conn in self.clients.values()
+            )
+        
+        self._connections_total = metrics.counter(
+            'bardgame_connections_total', 'Conexões aceitas')
+        metrics.gauge('bardgame_connections', 'Conexões abertas', fn=lambda: len(self.clients))
+        metrics.gauge('bardgame_rooms', 'Salas ativas', fn=lambda: len(self.rooms))
+        self._messages_received = metrics.counter(
+            'bardgame_messages_received_total', 'Mensagens recebidas por tipo', ('type',))
+        self._bytes_received = metrics.counter(
+            'bardgame_bytes_received_total', 'Bytes recebidos (caracteres em frames de texto)')
+        metrics.counter('bardgame_messages_sent_total', 'Mensagens enviadas', fn=total('sent'))
+        metrics.counter('bardgame_bytes_sent_total', 'Bytes enviados', fn=total('bytes_sent'))
+        metrics.counter('bardgame_messages_dropped_total', 'Mensagens descartadas por fila cheia',
+                        fn=total('dropped'))
+        metrics.counter('bardgame_messages_coalesced_total', 'Mensagens substituídas por outra mais recente',
+                        fn=total('coalesced'))
+        metrics.gauge('bardgame_outbound_queue_depth', 'Mensagens pendentes em todas as filas',
+                      fn=lambda: sum(conn.depth for conn in self.clients.values()))
+        metrics.gauge('bardgame_outbound_queue_depth_max', 'Maior fila pendente entre os clientes',
+                      fn=lambda: max((conn.depth for conn in self.clients.values()), default=0))
+        self._world_sends = metrics.counter(
+            'bardgame_world_sends_total', 'Mundos enviados na entrada por tipo (snapshot, patch ou não modificado)',
+            ('kind',))
+        self._fanout_seconds = metrics.histogram(
+            'bardgame_broadcast_fanout_seconds', 'Tempo para serializar e enfileirar um broadcast')
+        self.loop_lag = LoopLagMonitor(
+            metrics.histogram('bardgame_event_loop_lag_seconds', 'Atraso do event loop'),
+            metrics.gauge('bardgame_event_loop_lag_last_seconds', 'Última medição do atraso do event loop')
+        )
+    
+    @staticmethod
+    def get_room_stats(room: Room) -> Dict:
+        return {'members': len(room.members), 'revision': room.world_revision, 'seq': room.seq}
+    
+    def get_stats(self, include_clients: bool = True) -> Dict:
+        """Métricas, latência por handler e (opcionalmente) estado de cada cliente"""
+        stats = {
+            'metrics': self.metrics.snapshot(),
+            'handlers': self.get_handler_stats(),
+            'rooms': {room_id: self.get_room_stats(room) for room_id, room in self.rooms.items()},
+        }
+        if include_clients:
+            stats['clients'] = self.get_client_stats()
+        return stats
     
-    async def handle_message(self, websocket, message: str):
+    def _content_log_level(self) -> Optional[int]:
+        """Nível para registrar o conteúdo de uma mensagem (None: não registrar)"""
+        if logger.isEnabledFor(logging.DEBUG):
+            return logging.DEBUG
+        if self.log_sample_every:
+            self._content_logs += 1
+            if self._content_logs % self.log_sample_every == 0:
+                return logging.INFO
+        return None
+    
+    def _register_handlers(self):
+        """Registra handlers e schemas de cada tipo de mensagem"""
+        routes = {
+            'register_gm': (self.on_register_gm, {
+                'room': (str, False),
+                'codecs': (list, False),
+                'batch': (bool, False),
+                'cache': (dict, False)
+            }),
+            'register_player': (self.on_register_player, {
+                'name': (str, False),
+                'room': (str, False),
+                'codecs': (list, False),
+                'batch': (bool, False),
+                'cache': (dict, False)
+            }),
+            'update_world': (self.on_update_world, {'world_data': (dict, True)}),
+            'patch_world': (self.on_patch_world, {
+                'base_revision': (int, True),
+                'ops': (list, True)
+            }),
+            'request_snapshot': (self.on_request_snapshot, {'revision': (int, False)}),
+            'chat_message': (self.on_chat_message, {
+                'sender': (str, False),
+                'message': (str, False),
+                'timestamp': ((int, float), False)
+            }),
+            'dice_roll': (self.on_dice_roll, {
+                'sender': (str, False),
+                'dice': (str, True),
+                'times': (int, False)
+            }),
+            'character_update': (self.on_character_update, {
+                'sender': (str, False),
+                'character': (dict, True)
+            }),
+            'resume': (self.on_resume, {
+                'session': (str, True),
+                'seq': (int, False),
+                'revision': (int, False),
+                'epoch': (str, False),
+                'codecs': (list, False),
+                'batch': (bool, False)
+            }),
+            'stats': (self.on_stats, {'admin_token': (str, False)}),
+            'ping': (self.on_ping, None),
+        }
+        for msg_type, (handler, schema) in routes.items():
+            self.dispatcher.register(msg_type, handler, schema)
+    
+    def get_handler_stats(self) -> Dict[str, Dict]:
+        """Histograma de latência e rejeições por tipo de mensagem"""
+        return self.dispatcher.stats()
+    
+    async def handle_message(self, websocket, message: Union[str, bytes]):
         """Processa mensagem recebida"""
+        connection = self.clients.get(websocket)
+        codec = connection.codec if connection is not None else JSON_CODEC
         try:
-            data = json.loads(message)
-            msg_type = data.get('type')
-            
-            if msg_type == 'register_gm':
-                # Registrar como GM
-                self.gm_client = websocket
-                logger.info("GM registrado")
-                await websocket.send(json.dumps({
-                    'type': 'registration_success',
-                    'role': 'gm'
-                }))
-            
-            elif msg_type == 'register_player':
-                # Registrar como jogador
-                player_name = data.get('name', 'Unknown')
-                logger.info(f"Jogador registrado: {player_name}")
-                await websocket.send(json.dumps({
-                    'type': 'registration_success',
-                    'role': 'player',
-                    'name': player_name
-                }))
-            
-            elif msg_type == 'update_world':
-                # GM atualiza dados do mundo
-                if websocket == self.gm_client:
-                    self.world_data = data.get('world_data', {})
-                    logger.info("Dados do mundo atualizados")
-                    # Broadcast para todos os jogadores
-                    await self.broadcast(json.dumps({
-                        'type': 'world_updated',
-                        'data': self.world_data
-                    }), exclude=websocket)
-            
-            elif msg_type == 'chat_message':
-                # Mensagem de chat
-                sender = data.get('sender', 'Unknown')
-                msg = data.get('message', '')
-                logger.info(f"Chat - {sender}: {msg}")
-                await self.broadcast(json.dumps({
-                    'type': 'chat_message',
-                    'sender': sender,
-                    'message': msg,
-                    'timestamp': data.get('timestamp')
-                }))
-            
-            elif msg_type == 'dice_roll':
-                # Rolagem de dados
-                sender = data.get('sender')
-                result = data.get('result')
-                dice = data.get('dice')
-                logger.info(f"Dado rolado por {sender}: {dice} = {result}")
-                await self.broadcast(json.dumps({
-                    'type': 'dice_roll',
-                    'sender': sender,
-                    'dice': dice,
-                    'result': result
-                }))
-            
-            elif msg_type == 'character_update':
-                # Atualização de personagem
-                await self.broadcast(json.dumps(data), exclude=websocket)
-            
-            elif msg_type == 'ping':
-                # Responder ping
-                await websocket.send(json.dumps({'type': 'pong'}))
-            
-            else:
+            data = decode_frame(message, codec)
+        except CodecError as e:
+            logger.error(f"Erro ao decodificar mensagem: {e}")
+            return
+        
+        if not isinstance(data, dict):
+            logger.warning("Mensagem descartada: formato inválido")
+            return
+        
+        msg_type = data.get('type')
+        self._bytes_received.inc(len(message))
+        # Tipos desconhecidos não viram rótulo (evita cardinalidade ilimitada)
+        self._messages_received.inc(labels=(msg_type if msg_type in self.dispatcher.routes else 'unknown',))
+        try:
+            if not await self.dispatcher.dispatch(msg_type, websocket, data, message):
                 logger.warning(f"Tipo de mensagem desconhecido: {msg_type}")
+        except SchemaError as e:
+            logger.warning(f"Mensagem {msg_type} rejeitada: {e}")
+            await self.send(websocket, {
+                'type': 'error',
+                'message_type': msg_type,
+                'error': str(e)
+            })
+        except Exception:
+            logger.exception(f"Erro ao processar mensagem {msg_type}")
+    
+    async def on_register_gm(self, websocket, data: Dict, frame):
+        """Registrar como GM da sala"""
+        # O mundo vai depois da troca de codec, já no formato negociado
+        room = self.join_room(websocket, self.registration_room(websocket, data), send_world=False)
+        room.gm_client = websocket
+        logger.info(f"GM registrado na sala {room.room_id}")
+        selected = negotiate(data.get('codecs'))
+        await self.send(websocket, {
+            'type': 'registration_success',
+            'role': 'gm',
+            'room': room.room_id,
+            'codec': selected.name,
+            'session': self.start_session(websocket, room, 'gm'),
+            'seq': room.seq
+        })
+        self.set_codec(websocket, selected, batch=bool(data.get('batch')))
+        self.send_room_world(websocket, room, data.get('cache'))
+    
+    async def on_register_player(self, websocket, data: Dict, frame):
+        """Registrar como jogador da sala"""
+        player_name = data.get('name') or 'Unknown'
+        room = self.join_room(websocket, self.registration_room(websocket, data), send_world=False)
+        logger.info(f"Jogador registrado na sala {room.room_id}: {player_name}")
+        selected = negotiate(data.get('codecs'))
+        await self.send(websocket, {
+            'type': 'registration_success',
+            'role': 'player',
+            'name': player_name,
+            'room': room.room_id,
+            'codec': selected.name,
+            'session': self.start_session(websocket, room, 'player', player_name),
+            'seq': room.seq
+        })
+        self.set_codec(websocket, selected, batch=bool(data.get('batch')))
+        self.send_room_world(websocket, room, data.get('cache'))
+    
+    def start_session(self, websocket, room: Room, role: str, name: Optional[str] = None) -> str:
+        """Emite o token de sessão do cliente (substitui uma sessão anterior)"""
+        connection = self.clients[websocket]
+        self.sessions.discard(connection.session)
+        connection.session = self.sessions.issue(room.room_id, role, name).token
+        return connection.session
+    
+    async def on_resume(self, websocket, data: Dict, frame):
+        """Retoma uma sessão: reenvia só o que o cliente perdeu
+        
+        Se o histórico da sala não cobre o intervalo, envia o snapshot do
+        mundo (apenas se a revisão do cliente estiver desatualizada).
+        """
+        session = self.sessions.get(data['session'])
+        if session is None:
+            await self.send(websocket, {'type': 'resume_failed'})
+            return
+        
+        connection = self.clients[websocket]
+        self.sessions.discard(connection.session)
+        self.sessions.attach(session)
+        connection.session = session.token
+        room = self.join_room(websocket, session.room_id, send_world=False)
+        # Conexão antiga ainda aberta (queda não detectada): é substituída
+        for other_ws, other in list(self.clients.items()):
+            if other.session == session.token and other_ws != websocket:
+                other.session = None
+                self.leave_room(other_ws)
+                asyncio.get_running_loop().create_task(other_ws.close())
+        if session.role == 'gm':
+            current = room.gm_client
+            if current is None or current not in self.clients or getattr(current, 'closed', False):
+                room.gm_client = websocket
+            else:
+                # Outro GM assumiu a sala durante a queda: não perde o lugar
+                session.role = 'player'
+                logger.info(f"Sala {room.room_id} já tem GM: sessão retomada como jogador")
+        
+        selected = negotiate(data.get('codecs'))
+        last_seq = data.get('seq') or 0
+        await self.send(websocket, {
+            'type': 'resume_success',
+            'role': session.role,
+            'name': session.name,
+            'room': room.room_id,
+            'codec': selected.name,
+            'session': session.token
+        })
+        self.set_codec(websocket, selected, batch=bool(data.get('batch')))
         
-        except json.JSONDecodeError:
-            logger.error("Erro ao decodificar JSON")
-        except Exception as e:
-            logger.error(f"Erro ao processar mensagem: {e}")
+        replayed = room.replay_since(connection, last_seq)
+        if replayed is None:
+            if room.world_data and data.get('revision') != room.world_revision:
+                # Sessões vivem no mesmo processo da sala: sem época, vale a atual
+                self.send_world(connection, room, {
+                    'epoch': data.get('epoch') or room.world_epoch,
+                    'revision': data.get('revision')
+                })
+            # Mensagens antigas se perderam: o cliente continua a partir daqui
+            await self.send(websocket, {'type': 'resync', 'seq': room.seq})
+        logger.info(
+            f"Sessão retomada na sala {room.room_id} "
+            f"({'snapshot' if replayed is None else f'{replayed} mensagens reenviadas'})"
+        )
     
-    async def client_handler(self, websocket, path):
+    async def on_update_world(self, websocket, data: Dict, frame):
+        """GM atualiza dados do mundo por inteiro"""
+        room = self.room_of(websocket)
+        if websocket != room.gm_client:
+            return
+        room.set_world(data['world_data'])
+        logger.info(f"Mundo da sala {room.room_id} atualizado (revisão {room.world_revision})")
+        # Broadcast para todos os jogadores da sala
+        room.broadcast({
+            'type': 'world_updated',
+            'data': room.world_data,
+            'revision': room.world_revision
+        }, exclude=websocket)
+    
+    async def on_patch_world(self, websocket, data: Dict, frame):
+        """GM envia apenas os caminhos alterados"""
+        room = self.room_of(websocket)
+        if websocket == room.gm_client:
+            await self.apply_world_patch(room, websocket, data)
+    
+    async def on_request_snapshot(self, websocket, data: Dict, frame):
+        """Cliente atrasado pede o estado completo"""
+        room = self.room_of(websocket)
+        if data.get('revision') != room.world_revision:
+            await self.send_snapshot(websocket)
+    
+    async def on_chat_message(self, websocket, data: Dict, frame):
+        """Mensagem de chat"""
+        sender = data.get('sender') or 'Unknown'
+        msg = data.get('message') or ''
+        level = self._content_log_level()
+        if level:
+            logger.log(level, f"Chat - {sender}: {msg}")
+        self.room_of(websocket).broadcast({
+            'type': 'chat_message',
+            'sender': sender,
+            'message': msg,
+            'timestamp': data.get('timestamp')
+        })
+    
+    async def on_dice_roll(self, websocket, data: Dict, frame):
+        """Rolagem de dados feita pelo servidor (o `result` do cliente é ignorado)
+        
+        Com `times` > 1 a expressão é rolada várias vezes em lote
+        (ex.: dano de área em vários alvos) e `results` traz cada total.
+        """
+        sender = data.get('sender')
+        dice = data['dice']
+        times = data.get('times') or 1
+        try:
+            if not 1 <= times <= MAX_ROLLS_PER_MESSAGE:
+                raise DiceError(f"times deve estar entre 1 e {MAX_ROLLS_PER_MESSAGE}")
+            expression = parse_dice(dice)
+            if expression.dice_count * times > MAX_DICE_PER_MESSAGE:
+                raise DiceError(f"Rolagem excede {MAX_DICE_PER_MESSAGE} dados por mensagem")
+        except DiceError as e:
+            await self.send(websocket, {'type': 'error', 'message_type': 'dice_roll', 'error': str(e)})
+            return
+        
+        room = self.room_of(websocket)
+        message = {'type': 'dice_roll', 'sender': sender, 'dice': expression.text}
+        if times == 1:
+            roll = room.dice.roll(expression)
+            message.update(result=roll.total, rolls=roll.rolls)
+        else:
+            message['results'] = room.dice.roll_many(expression, times)
+        level = self._content_log_level()
+        if level:
+            logger.log(level, f"Dado rolado por {sender}: {dice} = {message.get('result', message.get('results'))}")
+        room.broadcast(message)
+    
+    async def on_character_update(self, websocket, data: Dict, frame):
+        """Atualização de personagem
+        
+        Atualizações pendentes do mesmo personagem são substituídas pela mais
+        recente (chave remetente + personagem).
+        """
+        character = data['character']
+        key = (data.get('sender'), character.get('id', character.get('name')))
+        self.room_of(websocket).broadcast(data, exclude=websocket, key=key)
+    
+    async def on_stats(self, websocket, data: Dict, frame):
+        """Estado da sala de quem pede; os clientes da sala só vão para o GM dela
+        
+        Métricas globais, todas as salas e todos os clientes só com o
+        `admin_token` do servidor.
+        """
+        token = data.get('admin_token')
+        if self.admin_token is not None and token is not None and secrets.compare_digest(
+                token.encode('utf-8'), self.admin_token.encode('utf-8')):
+            await self.send(websocket, {'type': 'stats', **self.get_stats()})
+            return
+        room = self.clients[websocket].room
+        stats: Dict = {'rooms': {room.room_id: self.get_room_stats(room)} if room is not None else {}}
+        if room is not None and websocket == room.gm_client:
+            stats['clients'] = self.get_client_stats(room)
+        await self.send(websocket, {'type': 'stats', **stats})
+    
+    async def on_ping(self, websocket, data: Dict, frame):
+        """Responder ping"""
+        await self.send(websocket, {'type': 'pong'})
+    
+    def set_codec(self, websocket, codec: Codec, batch: bool = False):
+        """Troca o codec da conexão após a resposta de registro
+        
+        A resposta ainda sai no codec anterior (JSON); só os frames
+        seguintes usam o formato negociado. `batch` indica que o cliente
+        entende frames `batch` (usados no modo tick).
+        """
+        connection = self.clients.get(websocket)
+        if connection is not None:
+            connection.codec = codec
+            connection.accepts_batch = batch
+            logger.info(f"Codec negociado: {codec.name}")
+    
+    async def apply_world_patch(self, room: Room, websocket, data: Dict):
+        """Aplica um patch do GM e repassa apenas as operações aos jogadores"""
+        base_revision = data.get('base_revision')
+        if base_revision != room.world_revision:
+            # GM está desatualizado: deve reenviar o mundo completo
+            await self.send(websocket, {
+                'type': 'patch_rejected',
+                'revision': room.world_revision,
+                'reason': 'revision_mismatch'
+            })
+            return
+        
+        ops = data.get('ops', [])
+        try:
+            apply_patch(room.world_data, ops)
+        except PatchError as e:
+            logger.warning(f"Patch inválido rejeitado: {e}")
+            await self.send(websocket, {
+                'type': 'patch_rejected',
+                'revision': room.world_revision,
+                'reason': str(e)
+            })
+            return
+        
+        room.world_revision += 1
+        room.record_patch(base_revision, ops)
+        logger.debug(f"Patch aplicado na sala {room.room_id} ({len(ops)} operações, revisão {room.world_revision})")
+        room.broadcast({
+            'type': 'world_patch',
+            'base_revision': base_revision,
+            'revision': room.world_revision,
+            'ops': ops
+        }, exclude=websocket)
+    
+    async def client_handler(self, websocket, path=None):
         """Handler para cada cliente conectado"""
-        await self.register_client(websocket)
+        if path is None:
+            request = getattr(websocket, 'request', None)
+            path = request.path if request is not None else None
+        await self.register_client(websocket, room_from_path(path))
         try:
             async for message in websocket:
                 await self.handle_message(websocket, message)
@@ -144,9 +642,21 @@ class GameServer:
         self.running = True
         logger.info(f"Iniciando servidor em {self.host}:{self.port}")
         
-        async with websockets.serve(self.client_handler, self.host, self.port):
-            logger.info("Servidor iniciado! Aguardando conexões...")
-            await asyncio.Future()  # Roda para sempre
+        self.loop_lag.start()
+        metrics_server = None
+        if self.metrics_port is not None:
+            metrics_server = MetricsHTTPServer(
+                self.metrics, self.get_stats, self.metrics_host, self.metrics_port
+            )
+            await metrics_server.start()
+        try:
+            async with websockets.serve(self.client_handler, self.host, self.port):
+                logger.info("Servidor iniciado! Aguardando conexões...")
+                await asyncio.Future()  # Roda para sempre
+        finally:
+            self.loop_lag.stop()
+            if metrics_server is not None:
+                metrics_server.close()
     
     def run(self):
         """Executa o servidor"""
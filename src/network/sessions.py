@@ -0,0 +1,65 @@
+"""
+Sessões de clientes para retomar a conexão sem nova sincronização completa
+"""
+import secrets
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass
+class Session:
+    """Identidade de um cliente registrado (sobrevive à queda da conexão)"""
+    token: str
+    room_id: str
+    role: str  # 'gm' ou 'player'
+    name: Optional[str] = None
+    expires_at: Optional[float] = None  # None enquanto conectado
+
+
+class SessionStore:
+    """Tokens emitidos no registro; sessões desconectadas expiram após `ttl` segundos"""
+
+    def __init__(self, ttl: float = 300.0):
+        self.ttl = ttl
+        self.sessions: Dict[str, Session] = {}
+
+    def issue(self, room_id: str, role: str, name: Optional[str] = None) -> Session:
+        """Cria uma nova sessão conectada"""
+        self.purge()
+        session = Session(secrets.token_urlsafe(16), room_id, role, name)
+        self.sessions[session.token] = session
+        return session
+
+    def get(self, token: Optional[str]) -> Optional[Session]:
+        """Retorna a sessão se existir e ainda não tiver expirado"""
+        session = self.sessions.get(token)
+        if session is None:
+            return None
+        if session.expires_at is not None and session.expires_at < time.monotonic():
+            del self.sessions[token]
+            return None
+        return session
+
+    def attach(self, session: Session):
+        """Sessão retomada: deixa de expirar"""
+        session.expires_at = None
+
+    def detach(self, token: Optional[str]):
+        """Conexão caiu: a sessão passa a expirar após o ttl"""
+        session = self.sessions.get(token)
+        if session is not None:
+            session.expires_at = time.monotonic() + self.ttl
+
+    def discard(self, token: Optional[str]):
+        self.sessions.pop(token, None)
+
+    def purge(self):
+        """Remove sessões expiradas"""
+        now = time.monotonic()
+        expired = [
+            token for token, session in self.sessions.items()
+            if session.expires_at is not None and session.expires_at < now
+        ]
+        for token in expired:
+            del self.sessions[token]
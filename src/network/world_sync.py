@@ -0,0 +1,161 @@
+"""
+Sincronização incremental do mundo via patches (estilo JSON-Patch, RFC 6902)
+
+Cada patch é uma lista de operações no formato:
+    {'op': 'add' | 'remove' | 'replace', 'path': '/rules/currency/base', 'value': ...}
+"""
+import hashlib
+import json
+from typing import Any, Dict, List, Tuple
+
+_MISSING = object()
+
+
+class PatchError(Exception):
+    """Erro ao aplicar um patch no documento do mundo"""
+
+
+def escape_token(token: str) -> str:
+    """Escapa um segmento de caminho (RFC 6901)"""
+    return str(token).replace('~', '~0').replace('/', '~1')
+
+
+def split_path(path: str) -> List[str]:
+    """Divide um JSON Pointer em segmentos"""
+    if path == '':
+        return []
+    if not path.startswith('/'):
+        raise PatchError(f"Caminho inválido: {path}")
+    return [part.replace('~1', '/').replace('~0', '~') for part in path[1:].split('/')]
+
+
+def _resolve_parent(document: Any, tokens: List[str], path: str) -> Tuple[Any, str]:
+    """Navega até o container pai do último segmento"""
+    node = document
+    for token in tokens[:-1]:
+        try:
+            node = node[int(token)] if isinstance(node, list) else node[token]
+        except (KeyError, IndexError, ValueError, TypeError):
+            raise PatchError(f"Caminho não encontrado: {path}")
+    return node, tokens[-1]
+
+
+def _list_index(container: list, token: str, path: str, allow_end: bool) -> int:
+    if allow_end and token == '-':
+        return len(container)
+    try:
+        index = int(token)
+    except ValueError:
+        raise PatchError(f"Índice inválido: {path}")
+    limit = len(container) if allow_end else len(container) - 1
+    if index < 0 or index > limit:
+        raise PatchError(f"Índice fora do intervalo: {path}")
+    return index
+
+
+def _apply_op(document: Dict, op: Dict) -> Tuple:
+    """Aplica uma operação e retorna os dados necessários para desfazê-la"""
+    kind = op.get('op')
+    path = op.get('path')
+    if kind not in ('add', 'remove', 'replace') or not isinstance(path, str):
+        raise PatchError(f"Operação inválida: {op}")
+
+    tokens = split_path(path)
+    if not tokens:
+        raise PatchError("Não é permitido substituir a raiz do mundo")
+    parent, token = _resolve_parent(document, tokens, path)
+
+    if isinstance(parent, list):
+        if kind == 'add':
+            index = _list_index(parent, token, path, allow_end=True)
+            parent.insert(index, op.get('value'))
+            return ('list_insert', parent, index, _MISSING)
+        index = _list_index(parent, token, path, allow_end=False)
+        previous = parent[index]
+        if kind == 'remove':
+            parent.pop(index)
+            return ('list_remove', parent, index, previous)
+        parent[index] = op.get('value')
+        return ('list_set', parent, index, previous)
+
+    if not isinstance(parent, dict):
+        raise PatchError(f"Caminho não encontrado: {path}")
+
+    previous = parent.get(token, _MISSING)
+    if kind == 'add':
+        parent[token] = op.get('value')
+    elif previous is _MISSING:
+        raise PatchError(f"Chave não encontrada: {path}")
+    elif kind == 'remove':
+        del parent[token]
+    else:
+        parent[token] = op.get('value')
+    return ('dict', parent, token, previous)
+
+
+def _undo(entry: Tuple):
+    kind, container, key, previous = entry
+    if kind == 'list_insert':
+        container.pop(key)
+    elif kind == 'list_remove':
+        container.insert(key, previous)
+    elif kind == 'list_set':
+        container[key] = previous
+    elif previous is _MISSING:
+        container.pop(key, None)
+    else:
+        container[key] = previous
+
+
+def apply_patch(document: Dict, ops: List[Dict]) -> Dict:
+    """Aplica as operações no documento (in-place).
+
+    A aplicação é atômica: se alguma operação falhar, as anteriores são
+    desfeitas e PatchError é propagado, deixando o documento intacto.
+    """
+    if not isinstance(ops, list):
+        raise PatchError("Patch deve ser uma lista de operações")
+
+    undo_log = []
+    try:
+        for op in ops:
+            if not isinstance(op, dict):
+                raise PatchError(f"Operação inválida: {op}")
+            undo_log.append(_apply_op(document, op))
+    except PatchError:
+        for entry in reversed(undo_log):
+            _undo(entry)
+        raise
+    return document
+
+
+def diff_world(old: Any, new: Any, path: str = '') -> List[Dict]:
+    """Gera a lista de operações que transforma `old` em `new`.
+
+    Dicionários são comparados recursivamente; listas e valores escalares
+    diferentes são substituídos por inteiro.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key, old_value in old.items():
+            child = f"{path}/{escape_token(key)}"
+            if key not in new:
+                ops.append({'op': 'remove', 'path': child})
+            else:
+                ops.extend(diff_world(old_value, new[key], child))
+        for key, new_value in new.items():
+            if key not in old:
+                ops.append({'op': 'add', 'path': f"{path}/{escape_token(key)}", 'value': new_value})
+        return ops
+
+    if old == new and type(old) is type(new):
+        return []
+    if not path:
+        raise PatchError("Não é permitido substituir a raiz do mundo")
+    return [{'op': 'replace', 'path': path, 'value': new}]
+
+
+def world_hash(document: Any) -> str:
+    """Hash do conteúdo do mundo (JSON canônico), igual no cliente e no servidor"""
+    canonical = json.dumps(document, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()